@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Route endpoints with async views to them, see ROOT_URLCONF.
+os.environ['APP_SERVER'] = 'asgi'
 
 application = get_asgi_application()
@@ -0,0 +1,23 @@
+"""app URL Configuration served through ASGI.
+
+Same urls as app.urls, but endpoints that have async views are routed to them.
+Under WSGI async views would run through async_to_sync, so app.urls keeps
+the sync ones.
+"""
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from django.conf import settings
+from django.conf.urls.static import static
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="docs"),
+    path("users/", include("users.asgi_urls")),
+    path("videos/", include("videos.asgi_urls")),
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "rest_framework_simplejwt",
@@ -56,7 +57,8 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "app.urls"
+# Served through ASGI, some endpoints are routed to async views.
+ROOT_URLCONF = "app.asgi_urls" if os.environ.get("APP_SERVER") == "asgi" else "app.urls"
 
 TEMPLATES = [
     {
@@ -92,6 +94,45 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Files are kept out of /vol/web, which the proxy serves as static files.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", "/vol/cache/default"),
+    },
+    "youtube": {
+        "BACKEND": os.environ.get(
+            "YOUTUBE_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.environ.get("YOUTUBE_CACHE_LOCATION", "/vol/cache/youtube"),
+        "TIMEOUT": int(os.environ.get("YOUTUBE_CACHE_TTL", 60 * 60 * 6)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("YOUTUBE_CACHE_MAX_ENTRIES", 20000)),
+        },
+    },
+}
+
+
+# YouTube access
+# "live" fetches from YouTube, "record" also saves responses
+# to YOUTUBE_FIXTURES_DIR and "replay" reads them back without network.
+
+YOUTUBE_TRANSPORT = os.environ.get("YOUTUBE_TRANSPORT", "live")
+YOUTUBE_FIXTURES_DIR = os.environ.get(
+    "YOUTUBE_FIXTURES_DIR", "/vol/cache/youtube-fixtures"
+)
+
+
+# Videos API
+# Maximum amount of videos collected in one request.
+
+COLLECT_VIDEOS_BATCH_LIMIT = int(os.environ.get("COLLECT_VIDEOS_BATCH_LIMIT", 100))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -2,6 +2,8 @@
 Django admin customization.
 """
 
+import datetime
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
@@ -59,9 +61,30 @@ class VideoAdmin(admin.ModelAdmin):
     """Define Video in django-admin."""
 
     ordering = ["-todays", "-publish_date"]
-    search_fields = ["title", "publish_date"]
+    search_fields = ["title"]
+    search_help_text = "Search by title, tolerating typos, or by publish date."
     list_display = ["title", "publish_date", "todays"]
 
+    def get_search_results(self, request, queryset, search_term):
+        """Search titles with indexed full text and trigram search
+        instead of a scan of the whole table."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        try:
+            publish_date = datetime.date.fromisoformat(search_term)
+        except ValueError:
+            matching = models.Video.objects.search(search_term)
+            return queryset.filter(pk__in=matching.values("pk")), False
+
+        return queryset.filter(publish_date=publish_date), False
+
+    def save_model(self, request, obj, form, change):
+        """Save video and index its title for search."""
+        super().save_model(request, obj, form, change)
+        models.Video.objects.index_titles([obj.pk])
+
 
 class UserVideoRelationAdmin(admin.ModelAdmin):
     """Define UserVideoRelation in django-admin."""
@@ -70,6 +93,22 @@ class UserVideoRelationAdmin(admin.ModelAdmin):
     list_display = ["user", "video", "collected"]
 
 
+class ScheduledVideoAdmin(admin.ModelAdmin):
+    """Define ScheduledVideo in django-admin."""
+
+    ordering = ["-date"]
+    list_display = ["date", "video", "cycle"]
+
+
+class ChannelCheckpointAdmin(admin.ModelAdmin):
+    """Define ChannelCheckpoint in django-admin."""
+
+    list_display = ["channel_id", "latest_video_id", "synced"]
+    readonly_fields = ["synced"]
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Video, VideoAdmin)
 admin.site.register(models.UserVideoRelation, UserVideoRelationAdmin)
+admin.site.register(models.ScheduledVideo, ScheduledVideoAdmin)
+admin.site.register(models.ChannelCheckpoint, ChannelCheckpointAdmin)
@@ -0,0 +1,40 @@
+"""
+Cache keys shared between apps.
+"""
+import uuid
+
+from django.core.cache import cache
+
+TODAYS_VIDEO_VERSION_KEY = "todays-video:version"
+VIDEO_IDS_KEY = "videos:ids"
+VIDEO_IDS_TTL = 60 * 60
+
+
+def get_todays_video_version() -> str:
+    """Return current version of today's video."""
+    version = cache.get(TODAYS_VIDEO_VERSION_KEY)
+    if version is None:
+        cache.add(TODAYS_VIDEO_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(TODAYS_VIDEO_VERSION_KEY)
+
+    return version
+
+
+async def aget_todays_video_version() -> str:
+    """Return current version of today's video without blocking the event loop."""
+    version = await cache.aget(TODAYS_VIDEO_VERSION_KEY)
+    if version is None:
+        await cache.aadd(TODAYS_VIDEO_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(TODAYS_VIDEO_VERSION_KEY)
+
+    return version
+
+
+def bump_todays_video_version():
+    """Invalidate every cached copy of today's video."""
+    cache.set(TODAYS_VIDEO_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def clear_video_ids():
+    """Forget cached ids of videos."""
+    cache.delete(VIDEO_IDS_KEY)
@@ -0,0 +1,113 @@
+"""
+Password hashing off the event loop.
+"""
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.contrib.auth.hashers import check_password, make_password
+
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_MAX_QUEUED = 32
+
+
+class HashingQueueFullException(Exception):
+    """Too many passwords are waiting to be hashed."""
+
+
+class PasswordHashing:
+    """Bounded pool of threads hashing passwords.
+
+    Hashing is CPU bound and takes hundreds of milliseconds, running it
+    on the event loop would stall every other request of the process.
+    The hash functions of hashlib release the GIL, so the threads hash
+    in parallel with the loop. At most max_queued passwords wait for
+    a thread, more are refused right away instead of piling up latency.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASHING_WORKERS,
+        max_queued: int = PASSWORD_HASHING_MAX_QUEUED,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.executor = None
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.hash_time = 0.0
+
+    async def run(self, func, *args):
+        """Return result of func run on the pool, raise if the queue is full."""
+        with self.lock:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise HashingQueueFullException
+            self.queued += 1
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="password-hashing"
+                )
+
+        submitted = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_time += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.hash_time += time.monotonic() - started
+
+        return await asyncio.wrap_future(self.executor.submit(job))
+
+    async def make_password(self, password: Optional[str]) -> str:
+        """Return hash of the password."""
+        return await self.run(make_password, password)
+
+    async def check_password(self, password: str, encoded: str) -> bool:
+        """Return whether password matches the hash."""
+        return await self.run(check_password, password, encoded)
+
+    async def verify_password(self, password: str, encoded: str):
+        """Return whether password matches the hash and whether the hash
+        is outdated and should be made again with the preferred hasher."""
+        outdated = []
+        matches = await self.run(check_password, password, encoded, outdated.append)
+        return matches, bool(outdated)
+
+    def get_metrics(self) -> dict:
+        """Return sizes of the queue and totals of hashed passwords."""
+        with self.lock:
+            completed = max(self.completed, 1)
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "mean_wait_ms": self.wait_time / completed * 1000,
+                "mean_hash_ms": self.hash_time / completed * 1000,
+            }
+
+    def clear(self):
+        """Reset counters, keeping the pool."""
+        with self.lock:
+            self.completed = self.rejected = 0
+            self.wait_time = self.hash_time = 0.0
+
+
+password_hashing = PasswordHashing()
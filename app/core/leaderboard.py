@@ -0,0 +1,78 @@
+"""
+Ranking of users by amount of collected videos.
+"""
+import time
+
+from bisect import bisect_right
+from itertools import accumulate
+
+from django.db.models import Count
+
+from core.models import CollectionStats
+
+LEADERBOARD_SNAPSHOT_TTL = 60
+
+
+class ScoreSnapshot:
+    """Amount of users with every score, searchable in logarithmic time."""
+
+    def __init__(self, score_counts):
+        """Build from (score, amount of users) pairs sorted by score."""
+        self.scores = [score for score, _ in score_counts]
+        counts = [count for _, count in score_counts]
+        self.users_from = list(accumulate(reversed(counts)))[::-1] + [0]
+        self.created = time.monotonic()
+
+    @property
+    def collectors(self) -> int:
+        """Amount of users in the ranking."""
+        return self.users_from[0]
+
+    def rank_of(self, score: int) -> int:
+        """Return rank of a score, users with the same score share the rank."""
+        return self.users_from[bisect_right(self.scores, score)] + 1
+
+
+class Leaderboard:
+    """Ranks of collectors kept in memory of the worker.
+
+    Scores are read from the indexed collected counter of statistics,
+    which every collect keeps up to date. The distribution of scores
+    is loaded with one query and reused for LEADERBOARD_SNAPSHOT_TTL seconds,
+    so looking up a rank doesn't touch the database. Collects and uncollects
+    made by the worker clear it, so its own users see their new ranks.
+    """
+
+    def __init__(self, ttl: int = LEADERBOARD_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self.snapshot = None
+
+    def get_snapshot(self) -> ScoreSnapshot:
+        """Return distribution of scores, loading it if it's stale."""
+        if (
+            self.snapshot is None
+            or time.monotonic() - self.snapshot.created > self.ttl
+        ):
+            score_counts = (
+                CollectionStats.objects.ranked()
+                .order_by("collected_count")
+                .values_list("collected_count")
+                .annotate(users=Count("user"))
+            )
+            self.snapshot = ScoreSnapshot(list(score_counts))
+
+        return self.snapshot
+
+    def rank_of(self, score: int):
+        """Return rank of a score or None if it isn't ranked."""
+        if score <= 0:
+            return None
+
+        return self.get_snapshot().rank_of(score)
+
+    def clear(self):
+        """Forget the loaded distribution."""
+        self.snapshot = None
+
+
+leaderboard = Leaderboard()
@@ -1,6 +1,5 @@
 """
-Command to add the latest Wersow's video to the database
-but only if the video is not in the database already.
+Command to add Wersow's videos published since the last sync to the database.
 """
 from django.core.management.base import BaseCommand
 
@@ -8,16 +7,23 @@ from core.models import Video
 
 
 class Command(BaseCommand):
-    help = """Add the latest Wersow's video to the database
-              but only if the video is not in the database already"""
+    help = """Add Wersow's videos published since the last sync to the database
+              reading the channel only until the last synced video"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Ignore data of videos cached by previous runs",
+        )
 
     def handle(self, *args, **options):
-        latest_video = Video.objects.add_latest_video()
+        new_videos = Video.objects.sync_new_videos(refresh=options["refresh"])
 
-        if latest_video:
-            self.stdout.write(self.style.SUCCESS(f"Added: {latest_video}"))
+        for video in new_videos:
+            self.stdout.write(self.style.SUCCESS(f"Added: {video}"))
 
-        else:
+        if not new_videos:
             self.stdout.write(
                 self.style.SUCCESS("Latest video was already in database")
             )
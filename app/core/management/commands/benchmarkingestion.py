@@ -0,0 +1,99 @@
+"""
+Command to benchmark loading videos from a synthetic recorded channel.
+"""
+import datetime
+import io
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.cache import clear_video_ids
+from core.utils import WersowChannel
+from core.youtube import FixtureStore
+
+
+class Command(BaseCommand):
+    help = """Measure loadvideos on a synthetic channel replayed from fixtures,
+              without network. Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--videos", type=int, help="Amount of videos on the channel", default=10000
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            help="Amount of videos fetched at the same time",
+            default=1,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of videos inserted in one query",
+            default=100,
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            self.record_synthetic_channel(FixtureStore(fixtures_dir), options["videos"])
+            caches = {
+                **settings.CACHES,
+                "youtube": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            }
+            with override_settings(
+                YOUTUBE_TRANSPORT="replay",
+                YOUTUBE_FIXTURES_DIR=fixtures_dir,
+                CACHES=caches,
+            ):
+                elapsed, queries, peak = self.measure(
+                    jobs=options["jobs"], batch_size=options["batch_size"]
+                )
+
+        clear_video_ids()
+        self.stdout.write(
+            f"{options['videos']} videos: "
+            f"{elapsed:.2f} s, "
+            f"{queries} queries, "
+            f"peak memory {peak / 1024 / 1024:.1f} MiB"
+        )
+
+    def record_synthetic_channel(self, store, count):
+        """Write fixtures of a channel with count videos."""
+        video_urls = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(count)]
+        store.save_channel(WersowChannel.channel_id, video_urls)
+        for i, video_url in enumerate(video_urls):
+            store.save_video(
+                {
+                    "url": video_url,
+                    "title": f"Video {i}",
+                    "thumbnail_url": f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg",
+                    "publish_date": datetime.date(2023, 1, 1)
+                    - datetime.timedelta(days=i),
+                }
+            )
+
+    def measure(self, jobs, batch_size):
+        """Return wall time, amount of queries and peak memory of loadvideos."""
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                tracemalloc.start()
+                start = time.perf_counter()
+                call_command(
+                    "loadvideos",
+                    refresh=True,
+                    jobs=jobs,
+                    batch_size=batch_size,
+                    stdout=io.StringIO(),
+                )
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+
+        return elapsed, len(queries), peak
@@ -0,0 +1,120 @@
+"""
+Command to benchmark the collectors ranking on many synthetic users.
+"""
+import math
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.leaderboard import leaderboard
+from core.models import CollectionStats
+from videos.pagination import LeaderboardPagination
+
+
+class Command(BaseCommand):
+    help = """Measure reading the collectors ranking and looking up ranks
+              on synthetic users.
+              Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, help="Amount of users", default=1000000
+        )
+        parser.add_argument(
+            "--samples", type=int, help="Amount of rank lookups", default=10000
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of users inserted in one query",
+            default=10000,
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_collectors(options["users"], max(options["batch_size"], 1))
+            self.measure(max(options["samples"], 1))
+            transaction.set_rollback(True)
+
+        leaderboard.clear()
+
+    def create_collectors(self, count, batch_size):
+        """Create users with statistics of a long tailed amount of videos."""
+        User = get_user_model()
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            users = User.objects.bulk_create(
+                User(
+                    email=f"benchmark{i}@example.com",
+                    username=f"benchmark{i}",
+                    password="!",
+                )
+                for i in range(start, end)
+            )
+            CollectionStats.objects.bulk_create(
+                CollectionStats(
+                    user=user, collected_count=int(random.expovariate(1 / 20))
+                )
+                for user in users
+            )
+
+        with connection.cursor() as cursor:
+            for model in [User, CollectionStats]:
+                table = connection.ops.quote_name(model._meta.db_table)
+                cursor.execute(f"ANALYZE {table}")
+
+    def measure(self, samples):
+        """Report timings of loading scores, reading pages and looking up ranks."""
+        leaderboard.clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        snapshot = leaderboard.get_snapshot()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"snapshot of {snapshot.collectors} collectors: "
+            f"{elapsed * 1000:.1f} ms, peak memory {peak / 1024:.1f} KiB"
+        )
+
+        ranking = CollectionStats.objects.ranked().select_related("user")
+        ranking = ranking.order_by(*LeaderboardPagination.ordering)
+        positions = ranking.values_list("collected_count", "user_id")
+        middle_position = snapshot.collectors // 2
+        middle = positions[middle_position:].first()
+        pages = [("first page", ranking)]
+        if middle:
+            middle_filter = LeaderboardPagination().get_position_filter(middle)
+            pages.append(("middle page", ranking.filter(middle_filter)))
+        for name, page in pages:
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                list(page[: LeaderboardPagination.page_size])
+                elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{name}: {elapsed * 1000:.1f} ms, {len(queries)} queries"
+            )
+
+        top_score = max(snapshot.scores, default=1)
+        scores = [random.randint(1, top_score) for _ in range(samples)]
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for score in scores:
+                start = time.perf_counter()
+                leaderboard.rank_of(score)
+                timings.append(time.perf_counter() - start)
+
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, math.ceil(len(timings) * 0.99) - 1)]
+        self.stdout.write(
+            f"rank lookup: "
+            f"median {statistics.median(timings) * 1000000:.2f} µs, "
+            f"p99 {p99 * 1000000:.2f} µs, "
+            f"{len(queries)} queries"
+        )
@@ -0,0 +1,179 @@
+"""
+Command to benchmark latency of reads while many users log in.
+"""
+import asyncio
+import datetime
+import json
+import math
+import statistics
+import time
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.hashing import password_hashing
+from core.models import Video
+
+BENCHMARK_HOST = "benchmark"
+BENCHMARK_PASSWORD = "benchmarkpass123"
+
+
+class Command(BaseCommand):
+    help = """Measure latency of today's video while users log in through
+              the ASGI application, once with the sync simplejwt login
+              hashing on the request thread and once with the async login
+              hashing on the pool.
+              Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--logins",
+            type=int,
+            help="Amount of clients logging in again and again",
+            default=4,
+        )
+        parser.add_argument(
+            "--reads", type=int, help="Amount of reads of a kind", default=100
+        )
+        parser.add_argument(
+            "--readers", type=int, help="Amount of clients reading", default=4
+        )
+
+    def handle(self, *args, **options):
+        # Like the test client, keep the connection of the rolled back transaction.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with transaction.atomic(), override_settings(
+                ALLOWED_HOSTS=[BENCHMARK_HOST], ROOT_URLCONF="app.asgi_urls"
+            ):
+                user = self.create_data()
+                async_to_sync(self.measure)(
+                    user,
+                    max(options["logins"], 1),
+                    max(options["reads"], 1),
+                    max(options["readers"], 1),
+                )
+                transaction.set_rollback(True)
+
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+    def create_data(self):
+        """Create a video to read and a user to log in as."""
+        Video.objects.create(
+            title="Benchmark",
+            url="https://www.youtube.com/watch?v=benchmark",
+            thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+            publish_date=datetime.date(2023, 1, 1),
+        )
+        return get_user_model().objects.create_user(
+            email="benchmark@example.com",
+            username="benchmark",
+            password=BENCHMARK_PASSWORD,
+        )
+
+    async def measure(self, user, logins, reads, readers):
+        """Report latency of reads alone and during storms of each login."""
+        handler = ASGIHandler()
+        storms = [
+            ("no logins", None),
+            ("sync login", reverse("users:token_obtain_pair")),
+            ("async login", reverse("users:login")),
+        ]
+        for name, login_url in storms:
+            password_hashing.clear()
+            timings, statuses = await self.storm(
+                handler, user, login_url, logins, reads, readers
+            )
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, math.ceil(len(timings) * 0.99) - 1)]
+            logged_in = ", ".join(
+                f"{count} logins with status {status}"
+                for status, count in sorted(statuses.items())
+            )
+            self.stdout.write(
+                f"{name}: reads "
+                f"median {statistics.median(timings) * 1000:.1f} ms, "
+                f"p99 {p99 * 1000:.1f} ms"
+                + (f", {logged_in}" if logged_in else "")
+            )
+
+    async def storm(self, handler, user, login_url, logins, reads, readers):
+        """Return timings of reads done while clients log in."""
+        todays_url = reverse("videos:todays")
+        credentials = {"email": user.email, "password": BENCHMARK_PASSWORD}
+        body = json.dumps(credentials).encode()
+        timings = []
+        statuses = Counter()
+        done = asyncio.Event()
+
+        async def log_in():
+            while not done.is_set():
+                status = await self.request(handler, "POST", login_url, body)
+                statuses[status] += 1
+
+        async def read(count):
+            for _ in range(count):
+                start = time.perf_counter()
+                await self.request(handler, "GET", todays_url)
+                timings.append(time.perf_counter() - start)
+
+        clients = []
+        if login_url:
+            clients = [asyncio.ensure_future(log_in()) for _ in range(logins)]
+            # Let logins start hashing before the first read.
+            await asyncio.sleep(0.1)
+        await asyncio.gather(
+            *(read(math.ceil(reads / readers)) for _ in range(readers))
+        )
+        done.set()
+        await asyncio.gather(*clients)
+
+        return timings, statuses
+
+    async def request(self, handler, method, path, body=b""):
+        """Return status of a request served by the ASGI handler."""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", BENCHMARK_HOST.encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": (BENCHMARK_HOST, 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        response = {}
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            # The client never disconnects.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+
+        await handler(scope, receive, send)
+
+        return response["status"]
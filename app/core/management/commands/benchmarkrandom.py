@@ -0,0 +1,82 @@
+"""
+Command to benchmark picking a random video at different id sparsity.
+"""
+import datetime
+import math
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import clear_video_ids
+from core.models import Video
+
+SPARSITIES = [0.01, 0.5, 0.99]
+
+
+class Command(BaseCommand):
+    help = """Measure Video.objects.random() on synthetic catalogs
+              with 1%, 50% and 99% of ids deleted.
+              Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--videos", type=int, help="Amount of live videos", default=1000
+        )
+        parser.add_argument(
+            "--samples", type=int, help="Amount of random picks", default=1000
+        )
+
+    def handle(self, *args, **options):
+        live_count = options["videos"]
+        samples = options["samples"]
+
+        for sparsity in SPARSITIES:
+            with transaction.atomic():
+                self.create_sparse_catalog(live_count, sparsity)
+                timings, max_queries = self.measure(samples)
+                transaction.set_rollback(True)
+
+            clear_video_ids()
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, math.ceil(len(timings) * 0.99) - 1)]
+            self.stdout.write(
+                f"sparsity {sparsity:>4.0%}: "
+                f"median {statistics.median(timings) * 1000:.3f} ms, "
+                f"p99 {p99 * 1000:.3f} ms, "
+                f"max {max_queries} queries"
+            )
+
+    def create_sparse_catalog(self, live_count, sparsity):
+        """Create videos and delete all but live_count of them."""
+        total = math.ceil(live_count / (1 - sparsity))
+        Video.objects.bulk_create(
+            Video(
+                title=f"Video {i}",
+                url=f"https://www.youtube.com/watch?v=benchmark{i}",
+                thumbnail_url="https://i.ytimg.com/vi/benchmark/hqdefault.jpg",
+                publish_date=datetime.date(2023, 1, 1),
+            )
+            for i in range(total)
+        )
+        ids = list(Video.objects.values_list("id", flat=True))
+        to_delete = random.sample(ids, len(ids) - live_count)
+        Video.objects.filter(id__in=to_delete).delete()
+        clear_video_ids()
+
+    def measure(self, samples):
+        """Return timings of random picks and max queries per pick."""
+        Video.objects.random()
+        timings = []
+        max_queries = 0
+        for _ in range(samples):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                Video.objects.random()
+                timings.append(time.perf_counter() - start)
+            max_queries = max(max_queries, len(queries))
+
+        return timings, max_queries
@@ -0,0 +1,114 @@
+"""
+Command to benchmark searching titles of a large synthetic catalog.
+"""
+import datetime
+import math
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Video
+
+SYLLABLES = """ba be bi bo bu by cha che chi cho cie cio ciu da de do du dy dzi
+dża dże ga ge go gu ja je jo ju ją ka ke ki ko ku ła le li lo łu ły ma me mi mo mu
+my na ne ni no nu ny ną nię pa pe pi po pu pę ra re ro ru ry rze rzu sa se si so su
+sy ść śnie ta te to tu ty wa we wi wo wu wy za ze zo zu ży że gó ró ń""".split()
+
+
+def misspell(word):
+    """Return word with one letter dropped."""
+    letters = list(word)
+    del letters[random.randrange(len(letters))]
+    return "".join(letters)
+
+
+class Command(BaseCommand):
+    help = """Measure searching titles of videos in a synthetic catalog.
+              Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--videos", type=int, help="Amount of videos", default=100000
+        )
+        parser.add_argument(
+            "--words",
+            type=int,
+            help="Amount of distinct words in titles",
+            default=5000,
+        )
+        parser.add_argument(
+            "--samples", type=int, help="Amount of searches of a kind", default=100
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of videos inserted in one query",
+            default=10000,
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            words = [
+                "".join(random.choices(SYLLABLES, k=random.randint(2, 4)))
+                for _ in range(max(options["words"], 1))
+            ]
+            self.create_videos(
+                options["videos"], words, max(options["batch_size"], 1)
+            )
+            self.measure(words, max(options["samples"], 1))
+            transaction.set_rollback(True)
+
+    def create_videos(self, count, words, batch_size):
+        """Create videos with titles of random words and index them."""
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            Video.objects.bulk_create(
+                Video(
+                    title=" ".join(random.choices(words, k=random.randint(3, 8))),
+                    url=f"https://www.youtube.com/watch?v=benchmark{i}",
+                    thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+                    publish_date=datetime.date(2023, 1, 1),
+                )
+                for i in range(start, end)
+            )
+        Video.objects.index_titles()
+
+        with connection.cursor() as cursor:
+            table = connection.ops.quote_name(Video._meta.db_table)
+            cursor.execute(f"ANALYZE {table}")
+
+    def measure(self, words, samples):
+        """Report timings of searches with and without typos
+        and of the substring filter admin used before."""
+        long_words = [word for word in words if len(word) > 5]
+        searches = [
+            ("full text", Video.objects.search, lambda: random.choice(words)),
+            (
+                "typo",
+                Video.objects.search,
+                lambda: misspell(random.choice(long_words)),
+            ),
+            (
+                "icontains",
+                lambda query: Video.objects.filter(title__icontains=query),
+                lambda: random.choice(words),
+            ),
+        ]
+        for name, search, make_query in searches:
+            timings = []
+            for _ in range(samples):
+                query = make_query()
+                start = time.perf_counter()
+                list(search(query)[:20])
+                timings.append(time.perf_counter() - start)
+
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, math.ceil(len(timings) * 0.99) - 1)]
+            self.stdout.write(
+                f"{name}: "
+                f"median {statistics.median(timings) * 1000:.1f} ms, "
+                f"p99 {p99 * 1000:.1f} ms"
+            )
@@ -0,0 +1,311 @@
+"""
+Command to benchmark serving read endpoints with uwsgi and with ASGI.
+"""
+import asyncio
+import math
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils.timezone import localdate
+
+from core.cache import bump_todays_video_version
+from core.models import CollectionStats, ScheduledVideo, Video
+from users.serializers import LoginSerializer
+
+BENCHMARK_HOST = "127.0.0.1"
+SERVER_START_TIMEOUT = 30
+SERVERS = {
+    "uwsgi": [
+        "uwsgi",
+        "--http-socket",
+        f"{BENCHMARK_HOST}:{{port}}",
+        "--workers",
+        "{workers}",
+        "--listen",
+        "{backlog}",
+        "--master",
+        "--enable-threads",
+        "--disable-logging",
+        "--module",
+        "app.wsgi",
+    ],
+    "asgi": [
+        "uvicorn",
+        "app.asgi:application",
+        "--host",
+        BENCHMARK_HOST,
+        "--port",
+        "{port}",
+        "--workers",
+        "{workers}",
+        "--backlog",
+        "{backlog}",
+        "--lifespan",
+        "off",
+        "--no-access-log",
+    ],
+}
+
+
+def get_tree_memory(pid: int) -> int:
+    """Return resident memory in bytes of the process and its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    memory = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        pids.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        memory += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+
+    return memory
+
+
+class Command(BaseCommand):
+    help = """Measure requests per second and memory per connection of today's
+              video and of user's collection served by uwsgi with the sync views
+              like scripts/run.sh does and by uvicorn with the async views.
+              Servers use the configured database, a benchmark user with
+              a unique email is created and deleted afterwards"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--servers",
+            nargs="+",
+            choices=list(SERVERS),
+            help="Servers to measure",
+            default=list(SERVERS),
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            help="Amount of open client connections",
+            default=100,
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            help="Seconds of load on an endpoint",
+            default=10,
+        )
+        parser.add_argument(
+            "--workers", type=int, help="Amount of server processes", default=4
+        )
+        parser.add_argument(
+            "--port", type=int, help="Port servers listen on", default=8765
+        )
+
+    def handle(self, *args, **options):
+        user, created_video = self.create_data()
+        try:
+            token = LoginSerializer.get_token(user).access_token
+            endpoints = [
+                ("todays", reverse("videos:todays"), {}),
+                (
+                    "my videos",
+                    reverse("videos:my-videos"),
+                    {"Authorization": f"Bearer {token}"},
+                ),
+            ]
+            for server in options["servers"]:
+                executable = SERVERS[server][0]
+                if shutil.which(executable) is None:
+                    self.stderr.write(f"{server}: {executable} isn't installed")
+                    continue
+
+                self.measure(
+                    server,
+                    endpoints,
+                    max(options["connections"], 1),
+                    max(options["duration"], 0.1),
+                    max(options["workers"], 1),
+                    options["port"],
+                )
+
+        finally:
+            user.delete()
+            if created_video is not None:
+                created_video.delete()
+                bump_todays_video_version()
+
+    def create_data(self):
+        """Return a benchmark user and a today's video created if there was none.
+
+        Servers only see committed rows, so names are unique instead.
+        Today's video isn't elected, the election would outlive the benchmark.
+        """
+        name = f"benchmark-{uuid.uuid4().hex[:12]}"
+        user = get_user_model().objects.create_user(
+            email=f"{name}@example.com", password="benchmarkpass123", username=name
+        )
+        CollectionStats.objects.for_user(user)
+        created_video = None
+        scheduled = ScheduledVideo.objects.filter(date=localdate()).exists()
+        if not scheduled and not Video.objects.filter(todays=True).exists():
+            created_video = Video.objects.create(
+                title="Benchmark",
+                url=f"https://www.youtube.com/watch?v={name}",
+                thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+                publish_date=localdate(),
+                todays=True,
+            )
+            bump_todays_video_version()
+
+        return user, created_video
+
+    def measure(self, server, endpoints, connections, duration, workers, port):
+        """Report throughput and memory of a server under load of each endpoint."""
+        arguments = [
+            argument.format(port=port, workers=workers, backlog=connections)
+            for argument in SERVERS[server]
+        ]
+        env = {**os.environ, "ALLOWED_HOSTS": BENCHMARK_HOST, "APP_SERVER": server}
+        process = subprocess.Popen(
+            arguments,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        try:
+            asyncio.run(self.wait_for_server(port, endpoints[0][1]))
+            idle_memory = get_tree_memory(process.pid)
+            self.stdout.write(f"{server}: idle memory {idle_memory / 2**20:.1f} MiB")
+            for name, path, headers in endpoints:
+                result = asyncio.run(
+                    self.load(process.pid, port, path, headers, connections, duration)
+                )
+                requests, errors, timings, peak_memory = result
+                timings.sort()
+                p99 = timings[min(len(timings) - 1, math.ceil(len(timings) * 0.99) - 1)]
+                per_connection = max(peak_memory - idle_memory, 0) / connections
+                self.stdout.write(
+                    f"{server} {name}: {requests / duration:.0f} requests/s, "
+                    f"median {statistics.median(timings) * 1000:.1f} ms, "
+                    f"p99 {p99 * 1000:.1f} ms, {errors} errors, "
+                    f"{per_connection / 1024:.1f} KiB per connection"
+                )
+
+        finally:
+            os.killpg(process.pid, signal.SIGINT)
+            try:
+                process.wait(timeout=SERVER_START_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+
+    async def wait_for_server(self, port, path):
+        """Wait until the server answers the path."""
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            try:
+                connection = await asyncio.open_connection(BENCHMARK_HOST, port)
+                status = await self.request(connection, path, {})
+                connection[1].close()
+                if status == 200:
+                    return
+            except (OSError, asyncio.IncompleteReadError):
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {port} didn't start.")
+            await asyncio.sleep(0.2)
+
+    async def load(self, pid, port, path, headers, connections, duration):
+        """Return amounts of requests and errors, timings of requests
+        and peak memory of the server while clients request the path."""
+        deadline = time.monotonic() + duration
+        timings = []
+        counts = {"requests": 0, "errors": 0}
+        peak_memory = 0
+
+        async def client():
+            connection = None
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                status = None
+                try:
+                    if connection is not None:
+                        try:
+                            status = await self.request(connection, path, headers)
+                        except (OSError, asyncio.IncompleteReadError):
+                            # Server closed the connection after the last response.
+                            connection[1].close()
+                            connection = None
+                    if connection is None:
+                        connection = await asyncio.open_connection(BENCHMARK_HOST, port)
+                        status = await self.request(connection, path, headers)
+
+                except (OSError, asyncio.IncompleteReadError):
+                    counts["errors"] += 1
+                    if connection is not None:
+                        connection[1].close()
+                        connection = None
+                    continue
+
+                timings.append(time.perf_counter() - start)
+                counts["requests"] += 1
+                if status != 200:
+                    counts["errors"] += 1
+
+            if connection is not None:
+                connection[1].close()
+
+        clients = [asyncio.ensure_future(client()) for _ in range(connections)]
+        while time.monotonic() < deadline:
+            peak_memory = max(peak_memory, get_tree_memory(pid))
+            await asyncio.sleep(0.5)
+        await asyncio.gather(*clients)
+
+        return counts["requests"], counts["errors"], timings, peak_memory
+
+    async def request(self, connection, path, headers):
+        """Send GET request on the connection and return status of the response.
+
+        Connection is read to its end if the server doesn't keep it alive.
+        """
+        reader, writer = connection
+        lines = [f"GET {path} HTTP/1.1", f"Host: {BENCHMARK_HOST}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        response_headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                response_headers[name.strip().lower()] = value.strip().lower()
+
+        if "content-length" in response_headers:
+            await reader.readexactly(int(response_headers["content-length"]))
+        if (
+            "content-length" not in response_headers
+            or response_headers.get("connection") == "close"
+        ):
+            await reader.read()
+
+        return int(status_line.split()[1])
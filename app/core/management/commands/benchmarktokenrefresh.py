@@ -0,0 +1,95 @@
+"""
+Command to benchmark refreshing tokens with and without revocation.
+"""
+import datetime
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from core.models import RevokedToken
+from users.revocation import RevocableRefreshToken, revoked_tokens
+from users.views import RefreshView
+
+
+class Command(BaseCommand):
+    help = """Measure throughput of rotating refresh tokens with revocation
+              of the used tokens and without it.
+              Everything runs in a transaction that is rolled back"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, help="Amount of refreshes", default=2000
+        )
+        parser.add_argument(
+            "--revoked",
+            type=int,
+            help="Amount of tokens revoked before measuring",
+            default=100000,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of revoked tokens inserted in one query",
+            default=10000,
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_revoked_tokens(
+                options["revoked"], max(options["batch_size"], 1)
+            )
+            user = get_user_model().objects.create(
+                email="benchmark@example.com", username="benchmark", password="!"
+            )
+            requests = max(options["requests"], 1)
+            self.measure("without revocation", TokenRefreshView, user, requests)
+            self.measure("with revocation", RefreshView, user, requests)
+            transaction.set_rollback(True)
+
+        revoked_tokens.clear()
+
+    def create_revoked_tokens(self, count, batch_size):
+        """Create tokens revoked until tomorrow."""
+        expires = now() + datetime.timedelta(days=1)
+        for start in range(0, count, batch_size):
+            end = min(start + batch_size, count)
+            RevokedToken.objects.bulk_create(
+                RevokedToken(jti=uuid.uuid4(), expires=expires)
+                for _ in range(start, end)
+            )
+
+        with connection.cursor() as cursor:
+            table = connection.ops.quote_name(RevokedToken._meta.db_table)
+            cursor.execute(f"ANALYZE {table}")
+
+    def measure(self, name, view_class, user, requests):
+        """Report refreshes per second and queries per refresh of a view."""
+        revoked_tokens.clear()
+        view = view_class.as_view()
+        factory = RequestFactory()
+        url = reverse("users:token_refresh")
+        refresh = str(RevocableRefreshToken.for_user(user))
+        revoked_tokens.sync()
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(requests):
+                request = factory.post(
+                    url, {"refresh": refresh}, content_type="application/json"
+                )
+                refresh = view(request).data["refresh"]
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{name}: {requests / elapsed:.0f} refreshes/s, "
+            f"{len(queries) / requests:.2f} queries per refresh"
+        )
@@ -0,0 +1,166 @@
+"""
+Command to import users from a CSV or JSON Lines file.
+"""
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+TEXT_FIELDS = ("email", "username", "password", "password_hash")
+
+
+def hash_password(password):
+    """Return hash of the password or None if it can't be hashed."""
+    try:
+        return make_password(password)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = """Import users from a CSV file with a header row or a JSON Lines file.
+              Every row has email, username and either password_hash
+              in Django's format or a raw password hashed on a pool of processes.
+              Users whose email is taken are skipped, so an interrupted import
+              can be run again"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the file with users")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Format of the file, guessed from its extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of users inserted in one query",
+            default=1000,
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Amount of processes hashing raw passwords",
+            default=os.cpu_count(),
+        )
+
+    def handle(self, *args, **options):
+        """Read the file in batches, hash raw passwords of a batch on the pool
+        and insert it with one query.
+
+        Only the batch and emails of existing users are held in memory.
+        """
+        path = options["path"]
+        file_format = options["format"]
+        if file_format is None:
+            file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        batch_size = max(options["batch_size"], 1)
+        processes = max(options["processes"] or 1, 1)
+        User = get_user_model()
+        emails = set(User.objects.values_list("email", flat=True).iterator())
+        self.counts = Counter()
+
+        try:
+            file = open(path, newline="", encoding="utf-8")
+        except OSError as error:
+            raise CommandError(f"Can't read {path}: {error}")
+
+        # Processes are only started once a raw password needs hashing.
+        with file, ProcessPoolExecutor(processes, initializer=django.setup) as pool:
+            rows = self.read_rows(file, file_format)
+            while batch := list(islice(rows, batch_size)):
+                users, passwords = self.build_users(batch, emails)
+                raw = [user for user in users if not user.password]
+                chunk_size = max(len(raw) // (processes * 4), 1)
+                hashes = pool.map(hash_password, passwords, chunksize=chunk_size)
+                for user, password_hash in zip(raw, hashes):
+                    user.password = password_hash
+                    if password_hash is None:
+                        self.stderr.write(f"Can't hash password of {user.email}")
+                        self.counts["invalid"] += 1
+                        emails.discard(user.email)
+
+                users = [user for user in users if user.password]
+                User.objects.bulk_create(users)
+                self.counts["imported"] += len(users)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {self.counts['imported']} users, "
+                f"skipped {self.counts['duplicate']} taken emails "
+                f"and {self.counts['invalid']} invalid rows"
+            )
+        )
+
+    def read_rows(self, file, file_format):
+        """Yield line numbers and rows of the file, None for unreadable rows."""
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+    def build_users(self, batch, emails):
+        """Return new users of the batch and raw passwords of users without hash.
+
+        Emails of returned users are added to emails.
+        """
+        User = get_user_model()
+        # Only validate fields read from the file, the rest have defaults.
+        unread_fields = [
+            field.name
+            for field in User._meta.fields
+            if field.name not in ("email", "username")
+        ]
+        users = []
+        passwords = []
+        for line_number, row in batch:
+            try:
+                if row is None:
+                    raise ValueError("Row isn't an object.")
+                for field in TEXT_FIELDS:
+                    if not isinstance(row.get(field, ""), str):
+                        raise ValueError(f"{field} isn't a string.")
+
+                password_hash = row.get("password_hash")
+                password = password_hash or row.get("password")
+                user = User.objects.build_user(
+                    row.get("email"), password, row.get("username")
+                )
+                user.clean_fields(exclude=unread_fields)
+                if password_hash:
+                    identify_hasher(password_hash)
+                    user.password = password_hash
+
+            except (ValueError, ValidationError) as error:
+                self.stderr.write(f"Line {line_number}: {error}")
+                self.counts["invalid"] += 1
+                continue
+
+            if user.email in emails:
+                self.counts["duplicate"] += 1
+                continue
+
+            emails.add(user.email)
+            users.append(user)
+            if not password_hash:
+                passwords.append(password)
+
+        return users, passwords
@@ -1,44 +1,171 @@
 """
 Command to get videos from Wersow's channel and add them to the database.
 """
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from django.core.management.base import BaseCommand
 
-from core.models import Video
-from core.utils import WersowChannel
+from core.models import ChannelCheckpoint, Video
+from core.utils import WersowChannel, get_video_data
 
 
 class Command(BaseCommand):
     help = "Adds Wersow's videos to the database"
 
     def add_arguments(self, parser):
-        """Specify how many videos should be added (all by default)."""
+        """Specify how many videos should be added (all by default)
+        and how they should be fetched."""
         parser.add_argument(
             "--limit", type=int, help="Amount of videos to add", default=float("inf")
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only read the channel until the last synced video, oldest first",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Ignore YouTube data cached by previous runs",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            help="Amount of videos fetched at the same time",
+            default=1,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of videos inserted in one query",
+            default=100,
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            help="Amount of retries of a failed fetch",
+            default=3,
+        )
+        parser.add_argument(
+            "--backoff",
+            type=float,
+            help="Seconds to wait before the first retry, doubled on every retry",
+            default=1.0,
+        )
 
     def handle(self, *args, **options):
-        """Iterate over Wersow's videos and add them to the database."""
+        """Fetch new Wersow's videos on a thread pool and add them to the database.
 
-        channel = WersowChannel()
+        Only the main thread writes to the database, in batches.
+        """
+        self.refresh = options["refresh"]
+        channel = WersowChannel(refresh=self.refresh)
         to_add_limit = options.get("limit")
+        jobs = max(options["jobs"], 1)
+        batch_size = max(options["batch_size"], 1)
+        self.retries = options["retries"]
+        self.backoff = options["backoff"]
         added_count = 0
+        failed_count = 0
+        batch = []
+        start = time.perf_counter()
+
+        if options["incremental"]:
+            listed_video_urls, new_video_urls = Video.objects.get_new_video_urls(
+                channel
+            )
+            # Oldest first, so stopping at a failure or the limit leaves no gap
+            # before the checkpoint.
+            to_fetch = iter(reversed(new_video_urls))
+        else:
+            listed_video_urls = channel.get_video_urls()
+            known_urls = set(Video.objects.values_list("url", flat=True))
+            new_video_urls = [
+                url for url in dict.fromkeys(listed_video_urls) if url not in known_urls
+            ]
+            to_fetch = iter(new_video_urls)
 
-        video_urls = channel.get_video_urls()
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # Fetched videos are written in the order they were submitted.
+            pending = deque()
 
-        for video_url in video_urls:
-            if added_count >= to_add_limit:
-                break
+            def submit_next():
+                """Start fetching next new video if limit allows it."""
+                if added_count + len(pending) >= to_add_limit:
+                    return
+                video_url = next(to_fetch, None)
+                if video_url is not None:
+                    future = executor.submit(self.fetch_video_data, video_url)
+                    pending.append((video_url, future))
 
-            is_video_new = not Video.objects.filter(url=video_url).exists()
-            if is_video_new:
-                video = Video.objects.add_video(video_url)
-                added_count += 1
-                self.stdout.write(f"Added {video.title}...")
+            for _ in range(jobs):
+                submit_next()
 
-        self.stdout.write(self.style.SUCCESS(f"Added {added_count} new videos"))
+            while pending:
+                video_url, future = pending.popleft()
+                try:
+                    video_data = future.result()
+                except Exception as error:
+                    failed_count += 1
+                    self.stderr.write(f"Failed to fetch {video_url}: {error}")
+                    if options["incremental"]:
+                        # Newer videos are left for the next run.
+                        for _, newer_future in pending:
+                            newer_future.cancel()
+                        break
+                else:
+                    batch.append(video_data)
+                    added_count += 1
+                    if len(batch) >= batch_size:
+                        self.write_batch(batch, added_count, start)
+                        batch = []
+                submit_next()
+
+        if batch:
+            self.write_batch(batch, added_count, start)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Added {added_count} new videos "
+                f"in {time.perf_counter() - start:.1f}s "
+                f"({self.throughput(added_count, start):.2f} videos/s)"
+            )
+        )
+        if failed_count:
+            self.stdout.write(self.style.WARNING(f"Failed {failed_count} videos"))
 
-        added_all = Video.objects.count() == len(video_urls)
-        if added_all:
+        if listed_video_urls:
+            ChannelCheckpoint.objects.advance_synced(
+                channel.channel_id, listed_video_urls
+            )
+        if added_count == len(new_video_urls):
             self.stdout.write(
                 self.style.SUCCESS("All Wersow's videos are in the database")
             )
+
+    def write_batch(self, batch, added_count, start):
+        """Insert a batch of fetched videos and report progress."""
+        Video.objects.add_fetched_videos(batch)
+        self.stdout.write(
+            f"Added {len(batch)} videos, {added_count} so far "
+            f"({self.throughput(added_count, start):.2f} videos/s)"
+        )
+
+    def fetch_video_data(self, video_url):
+        """Fetch data of a video, retrying with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                return get_video_data(video_url, refresh=self.refresh)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2**attempt)
+
+    @staticmethod
+    def throughput(count, start):
+        """Return amount of videos per second since start."""
+        elapsed = time.perf_counter() - start
+        return count / elapsed if elapsed else 0.0
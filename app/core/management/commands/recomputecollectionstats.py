@@ -0,0 +1,27 @@
+"""
+Command to recompute statistics of users' collections.
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import CollectionStats
+
+
+class Command(BaseCommand):
+    help = """Recompute statistics of every user's collection from collected videos,
+              repairing statistics that drifted"""
+
+    def add_arguments(self, parser):
+        """Specify how many users are recomputed at once."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Amount of users recomputed in one batch",
+            default=1000,
+        )
+
+    def handle(self, *args, **options):
+        count = CollectionStats.objects.recompute(
+            batch_size=max(options["batch_size"], 1)
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed statistics of {count} users"))
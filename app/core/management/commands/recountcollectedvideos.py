@@ -0,0 +1,16 @@
+"""
+Command to recount how many times every video was collected.
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import Video
+
+
+class Command(BaseCommand):
+    help = """Recount how many times every video was collected,
+              repairing counters that drifted"""
+
+    def handle(self, *args, **options):
+        count = Video.objects.recount_collected()
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired counters of {count} videos"))
@@ -0,0 +1,22 @@
+"""
+Command to schedule today's videos for the next days.
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import ScheduledVideo
+
+
+class Command(BaseCommand):
+    help = """Schedule today's videos for the next days
+              so no video repeats until every video was scheduled"""
+
+    def add_arguments(self, parser):
+        """Specify how many days ahead should be scheduled."""
+        parser.add_argument(
+            "--days", type=int, help="Amount of days to schedule", default=30
+        )
+
+    def handle(self, *args, **options):
+        entries = ScheduledVideo.objects.fill(options["days"])
+
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {len(entries)} new days"))
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-16 20:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_uservideorelation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledVideo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('cycle', models.PositiveIntegerField(default=0)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='core.video')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.1.13 on 2026-10-16 20:49
+
+from django.db import migrations, models
+
+
+def keep_latest_todays_video(apps, schema_editor):
+    """Leave only the latest today's video marked as today's."""
+    Video = apps.get_model('core', 'Video')
+    latest = Video.objects.filter(todays=True).order_by('-publish_date').first()
+    if latest:
+        Video.objects.filter(todays=True).exclude(pk=latest.pk).update(todays=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_scheduledvideo'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_todays_video, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='video',
+            constraint=models.UniqueConstraint(condition=models.Q(('todays', True)), fields=('todays',), name='unique_todays_video'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-16 20:50
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicated_videos(apps, schema_editor):
+    """Keep the oldest video for every url and move references to it."""
+    Video = apps.get_model('core', 'Video')
+    UserVideoRelation = apps.get_model('core', 'UserVideoRelation')
+    ScheduledVideo = apps.get_model('core', 'ScheduledVideo')
+
+    duplicated = (
+        Video.objects.values('url')
+        .annotate(count=Count('id'), kept_id=Min('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicated:
+        duplicates = Video.objects.filter(url=row['url']).exclude(pk=row['kept_id'])
+        UserVideoRelation.objects.filter(video__in=duplicates).update(
+            video_id=row['kept_id']
+        )
+        ScheduledVideo.objects.filter(video__in=duplicates).update(
+            video_id=row['kept_id']
+        )
+        duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_unique_todays_video'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scheduledvideo',
+            name='cycle',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(merge_duplicated_videos, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='video',
+            name='url',
+            field=models.URLField(unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='uservideorelation',
+            index=models.Index(fields=['user', '-collected'], name='collection_user_collected_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-16 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=64, unique=True)),
+                ('latest_video_id', models.CharField(max_length=32)),
+                ('synced', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
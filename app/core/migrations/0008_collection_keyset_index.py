@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_channelcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='uservideorelation',
+            name='collection_user_collected_idx',
+        ),
+        migrations.AddIndex(
+            model_name='uservideorelation',
+            index=models.Index(fields=['user', '-collected', '-id'], name='collection_user_collected_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:36
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicated_relations(apps, schema_editor):
+    """Keep the first time every user collected a video."""
+    UserVideoRelation = apps.get_model('core', 'UserVideoRelation')
+
+    duplicated = (
+        UserVideoRelation.objects.values('user', 'video')
+        .annotate(count=Count('id'), kept_id=Min('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicated:
+        UserVideoRelation.objects.filter(
+            user=row['user'], video=row['video']
+        ).exclude(pk=row['kept_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_collection_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicated_relations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='uservideorelation',
+            constraint=models.UniqueConstraint(fields=('user', 'video'), name='unique_collected_video'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:41
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def compute_collection_stats(apps, schema_editor):
+    """Compute statistics of every user from collected videos,
+    like CollectionStatsManager.recompute does."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserVideoRelation = apps.get_model("core", "UserVideoRelation")
+    CollectionStats = apps.get_model("core", "CollectionStats")
+
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        end = start + BATCH_SIZE
+        batch_ids = user_ids[start:end]
+        relations = UserVideoRelation.objects.filter(user_id__in=batch_ids)
+
+        stats = {user_id: CollectionStats(user_id=user_id) for user_id in batch_ids}
+        totals = relations.values("user_id").annotate(
+            count=Count("id"), first=Min("collected"), last=Max("collected")
+        )
+        for total in totals.order_by():
+            user_stats = stats[total["user_id"]]
+            user_stats.collected_count = total["count"]
+            user_stats.first_collected = total["first"]
+            user_stats.last_collected = total["last"]
+
+        dates = (
+            relations.values_list("user_id", "collected")
+            .distinct()
+            .order_by("user_id", "-collected")
+        )
+        streak_starts = {}
+        for user_id, collected in dates.iterator():
+            user_stats = stats[user_id]
+            if user_id not in streak_starts:
+                user_stats.streak = 1
+            elif streak_starts[user_id] == collected + datetime.timedelta(days=1):
+                user_stats.streak += 1
+            else:
+                streak_starts[user_id] = None
+                continue
+            streak_starts[user_id] = collected
+
+        CollectionStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0009_unique_collected_video"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectionStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="collection_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("collected_count", models.PositiveIntegerField(default=0)),
+                ("first_collected", models.DateField(null=True)),
+                ("last_collected", models.DateField(null=True)),
+                ("streak", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(compute_collection_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_collected_videos(apps, schema_editor):
+    """Count how many times every video was collected."""
+    Video = apps.get_model('core', 'Video')
+    UserVideoRelation = apps.get_model('core', 'UserVideoRelation')
+
+    Video.objects.update(
+        collected_count=Coalesce(
+            Subquery(
+                UserVideoRelation.objects.filter(video=OuterRef('pk'))
+                .order_by()
+                .values('video')
+                .annotate(count=Count('id'))
+                .values('count')
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_collectionstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='collected_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_collected_videos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['-collected_count', 'id'], name='video_collected_count_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_video_collected_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='collectionstats',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='uservideorelation',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='uservideorelation',
+            index=models.Index(fields=['user', 'version'], name='collection_user_version_idx'),
+        ),
+        migrations.AddField(
+            model_name='collectiontombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='collectiontombstone',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.video'),
+        ),
+        migrations.AddIndex(
+            model_name='collectiontombstone',
+            index=models.Index(fields=['user', 'version'], name='tombstone_user_version_idx'),
+        ),
+    ]
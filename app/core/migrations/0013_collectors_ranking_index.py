@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-16 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_collection_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collectionstats',
+            index=models.Index(fields=['-collected_count', 'user'], name='stats_collected_count_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_collectors_ranking_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['-publish_date', '-id'], name='video_publish_date_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.13 on 2026-10-16 23:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def index_titles(apps, schema_editor):
+    """Compute search vectors of titles of existing videos."""
+    Video = apps.get_model('core', 'Video')
+
+    Video.objects.update(
+        search_vector=SearchVector('title', config='polish_unaccent')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_catalog_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(
+            [
+                'CREATE TEXT SEARCH CONFIGURATION polish_unaccent (COPY = simple)',
+                'ALTER TEXT SEARCH CONFIGURATION polish_unaccent '
+                'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple',
+            ],
+            'DROP TEXT SEARCH CONFIGURATION polish_unaccent',
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(index_titles, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fastupdate=False, fields=['search_vector'], name='video_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=django.contrib.postgres.indexes.GinIndex(fastupdate=False, fields=['title'], name='video_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -2,27 +2,64 @@
 Database models.
 """
 import datetime
-from random import randint
-from pytube import YouTube
+import math
+from random import choice, randint, sample, shuffle
+from typing import List, Tuple
 
-from django.contrib.auth import get_user_model
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
-from django.db import models
-from django.db.models.aggregates import Max
-from django.utils.timezone import now
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.core.cache import cache
+from django.db import connections, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import localdate, now
+
+from .cache import (
+    VIDEO_IDS_KEY,
+    VIDEO_IDS_TTL,
+    bump_todays_video_version,
+    clear_video_ids,
+)
+from .hashing import password_hashing
+from .utils import WersowChannel, NoVideosException, get_video_data, get_video_id
 
-from .utils import WersowChannel, NoVideosException
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+# Password in credentials sent with user_login_failed, like authenticate sends.
+CLEANSED_PASSWORD = "********************"
 
 
 class UserManager(BaseUserManager):
     """Manager for users."""
 
-    def create_user(self, email, password=None, username=None, **extra_fields):
-        """Create, save and return a new user."""
+    def build_user(self, email, password=None, username=None, **extra_fields):
+        """Return a new unsaved user without a password set."""
 
         if not email:
             raise ValueError("User must have an email address.")
@@ -31,24 +68,67 @@ class UserManager(BaseUserManager):
         if not username:
             raise ValueError("User must have a username.")
 
-        user = self.model(
+        return self.model(
             email=self.normalize_email(email), username=username, **extra_fields
         )
+
+    def create_user(self, email, password=None, username=None, **extra_fields):
+        """Create, save and return a new user."""
+        user = self.build_user(email, password, username, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
 
         return user
 
+    async def acreate_user(self, email, password=None, username=None, **extra_fields):
+        """Create, save and return a new user, hashing the password on the pool."""
+        user = self.build_user(email, password, username, **extra_fields)
+        user.password = await password_hashing.make_password(password)
+        await sync_to_async(user.save)(using=self._db)
+
+        return user
+
+    async def aauthenticate(self, request, email, password):
+        """Return active user with the email and password or None
+        like authenticate, checking the password on the pool.
+
+        It does what ModelBackend does: failed attempts send user_login_failed
+        and outdated hashes are upgraded. Other authentication backends
+        only run through authenticate, so with them it runs in a thread.
+        """
+        if list(settings.AUTHENTICATION_BACKENDS) != [MODEL_BACKEND]:
+            return await sync_to_async(authenticate)(
+                request, email=email, password=password
+            )
+
+        user = await self.filter(email=email).afirst()
+        if user is None:
+            # Hash anyway so the response time doesn't tell the email is free.
+            await password_hashing.make_password(password)
+        else:
+            matches, outdated = await password_hashing.verify_password(
+                password, user.password
+            )
+            if matches and user.is_active:
+                if outdated:
+                    user.password = await password_hashing.make_password(password)
+                    await sync_to_async(user.save)(update_fields=["password"])
+                return user
+
+        await sync_to_async(user_login_failed.send)(
+            sender=__name__,
+            credentials={"email": email, "password": CLEANSED_PASSWORD},
+            request=request,
+        )
+        return None
+
     def create_superuser(self, email, password=None, username="admin", **extra_fields):
         """Create, save and return a new superuser."""
-        user = self.create_user(
+        extra_fields.update(is_staff=True, is_superuser=True)
+
+        return self.create_user(
             email=email, password=password, username=username, **extra_fields
         )
-        user.is_staff = True
-        user.is_superuser = True
-        user.save(using=self._db)
-
-        return user
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -66,61 +146,351 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
 
+class ClaimsUser(User):
+    """User built from claims of a verified access token without a query.
+
+    Only fields kept in the token are set, so it can't be saved.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise NotImplementedError("Users built from token claims can't be saved.")
+
+    def delete(self, *args, **kwargs):
+        raise NotImplementedError("Users built from token claims can't be deleted.")
+
+
+RANDOM_VIDEO_ATTEMPTS = 3
+# Sampled candidates of a random uncollected video are sized
+# so that this many of them are expected to be uncollected.
+RANDOM_UNCOLLECTED_EXPECTED_HITS = 5
+RANDOM_UNCOLLECTED_MAX_SAMPLE = 1000
+TODAYS_VIDEO_LOCK_ID = 1_868_128_309
+# Text search configuration created by migrations: simple dictionary,
+# which doesn't stem, preceded by unaccent, so "plec" matches "PŁEĆ".
+SEARCH_CONFIG = "polish_unaccent"
+INSERT_VIDEO_FIELDS = [
+    "title",
+    "url",
+    "thumbnail_url",
+    "publish_date",
+    "todays",
+    "collected_count",
+]
+INSERT_VIDEOS_SQL = """INSERT INTO core_video ({columns})
+VALUES {rows}
+ON CONFLICT (url) DO NOTHING
+RETURNING id"""
+
+
 class VideoManager(models.Manager):
     """Manager for videos."""
 
+    def ids(self):
+        """Return cached list of ids of all videos."""
+        ids = cache.get(VIDEO_IDS_KEY)
+        if ids is None:
+            ids = list(self.values_list("id", flat=True))
+            cache.set(VIDEO_IDS_KEY, ids, timeout=VIDEO_IDS_TTL)
+
+        return ids
+
     def random(self):
-        """Return a random video or None if there are no videos."""
-        if not Video.objects.exists():
+        """Return a random video or raise NoVideosException if there are no videos.
+
+        Picks an id from the cached list of ids, so it takes one query
+        as long as the list is up to date. Stale list is refreshed
+        and the number of queries stays bounded.
+        """
+        for _ in range(RANDOM_VIDEO_ATTEMPTS):
+            ids = self.ids()
+            if not ids:
+                raise NoVideosException()
+
+            video = self.filter(pk=choice(ids)).first()
+            if video:
+                return video
+
+            clear_video_ids()
+
+        video = self.order_by("?").first()
+        if video is None:
             raise NoVideosException()
 
-        max_id = self.all().aggregate(max_id=Max("id"))["max_id"]
-        if max_id:
-            while True:
-                pk = randint(1, max_id)
-                video = self.filter(pk=pk).first()
+        return video
+
+    def random_uncollected(self, user):
+        """Return a random video the user hasn't collected
+        or None if they collected every video.
+
+        Candidates are sampled from the cached list of ids and checked
+        against the collection in one query. Amount of candidates grows with
+        the part of catalog that is collected, so a few of them are expected
+        to be uncollected. Only when sampling misses or almost every video
+        is collected, uncollected videos are found with an anti-join
+        over the whole catalog.
+        """
+        ids = self.ids()
+        if not ids:
+            raise NoVideosException()
+
+        uncollected = self.filter(
+            ~Exists(UserVideoRelation.objects.filter(user=user, video=OuterRef("pk")))
+        )
+        collected_count = CollectionStats.objects.for_user(user).collected_count
+        remaining = len(ids) - collected_count
+        if remaining > 0:
+            sample_size = math.ceil(
+                len(ids) / remaining * RANDOM_UNCOLLECTED_EXPECTED_HITS
+            )
+            if sample_size <= RANDOM_UNCOLLECTED_MAX_SAMPLE:
+                candidates = sample(ids, min(sample_size, len(ids)))
+                video = uncollected.filter(pk__in=candidates).order_by("?").first()
                 if video:
                     return video
 
+        return uncollected.order_by("?").first()
+
     def set_random_video_as_todays(self):
         """Set a random video as todays and return it."""
         random_video = self.random()
         random_video.todays = True
         random_video.save(using=self._db)
+        transaction.on_commit(bump_todays_video_version, using=self.db)
         return random_video
 
+    def lock_todays(self):
+        """Wait until no one else changes today's video
+        till the end of current transaction."""
+        with connections[self.db].cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [TODAYS_VIDEO_LOCK_ID])
+
+    def mark_todays(self, video_id: int):
+        """Mark the video as today's and unmark the previous one.
+
+        The caller holds the today's video lock.
+        """
+        self.filter(todays=True).exclude(pk=video_id).update(todays=False)
+        self.filter(pk=video_id, todays=False).update(todays=True)
+
     def todays(self):
-        """Return latest today's video or None if there is no today's video."""
-        todays_videos = self.filter(todays=True).order_by("-publish_date")
-        if todays_videos:
-            return todays_videos[0]
+        """Return today's video.
 
-        return self.set_random_video_as_todays()
+        Video scheduled for today is returned, marked as today's by
+        the first request of the day, so later requests write nothing.
+        Without schedule video marked as today's is returned
+        or a random one is marked if there is no today's video.
+        Only one request marks a video, the others wait for it and reuse it.
+        """
+        scheduled = (
+            ScheduledVideo.objects.select_related("video")
+            .filter(date=localdate())
+            .first()
+        )
+        if scheduled and scheduled.video.todays:
+            return scheduled.video
+
+        if scheduled is None:
+            todays_video = self.filter(todays=True).first()
+            if todays_video:
+                return todays_video
+
+        with transaction.atomic(using=self.db):
+            self.lock_todays()
+            scheduled = (
+                ScheduledVideo.objects.select_related("video")
+                .filter(date=localdate())
+                .first()
+            )
+            if scheduled:
+                self.mark_todays(scheduled.video_id)
+                scheduled.video.todays = True
+                return scheduled.video
+
+            todays_video = self.filter(todays=True).first()
+            if todays_video:
+                return todays_video
+
+            return self.set_random_video_as_todays()
 
     def add_video(self, video_url: str):
         """Add a video from url."""
         if type(video_url) != str:
             raise TypeError(f"{video_url} is not a string")
 
-        video = YouTube(video_url)
-        return self.create(
-            url=video_url,
-            title=video.title,
-            thumbnail_url=video.thumbnail_url,
-            publish_date=video.publish_date.date(),
+        return self.add_fetched_video(get_video_data(video_url))
+
+    def add_fetched_video(self, video_data: dict):
+        """Add a video from data returned by get_video_data."""
+        video = self.create(**video_data)
+        ScheduledVideo.objects.splice(video)
+        self.index_titles([video.pk])
+        return video
+
+    def add_fetched_videos(self, videos_data: List[dict]):
+        """Add videos from data returned by get_video_data in one insert.
+
+        Videos that are already in database are skipped, only the inserted ones
+        are scheduled and indexed. Return ids of inserted videos.
+        """
+        if not videos_data:
+            return []
+
+        fields = [self.model._meta.get_field(name) for name in INSERT_VIDEO_FIELDS]
+        connection = connections[self.db]
+        params = []
+        for video_data in videos_data:
+            video = self.model(**video_data)
+            params += [
+                field.get_db_prep_save(getattr(video, field.attname), connection)
+                for field in fields
+            ]
+        row = "(" + ", ".join(["%s"] * len(fields)) + ")"
+        sql = INSERT_VIDEOS_SQL.format(
+            columns=", ".join(field.column for field in fields),
+            rows=", ".join([row] * len(videos_data)),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            video_ids = [video_id for video_id, in cursor.fetchall()]
+
+        if video_ids:
+            clear_video_ids()
+            ScheduledVideo.objects.splice_many(video_ids)
+            self.index_titles(video_ids)
+
+        return video_ids
+
+    def index_titles(self, video_ids=None):
+        """Update search vectors of titles of videos, all of them by default."""
+        videos = self.all() if video_ids is None else self.filter(pk__in=video_ids)
+        videos.update(search_vector=SearchVector("title", config=SEARCH_CONFIG))
+
+    def search(self, query: str):
+        """Return videos with titles matching query, the best matches first.
+
+        Titles containing words of the query are found with full text search,
+        which ignores Polish diacritics. Titles with words similar to the query
+        are found with trigrams, so typos are tolerated too.
+        Both conditions are answered by GIN indexes.
+        """
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        rank = SearchRank(F("search_vector"), search_query) + TrigramWordSimilarity(
+            query, "title"
+        )
+        return (
+            self.filter(
+                Q(search_vector=search_query) | Q(title__trigram_word_similar=query)
+            )
+            .annotate(rank=rank)
+            .order_by(F("rank").desc(nulls_last=True), "id")
         )
 
     def change_todays_video(self):
-        """Change today's video to another one."""
-        old_todays = self.filter(todays=True)
+        """Change today's video to another one.
 
-        for video in old_todays:
-            video.todays = False
-            video.save(using=self._db)
+        If the schedule covers today, today's entry is changed
+        and its video is marked as today's.
+        """
+        with transaction.atomic(using=self.db):
+            self.lock_todays()
+            new_todays = ScheduledVideo.objects.change_todays()
+            if new_todays is not None:
+                self.mark_todays(new_todays.pk)
+                new_todays.todays = True
+            else:
+                self.filter(todays=True).update(todays=False)
+                new_todays = self.set_random_video_as_todays()
 
-        new_todays = self.set_random_video_as_todays()
         return new_todays
 
+    def most_collected(self):
+        """Return videos from the most collected one."""
+        return self.order_by("-collected_count", "id")
+
+    def count_collected(self, video_ids, change: int = 1):
+        """Add change to collected counters of videos."""
+        self.filter(id__in=video_ids).update(
+            collected_count=Greatest(F("collected_count") + change, 0)
+        )
+
+    def recount_collected(self) -> int:
+        """Recompute collected counters that drifted and return amount of them."""
+        collected_count = Coalesce(
+            Subquery(
+                UserVideoRelation.objects.filter(video=OuterRef("pk"))
+                .order_by()
+                .values("video")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        return (
+            self.annotate(actual_count=collected_count)
+            .exclude(collected_count=F("actual_count"))
+            .update(collected_count=collected_count)
+        )
+
+    def get_new_video_urls(self, channel: WersowChannel) -> Tuple[List[str], List[str]]:
+        """Return urls of channel's videos listed since the last sync
+        and urls of those not in database, both the newest first.
+
+        Listing is read from the newest video and stops at the checkpoint,
+        so only pages listed since the last sync are fetched. Known videos
+        are skipped rather than ending the listing, because a video that
+        failed to sync can be listed before them.
+        """
+        checkpoint = ChannelCheckpoint.objects.filter(
+            channel_id=channel.channel_id
+        ).first()
+        listed_video_urls = []
+        for video_url in channel.iter_video_urls():
+            if checkpoint and get_video_id(video_url) == checkpoint.latest_video_id:
+                break
+            listed_video_urls.append(video_url)
+
+        known_urls = set(
+            self.filter(url__in=listed_video_urls).values_list("url", flat=True)
+        )
+        new_video_urls = [
+            video_url
+            for video_url in dict.fromkeys(listed_video_urls)
+            if video_url not in known_urls
+        ]
+        return listed_video_urls, new_video_urls
+
+    def sync_new_videos(self, refresh: bool = False):
+        """Add every video published since the last sync and return them.
+
+        Videos are added from the oldest one. If fetching a video fails,
+        videos fetched before it are added, the checkpoint stays before it
+        and the error is raised.
+        The listing is always read live, set refresh to also ignore
+        data of videos cached by previous runs.
+        """
+        channel = WersowChannel(refresh=refresh)
+        listed_video_urls, new_video_urls = self.get_new_video_urls(channel)
+        if not listed_video_urls:
+            return []
+
+        videos_data = []
+        try:
+            for video_url in reversed(new_video_urls):
+                videos_data.append(get_video_data(video_url, refresh=refresh))
+        finally:
+            if videos_data:
+                self.add_fetched_videos(videos_data)
+            ChannelCheckpoint.objects.advance_synced(
+                channel.channel_id, listed_video_urls
+            )
+
+        if not new_video_urls:
+            return []
+        return list(self.filter(url__in=new_video_urls).order_by("-publish_date"))
+
     def add_latest_video(self):
         """If Wersow published a new video - add it to database."""
         channel = WersowChannel()
@@ -135,17 +505,383 @@ class Video(models.Model):
     """Video in database."""
 
     title = models.CharField(max_length=100)
-    url = models.URLField()
+    url = models.URLField(unique=True)
     thumbnail_url = models.URLField()
     publish_date = models.DateField()
     todays = models.BooleanField(default=False)
+    collected_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = VideoManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-collected_count", "id"], name="video_collected_count_idx"
+            ),
+            models.Index(
+                fields=["-publish_date", "-id"], name="video_publish_date_idx"
+            ),
+            # Videos are added rarely, so entries go straight to the index
+            # instead of a pending list that every search would scan.
+            GinIndex(
+                fields=["search_vector"],
+                name="video_search_vector_idx",
+                fastupdate=False,
+            ),
+            GinIndex(
+                fields=["title"],
+                name="video_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+                fastupdate=False,
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["todays"],
+                condition=models.Q(todays=True),
+                name="unique_todays_video",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class ChannelCheckpointManager(models.Manager):
+    """Manager for channel checkpoints."""
+
+    def advance(self, channel_id: str, video_url: str):
+        """Remember video as the newest synced video of the channel."""
+        checkpoint, _ = self.update_or_create(
+            channel_id=channel_id,
+            defaults={"latest_video_id": get_video_id(video_url)},
+        )
+        return checkpoint
+
+    def advance_synced(self, channel_id: str, video_urls: List[str]):
+        """Remember the newest of videos listed from the newest one
+        that has no video missing from database before it.
+
+        Return the checkpoint or None if the oldest video is missing.
+        """
+        known_urls = set(
+            Video.objects.filter(url__in=video_urls).values_list("url", flat=True)
+        )
+        synced_url = None
+        for video_url in reversed(video_urls):
+            if video_url not in known_urls:
+                break
+            synced_url = video_url
+
+        if synced_url is None:
+            return None
+        return self.advance(channel_id, synced_url)
+
+
+class ChannelCheckpoint(models.Model):
+    """The newest video of a channel that was synced."""
+
+    channel_id = models.CharField(max_length=64, unique=True)
+    latest_video_id = models.CharField(max_length=32)
+    synced = models.DateTimeField(auto_now=True)
+
+    objects = ChannelCheckpointManager()
+
+    def __str__(self):
+        return f"{self.channel_id} synced up to {self.latest_video_id}"
+
+
+class ScheduledVideoManager(models.Manager):
+    """Manager for today's videos schedule."""
+
+    def fill(self, days: int):
+        """Schedule today's videos for the next days and return new entries.
+
+        Videos are scheduled in shuffled cycles,
+        so no video repeats until every video was scheduled.
+        """
+        today = localdate()
+        end = today + datetime.timedelta(days=days)
+        last = self.order_by("-date").first()
+
+        if last:
+            next_date = max(today, last.date + datetime.timedelta(days=1))
+            cycle = last.cycle
+            last_video_id = last.video_id
+        else:
+            next_date = today
+            cycle = 0
+            last_video_id = None
+
+        scheduled_ids = set(self.filter(cycle=cycle).values_list("video_id", flat=True))
+        video_ids = list(Video.objects.values_list("id", flat=True))
+        pool = [video_id for video_id in video_ids if video_id not in scheduled_ids]
+        shuffle(pool)
+
+        entries = []
+        while next_date < end and video_ids:
+            if not pool:
+                cycle += 1
+                pool = video_ids[:]
+                shuffle(pool)
+                if len(pool) > 1 and pool[-1] == last_video_id:
+                    pool[0], pool[-1] = pool[-1], pool[0]
+
+            last_video_id = pool.pop()
+            entries.append(
+                self.model(date=next_date, video_id=last_video_id, cycle=cycle)
+            )
+            next_date += datetime.timedelta(days=1)
+
+        with transaction.atomic(using=self.db):
+            if entries and entries[0].date == today:
+                Video.objects.lock_todays()
+                Video.objects.mark_todays(entries[0].video_id)
+            self.bulk_create(entries)
+        if entries:
+            bump_todays_video_version()
+
+        return entries
+
+    def change_todays(self):
+        """Schedule another video for today and return it.
+
+        Today's video swaps places with a random later video of the same cycle,
+        so no video repeats until every video was scheduled. On the last day
+        of a cycle any other video is scheduled. None is returned
+        if nothing is scheduled for today.
+        """
+        todays_entry = self.select_for_update().filter(date=localdate()).first()
+        if todays_entry is None:
+            return None
+
+        later_entry = (
+            self.select_for_update()
+            .filter(date__gt=todays_entry.date, cycle=todays_entry.cycle)
+            .order_by("?")
+            .first()
+        )
+        if later_entry:
+            todays_entry.video_id, later_entry.video_id = (
+                later_entry.video_id,
+                todays_entry.video_id,
+            )
+            self.bulk_update([todays_entry, later_entry], ["video"])
+        else:
+            video_ids = [
+                video_id
+                for video_id in Video.objects.ids()
+                if video_id != todays_entry.video_id
+            ]
+            if video_ids:
+                todays_entry.video_id = choice(video_ids)
+                todays_entry.save(update_fields=["video"])
+
+        transaction.on_commit(bump_todays_video_version, using=self.db)
+        return todays_entry.video
+
+    def splice(self, video):
+        """Put a new video at a random place of the unused part of schedule."""
+        self.splice_many([video.id])
+
+    def splice_many(self, video_ids):
+        """Put new videos at random places of the unused part of schedule.
+
+        Entry that was at a chosen place is moved to the end of schedule,
+        so the unused part stays a random permutation.
+        """
+        last = self.order_by("-date").first()
+        if last is None:
+            return
+
+        tail = list(
+            self.filter(date__gt=localdate(), cycle=last.cycle).order_by("date")
+        )
+        if not tail:
+            return
+
+        next_date = last.date + datetime.timedelta(days=1)
+        new_entries = []
+        moved_entries = {}
+        for video_id in video_ids:
+            entry = self.model(date=next_date, video_id=video_id, cycle=last.cycle)
+            position = randint(0, len(tail))
+            if position < len(tail):
+                swapped = tail[position]
+                entry.video_id, swapped.video_id = swapped.video_id, video_id
+                if swapped.pk:
+                    moved_entries[swapped.pk] = swapped
+
+            tail.append(entry)
+            new_entries.append(entry)
+            next_date += datetime.timedelta(days=1)
+
+        self.bulk_create(new_entries)
+        self.bulk_update(moved_entries.values(), ["video"])
+
+
+class ScheduledVideo(models.Model):
+    """Video scheduled as today's video on a date."""
+
+    date = models.DateField(unique=True)
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="schedule")
+    cycle = models.PositiveIntegerField(default=0, db_index=True)
+
+    objects = ScheduledVideoManager()
+
+    def __str__(self):
+        return f"{self.video} on {self.date}"
+
+
+COLLECT_VIDEO_SQL = """WITH inserted AS (
+    INSERT INTO core_uservideorelation (user_id, video_id, collected, version)
+    SELECT %(user_id)s, id, %(collected)s, 0 FROM core_video WHERE id = %(video_id)s
+    ON CONFLICT (user_id, video_id) DO NOTHING
+    RETURNING id, user_id, video_id, collected
+)
+SELECT id, user_id, video_id, collected, true AS created FROM inserted
+UNION ALL
+SELECT id, user_id, video_id, collected, false AS created
+FROM core_uservideorelation
+WHERE user_id = %(user_id)s AND video_id = %(video_id)s"""
+
+COLLECT_VIDEOS_SQL = """INSERT INTO core_uservideorelation
+    (user_id, video_id, collected, version)
+SELECT %(user_id)s, id, %(collected)s, 0 FROM core_video
+WHERE id = ANY(%(video_ids)s)
+ON CONFLICT (user_id, video_id) DO NOTHING
+RETURNING video_id"""
+
+
+class UserVideoRelationManager(models.Manager):
+    """Manager for collected videos."""
+
+    def collect(self, user, video_id: int):
+        """Add a video to user's collection in one query and return the relation.
+
+        Relation that already exists is returned instead of a new one,
+        relation.created tells which one it is.
+        None is returned if there is no video with video_id.
+        """
+        params = {
+            "user_id": user.pk,
+            "video_id": video_id,
+            "collected": self.model._meta.get_field("collected").get_default(),
+        }
+        with transaction.atomic(using=self.db, savepoint=False):
+            relation = next(iter(self.raw(COLLECT_VIDEO_SQL, params)), None)
+            if relation is None and Video.objects.filter(id=video_id).exists():
+                # Relation was added by a concurrent request after this query started.
+                relation = next(iter(self.raw(COLLECT_VIDEO_SQL, params)), None)
+
+            if relation is not None and relation.created:
+                CollectionStats.objects.record_collected(user.pk, 1, relation.collected)
+                Video.objects.count_collected([video_id])
+                self.filter(id=relation.id).update(
+                    version=CollectionStats.objects.version_of(user.pk)
+                )
+
+        return relation
+
+    async def acollect(self, user, video_id: int):
+        """Add a video to user's collection like collect without blocking
+        the event loop.
+
+        The async ORM can't run transactions, so collect runs in a thread.
+        """
+        return await sync_to_async(self.collect)(user, video_id)
+
+    def uncollect(self, user, video_id: int) -> bool:
+        """Remove a video from user's collection.
+
+        Return False if the video wasn't collected.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            relation = self.filter(user=user, video_id=video_id).first()
+            if relation is None:
+                return False
+
+            relation.delete()
+            CollectionStats.objects.record_uncollected(user.pk, relation.collected)
+            Video.objects.count_collected([video_id], -1)
+            CollectionTombstone.objects.create(
+                user=user,
+                video_id=video_id,
+                version=CollectionStats.objects.version_of(user.pk),
+            )
+
+        return True
+
+    def collect_many(self, user, video_ids: List[int]) -> dict:
+        """Add videos to user's collection and return status of every video id.
+
+        Status is "collected", "already_collected" or "not_found".
+        Only relations inserted by this call are counted and reported
+        as collected, so a video collected concurrently isn't counted twice.
+        Every batch takes the same amount of queries regardless of its size.
+        """
+        existing_ids = set(
+            Video.objects.filter(id__in=video_ids).values_list("id", flat=True)
+        )
+        params = {
+            "user_id": user.pk,
+            "video_ids": list(existing_ids),
+            "collected": self.model._meta.get_field("collected").get_default(),
+        }
+        inserted_ids = set()
+        with transaction.atomic(using=self.db, savepoint=False):
+            if existing_ids:
+                with connections[self.db].cursor() as cursor:
+                    cursor.execute(COLLECT_VIDEOS_SQL, params)
+                    inserted_ids = {video_id for video_id, in cursor.fetchall()}
+
+            if inserted_ids:
+                CollectionStats.objects.record_collected(
+                    user.pk, len(inserted_ids), params["collected"]
+                )
+                Video.objects.count_collected(inserted_ids)
+                self.filter(user=user, video_id__in=inserted_ids).update(
+                    version=CollectionStats.objects.version_of(user.pk)
+                )
+
+        statuses = {}
+        for video_id in video_ids:
+            if video_id in inserted_ids:
+                statuses[video_id] = "collected"
+            elif video_id in existing_ids:
+                statuses[video_id] = "already_collected"
+            else:
+                statuses[video_id] = "not_found"
+
+        return statuses
+
+    def changed_since(self, user, version: int):
+        """Return relations added to user's collection after version
+        and ids of videos removed from it after version."""
+        added, removed = self.changes_since(user, version)
+        return added, list(removed)
+
+    async def achanged_since(self, user, version: int):
+        """Return relations added and ids of videos removed after version
+        like changed_since, reading them with the async ORM."""
+        added, removed = self.changes_since(user, version)
+        added = [relation async for relation in added]
+        return added, [video_id async for video_id in removed]
+
+    def changes_since(self, user, version: int):
+        """Return queries of relations added to user's collection after version
+        and of ids of videos removed from it after version."""
+        added = self.filter(user=user, version__gt=version).select_related("video")
+        removed = (
+            CollectionTombstone.objects.filter(user=user, version__gt=version)
+            .exclude(video__in=self.filter(user=user).values("video"))
+            .values_list("video_id", flat=True)
+            .distinct()
+        )
+        return added.order_by("version", "id"), removed
+
+
 class UserVideoRelation(models.Model):
     """Model to store videos collected by user."""
 
@@ -156,6 +892,247 @@ class UserVideoRelation(models.Model):
         Video, on_delete=models.CASCADE, related_name="collection"
     )
     collected = models.DateField(default=datetime.date.today)
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = UserVideoRelationManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "video"], name="unique_collected_video"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-collected", "-id"],
+                name="collection_user_collected_idx",
+            ),
+            models.Index(
+                fields=["user", "version"], name="collection_user_version_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} collected {self.video} on {self.collected}"
+
+
+class CollectionTombstone(models.Model):
+    """Video removed from user's collection, kept for syncing clients."""
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="tombstones"
+    )
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="+")
+    version = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "version"], name="tombstone_user_version_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} removed {self.video_id} in version {self.version}"
+
+
+class CollectionStatsManager(models.Manager):
+    """Manager for statistics of collections."""
+
+    def for_user(self, user):
+        """Return statistics of user's collection, computing them if missing."""
+        stats = self.filter(user=user).first()
+        if stats is None:
+            self.recompute(user_ids=[user.pk])
+            stats = self.get(user=user)
+
+        return stats
+
+    async def afor_user(self, user):
+        """Return statistics of user's collection like for_user, reading
+        them with the async ORM."""
+        stats = await self.filter(user=user).afirst()
+        if stats is None:
+            stats = await sync_to_async(self.for_user)(user)
+
+        return stats
+
+    def ranked(self):
+        """Return statistics of users in the collectors ranking."""
+        return self.filter(collected_count__gt=0)
+
+    def version_of(self, user_id: int):
+        """Return subquery of user's collection version.
+
+        Used after a change of the collection in the same transaction,
+        it gives the version of that change.
+        """
+        return Subquery(self.filter(user_id=user_id).values("version")[:1])
+
+    def bump_version(self, user_id: int):
+        """Mark that user's collection changed."""
+        self.filter(user_id=user_id).update(version=F("version") + 1)
+
+    def forget_ranks(self):
+        """Make this worker load the collectors ranking again
+        once the current transaction commits."""
+        from core.leaderboard import leaderboard
+
+        transaction.on_commit(leaderboard.clear, using=self.db)
+
+    def record_collected(self, user_id: int, count: int, date: datetime.date):
+        """Count videos collected by user on date and bump collection version."""
+        self.forget_ranks()
+        updated = self.filter(user_id=user_id).update(
+            collected_count=F("collected_count") + count,
+            first_collected=Coalesce("first_collected", Value(date)),
+            streak=Case(
+                When(last_collected=date, then=F("streak")),
+                When(
+                    last_collected=date - datetime.timedelta(days=1),
+                    then=F("streak") + 1,
+                ),
+                default=Value(1),
+            ),
+            last_collected=date,
+            version=F("version") + 1,
+        )
+        if not updated:
+            self.recompute(user_ids=[user_id])
+            self.bump_version(user_id)
+
+    def record_uncollected(self, user_id: int, date: datetime.date):
+        """Stop counting a video collected on date and bump collection version.
+
+        Dates and streak are recomputed only if the video could change them.
+        """
+        self.forget_ranks()
+        stats = self.filter(user_id=user_id).first()
+        if stats is not None and stats.first_collected:
+            streak_start = stats.last_collected - datetime.timedelta(
+                days=stats.streak - 1
+            )
+            if stats.first_collected < date < streak_start:
+                self.filter(user_id=user_id).update(
+                    collected_count=Greatest(F("collected_count") - 1, 0),
+                    version=F("version") + 1,
+                )
+                return
+
+        self.recompute(user_ids=[user_id])
+        self.bump_version(user_id)
+
+    def recompute(self, user_ids=None, batch_size: int = 1000) -> int:
+        """Recompute statistics from collected videos and return amount of users.
+
+        Users are processed in batches, each batch takes three queries.
+        """
+        users = get_user_model().objects.order_by("id")
+        if user_ids is not None:
+            users = users.filter(id__in=user_ids)
+
+        user_ids = list(users.values_list("id", flat=True))
+        for start in range(0, len(user_ids), batch_size):
+            end = start + batch_size
+            batch_ids = user_ids[start:end]
+            relations = UserVideoRelation.objects.filter(user_id__in=batch_ids)
+
+            stats = {user_id: self.model(user_id=user_id) for user_id in batch_ids}
+            totals = relations.values("user_id").annotate(
+                count=Count("id"), first=Min("collected"), last=Max("collected")
+            )
+            for total in totals.order_by():
+                user_stats = stats[total["user_id"]]
+                user_stats.collected_count = total["count"]
+                user_stats.first_collected = total["first"]
+                user_stats.last_collected = total["last"]
+
+            dates = (
+                relations.values_list("user_id", "collected")
+                .distinct()
+                .order_by("user_id", "-collected")
+            )
+            streak_starts = {}
+            for user_id, collected in dates.iterator():
+                user_stats = stats[user_id]
+                if user_id not in streak_starts:
+                    user_stats.streak = 1
+                elif streak_starts[user_id] == collected + datetime.timedelta(days=1):
+                    user_stats.streak += 1
+                else:
+                    streak_starts[user_id] = None
+                    continue
+                streak_starts[user_id] = collected
+
+            self.bulk_create(
+                stats.values(),
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=[
+                    "collected_count",
+                    "first_collected",
+                    "last_collected",
+                    "streak",
+                ],
+            )
+
+        return len(user_ids)
+
+
+class CollectionStats(models.Model):
+    """Statistics of videos collected by a user."""
+
+    user = models.OneToOneField(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="collection_stats",
+    )
+    collected_count = models.PositiveIntegerField(default=0)
+    first_collected = models.DateField(null=True)
+    last_collected = models.DateField(null=True)
+    streak = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = CollectionStatsManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-collected_count", "user"], name="stats_collected_count_idx"
+            ),
+        ]
+
+    @property
+    def current_streak(self) -> int:
+        """Days in a row with a collected video, ending today or yesterday."""
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        if self.last_collected and self.last_collected >= yesterday:
+            return self.streak
+        return 0
+
+    def __str__(self):
+        return f"{self.user} collected {self.collected_count} videos"
+
+
+class RevokedTokenManager(models.Manager):
+    """Manager for revoked tokens."""
+
+    def revoke(self, jti: str, expires: datetime.datetime):
+        """Remember token as revoked until it expires."""
+        self.bulk_create([self.model(jti=jti, expires=expires)], ignore_conflicts=True)
+
+    def prune(self) -> int:
+        """Forget tokens that expired, they are refused anyway."""
+        deleted, _ = self.filter(expires__lte=now()).delete()
+        return deleted
+
+
+class RevokedToken(models.Model):
+    """Refresh token that can't be used anymore."""
+
+    jti = models.UUIDField(unique=True)
+    expires = models.DateTimeField(db_index=True)
+
+    objects = RevokedTokenManager()
+
+    def __str__(self):
+        return f"{self.jti} revoked until {self.expires}"
@@ -0,0 +1,21 @@
+"""
+Signal handlers.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import clear_video_ids
+from core.models import Video
+
+
+@receiver(post_save, sender=Video)
+def video_saved(sender, instance, created, **kwargs):
+    """Refresh cached ids when a new video is added."""
+    if created:
+        clear_video_ids()
+
+
+@receiver(post_delete, sender=Video)
+def video_deleted(sender, instance, **kwargs):
+    """Refresh cached ids when a video is deleted."""
+    clear_video_ids()
@@ -1,11 +1,15 @@
 """
 Tests for the Django admin modifications.
 """
+import datetime
+
 from django.test import TestCase
 from django.test import Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from core.models import Video
+
 
 class UserAdminTests(TestCase):
     """Tests for users in Django admin."""
@@ -44,3 +48,56 @@ class UserAdminTests(TestCase):
 
         self.assertEquals(res.status_code, 200)
         self.assertContains(res, "Password confirmation")
+
+
+class VideoAdminTests(TestCase):
+    """Tests for videos in Django admin."""
+
+    def setUp(self):
+        """Login as superuser and create videos."""
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_login(self.admin_user)
+        self.videos = [
+            Video.objects.create(
+                title=title,
+                url=f"https://www.youtube.com/watch?v={i}",
+                thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+                publish_date=datetime.date(2023, 3, 7 + i),
+            )
+            for i, title in enumerate(["Urodziny córki", "Wakacje w Grecji"])
+        ]
+        Video.objects.index_titles()
+
+    def test_search_videos_by_title(self):
+        """Test admin search finds titles with typos."""
+        url = reverse("admin:core_video_changelist")
+        res = self.client.get(url, {"q": "urodzinny"})
+
+        self.assertEqual(list(res.context["cl"].result_list), [self.videos[0]])
+
+    def test_search_videos_by_publish_date(self):
+        """Test admin search finds videos published on a day."""
+        url = reverse("admin:core_video_changelist")
+        res = self.client.get(url, {"q": "2023-03-08"})
+
+        self.assertEqual(list(res.context["cl"].result_list), [self.videos[1]])
+
+    def test_edited_title_is_searchable(self):
+        """Test title changed in admin is indexed for search."""
+        video = self.videos[1]
+        url = reverse("admin:core_video_change", args=[video.id])
+        self.client.post(
+            url,
+            {
+                "title": "Nowe mieszkanie",
+                "url": video.url,
+                "thumbnail_url": video.thumbnail_url,
+                "publish_date": "2023-03-08",
+                "collected_count": 0,
+            },
+        )
+
+        self.assertEqual(list(Video.objects.search("mieszkanie")), [video])
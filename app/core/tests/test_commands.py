@@ -1,13 +1,33 @@
 """
 Test custom Django management commands.
 """
+import datetime
+import io
+import json
+import os
+import tempfile
+
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache, caches
 from django.core.management import call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import (
+    ChannelCheckpoint,
+    CollectionStats,
+    RevokedToken,
+    UserVideoRelation,
+    Video,
+)
+from core.utils import WersowChannel
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -33,3 +53,432 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+def fake_video_data(video_url, refresh=False):
+    """Return data of a video without fetching it."""
+    return {
+        "url": video_url,
+        "title": f"Video {video_url[-1]}",
+        "thumbnail_url": "https://i.ytimg.com/vi/1.jpg",
+        "publish_date": datetime.date(2023, 3, 7),
+    }
+
+
+VIDEO_URLS = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(6)]
+
+
+@patch("core.utils.WersowChannel.get_video_urls", return_value=VIDEO_URLS)
+@patch("core.management.commands.loadvideos.get_video_data")
+class LoadVideosCommandTests(TestCase):
+    """Test loadvideos command."""
+
+    def setUp(self):
+        cache.clear()
+        caches["youtube"].clear()
+
+    def test_loadvideos_adds_all_videos(self, patched_data, patched_urls):
+        """Test loadvideos adds every new video fetched on a thread pool."""
+        patched_data.side_effect = fake_video_data
+        Video.objects.create(**fake_video_data(VIDEO_URLS[0]))
+
+        call_command("loadvideos", jobs=3, stdout=io.StringIO())
+
+        urls = Video.objects.values_list("url", flat=True)
+        self.assertCountEqual(urls, VIDEO_URLS)
+        self.assertEqual(patched_data.call_count, len(VIDEO_URLS) - 1)
+
+    def test_loadvideos_stops_at_limit(self, patched_data, patched_urls):
+        """Test loadvideos doesn't fetch more videos than limit."""
+        patched_data.side_effect = fake_video_data
+
+        call_command("loadvideos", jobs=4, limit=2, stdout=io.StringIO())
+
+        self.assertEqual(Video.objects.count(), 2)
+        self.assertEqual(patched_data.call_count, 2)
+
+    @patch("time.sleep")
+    def test_loadvideos_retries_failed_fetch(
+        self, patched_sleep, patched_data, patched_urls
+    ):
+        """Test loadvideos retries fetching with growing delay."""
+        patched_data.side_effect = [OSError, OSError] + [
+            fake_video_data(url) for url in VIDEO_URLS
+        ]
+
+        call_command("loadvideos", backoff=0.5, stdout=io.StringIO())
+
+        self.assertEqual(Video.objects.count(), len(VIDEO_URLS))
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list], [0.5, 1.0]
+        )
+
+    @patch("time.sleep")
+    def test_loadvideos_skips_video_after_retries(
+        self, patched_sleep, patched_data, patched_urls
+    ):
+        """Test loadvideos gives up on a video that keeps failing."""
+        patched_data.side_effect = [OSError] * 2 + [
+            fake_video_data(url) for url in VIDEO_URLS[1:]
+        ]
+
+        out = io.StringIO()
+        call_command("loadvideos", retries=1, stdout=out, stderr=io.StringIO())
+
+        self.assertEqual(Video.objects.count(), len(VIDEO_URLS) - 1)
+        self.assertIn("Failed 1 videos", out.getvalue())
+
+    def test_loadvideos_query_count_depends_on_batches(
+        self, patched_data, patched_urls
+    ):
+        """Benchmark that loadvideos runs a constant number of queries per batch
+        no matter how many videos are in a batch."""
+        patched_data.side_effect = fake_video_data
+        ChannelCheckpoint.objects.advance(WersowChannel.channel_id, VIDEO_URLS[0])
+        query_counts = []
+
+        for videos_count, batch_size in [(20, 5), (80, 20)]:
+            patched_urls.return_value = [
+                f"https://www.youtube.com/watch?v={videos_count:03d}{i:08d}"
+                for i in range(videos_count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                call_command(
+                    "loadvideos", batch_size=batch_size, stdout=io.StringIO()
+                )
+            query_counts.append(len(queries))
+
+        self.assertEqual(Video.objects.count(), 100)
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_loadvideos_incremental_reads_only_new_videos(
+        self, patched_data, patched_urls
+    ):
+        """Test incremental loadvideos stops at the last synced video."""
+        patched_data.side_effect = fake_video_data
+        for url in VIDEO_URLS[2:]:
+            Video.objects.create(**fake_video_data(url))
+        ChannelCheckpoint.objects.advance(WersowChannel.channel_id, VIDEO_URLS[2])
+
+        with patch(
+            "core.utils.WersowChannel.iter_video_urls",
+            side_effect=lambda: iter(VIDEO_URLS),
+        ):
+            call_command("loadvideos", incremental=True, stdout=io.StringIO())
+
+        self.assertEqual(patched_data.call_count, 2)
+        self.assertCountEqual(Video.objects.values_list("url", flat=True), VIDEO_URLS)
+        checkpoint = ChannelCheckpoint.objects.get(channel_id=WersowChannel.channel_id)
+        self.assertEqual(checkpoint.latest_video_id, VIDEO_URLS[0][-11:])
+
+    def test_loadvideos_incremental_retries_failed_video(
+        self, patched_data, patched_urls
+    ):
+        """Test incremental loadvideos stops at a failed video
+        and the next run adds it and newer videos."""
+        for url in VIDEO_URLS[3:]:
+            Video.objects.create(**fake_video_data(url))
+        ChannelCheckpoint.objects.advance(WersowChannel.channel_id, VIDEO_URLS[3])
+        patched_data.side_effect = [fake_video_data(VIDEO_URLS[2]), OSError]
+
+        with patch(
+            "core.utils.WersowChannel.iter_video_urls",
+            side_effect=lambda: iter(VIDEO_URLS),
+        ):
+            call_command(
+                "loadvideos",
+                incremental=True,
+                retries=0,
+                stdout=io.StringIO(),
+                stderr=io.StringIO(),
+            )
+            added_urls = set(Video.objects.values_list("url", flat=True))
+            checkpoint = ChannelCheckpoint.objects.get(
+                channel_id=WersowChannel.channel_id
+            )
+            patched_data.side_effect = fake_video_data
+            call_command("loadvideos", incremental=True, stdout=io.StringIO())
+
+        self.assertEqual(added_urls, set(VIDEO_URLS[2:]))
+        self.assertEqual(checkpoint.latest_video_id, VIDEO_URLS[2][-11:])
+        self.assertCountEqual(Video.objects.values_list("url", flat=True), VIDEO_URLS)
+
+    def test_loadvideos_incremental_limit_adds_oldest_videos(
+        self, patched_data, patched_urls
+    ):
+        """Test incremental loadvideos with limit adds the oldest new videos."""
+        patched_data.side_effect = fake_video_data
+
+        with patch(
+            "core.utils.WersowChannel.iter_video_urls",
+            side_effect=lambda: iter(VIDEO_URLS),
+        ):
+            call_command("loadvideos", incremental=True, limit=2, stdout=io.StringIO())
+
+        self.assertCountEqual(
+            Video.objects.values_list("url", flat=True), VIDEO_URLS[-2:]
+        )
+        checkpoint = ChannelCheckpoint.objects.get(channel_id=WersowChannel.channel_id)
+        self.assertEqual(checkpoint.latest_video_id, VIDEO_URLS[-2][-11:])
+
+
+class RecomputeCollectionStatsCommandTests(TestCase):
+    """Test recomputecollectionstats command."""
+
+    def test_recompute_repairs_drift(self):
+        """Test command recomputes statistics that drifted."""
+        users = [
+            get_user_model().objects.create(
+                email=f"test{i}@example.com", password="pass123", username=f"user{i}"
+            )
+            for i in range(3)
+        ]
+        video = Video.objects.create(
+            title="Video",
+            url="https://www.youtube.com/watch?v=00000000000",
+            thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+            publish_date=datetime.date(2023, 3, 7),
+        )
+        UserVideoRelation.objects.create(user=users[0], video=video)
+        CollectionStats.objects.create(user=users[1], collected_count=5, streak=2)
+
+        call_command("recomputecollectionstats", batch_size=2, stdout=io.StringIO())
+
+        counts = dict(CollectionStats.objects.values_list("user", "collected_count"))
+        self.assertEqual(counts, {users[0].id: 1, users[1].id: 0, users[2].id: 0})
+        self.assertEqual(CollectionStats.objects.get(user=users[1]).streak, 0)
+
+
+class RecountCollectedVideosCommandTests(TestCase):
+    """Test recountcollectedvideos command."""
+
+    def test_recount_repairs_drift(self):
+        """Test command recounts collected counters that drifted."""
+        video = Video.objects.create(
+            title="Video",
+            url="https://www.youtube.com/watch?v=00000000000",
+            thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+            publish_date=datetime.date(2023, 3, 7),
+            collected_count=5,
+        )
+        out = io.StringIO()
+
+        call_command("recountcollectedvideos", stdout=out)
+
+        video.refresh_from_db()
+        self.assertEqual(video.collected_count, 0)
+        self.assertIn("Repaired counters of 1 videos", out.getvalue())
+
+
+class ImportUsersCommandTests(TestCase):
+    """Test importusers command."""
+
+    def write_file(self, suffix, content):
+        """Return path of a temporary file with the content."""
+        file = tempfile.NamedTemporaryFile(
+            "w", suffix=suffix, delete=False, encoding="utf-8"
+        )
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+
+        return file.name
+
+    def test_import_csv_hashes_raw_passwords(self):
+        """Test users from CSV are created with hashed passwords."""
+        path = self.write_file(
+            ".csv",
+            "email,username,password\n"
+            "first@EXAMPLE.com,first,firstpass123\n"
+            "second@example.com,second,secondpass123\n",
+        )
+
+        call_command("importusers", path, processes=1, stdout=io.StringIO())
+
+        user = get_user_model().objects.get(email="first@example.com")
+        self.assertEqual(user.username, "first")
+        self.assertTrue(user.check_password("firstpass123"))
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_import_jsonl_keeps_password_hashes(self):
+        """Test password hashes from the old system are stored as they are."""
+        password_hash = make_password("testpass123")
+        row = {
+            "email": "test@example.com",
+            "username": "test",
+            "password_hash": password_hash,
+        }
+        path = self.write_file(".jsonl", json.dumps(row) + "\n")
+
+        call_command("importusers", path, stdout=io.StringIO())
+
+        user = get_user_model().objects.get(email="test@example.com")
+        self.assertEqual(user.password, password_hash)
+        self.assertTrue(user.check_password("testpass123"))
+
+    def test_taken_emails_skipped(self):
+        """Test emails of existing users and repeated emails are skipped."""
+        get_user_model().objects.create_user(
+            email="taken@example.com", password="testpass123", username="taken"
+        )
+        path = self.write_file(
+            ".csv",
+            "email,username,password_hash\n"
+            f"taken@example.com,other,{make_password('testpass123')}\n"
+            f"new@example.com,new,{make_password('testpass123')}\n"
+            f"new@example.com,again,{make_password('testpass123')}\n",
+        )
+        out = io.StringIO()
+
+        call_command("importusers", path, stdout=out)
+
+        self.assertIn("Imported 1 users, skipped 2 taken emails", out.getvalue())
+        self.assertEqual(
+            get_user_model().objects.get(email="taken@example.com").username, "taken"
+        )
+        self.assertEqual(
+            get_user_model().objects.get(email="new@example.com").username, "new"
+        )
+
+    def test_invalid_rows_reported(self):
+        """Test rows without data, with unknown hashes or bad JSON are skipped."""
+        path = self.write_file(
+            ".jsonl",
+            '{"email": "", "username": "noemail", "password": "testpass123"}\n'
+            '{"email": "a@example.com", "username": "a", "password_hash": "x$y"}\n'
+            '{"email": "b@example.com", "username": "b", "password": "testpass123"\n'
+            '{"email": "no-at-sign", "username": "c", "password": "testpass123"}\n',
+        )
+        out = io.StringIO()
+        err = io.StringIO()
+
+        call_command("importusers", path, stdout=out, stderr=err)
+
+        self.assertIn("and 4 invalid rows", out.getvalue())
+        self.assertIn("Line 3:", err.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_values_of_wrong_type_reported(self):
+        """Test rows with values that aren't strings are skipped
+        and the rest of the batch is imported."""
+        rows = [
+            {"email": 5, "username": "a", "password": "testpass123"},
+            {"email": "b@example.com", "username": "b", "password": 123456},
+            {"email": "c@example.com", "username": "c", "password_hash": 7},
+            {"email": "d@example.com", "username": "d", "password": "testpass123"},
+        ]
+        path = self.write_file(
+            ".jsonl", "".join(json.dumps(row) + "\n" for row in rows)
+        )
+        out = io.StringIO()
+        err = io.StringIO()
+
+        call_command("importusers", path, processes=1, stdout=out, stderr=err)
+
+        self.assertIn("Imported 1 users", out.getvalue())
+        self.assertIn("and 3 invalid rows", out.getvalue())
+        self.assertIn("Line 2: password isn't a string.", err.getvalue())
+        self.assertEqual(
+            list(get_user_model().objects.values_list("email", flat=True)),
+            ["d@example.com"],
+        )
+
+    @patch("core.management.commands.importusers.make_password")
+    def test_failed_hash_skips_only_its_user(self, patched_make_password):
+        """Test a password that can't be hashed skips only its user."""
+
+        def fail_bad_password(password):
+            if password == "badpass123":
+                raise ValueError("Unusable password.")
+            return make_password(password)
+
+        patched_make_password.side_effect = fail_bad_password
+        path = self.write_file(
+            ".csv",
+            "email,username,password\n"
+            "a@example.com,a,badpass123\n"
+            "b@example.com,b,testpass123\n",
+        )
+        out = io.StringIO()
+
+        call_command("importusers", path, processes=1, stdout=out, stderr=io.StringIO())
+
+        self.assertIn("Imported 1 users", out.getvalue())
+        self.assertIn("and 1 invalid rows", out.getvalue())
+        user = get_user_model().objects.get()
+        self.assertEqual(user.email, "b@example.com")
+        self.assertTrue(user.check_password("testpass123"))
+
+    def test_query_count_depends_on_batches(self):
+        """Test users are inserted with one query per batch."""
+        password_hash = make_password("testpass123")
+        rows = [f"user{i}@example.com,user{i},{password_hash}\n" for i in range(5)]
+        path = self.write_file(".csv", "email,username,password_hash\n" + "".join(rows))
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("importusers", path, batch_size=2, stdout=io.StringIO())
+
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(get_user_model().objects.count(), 5)
+
+
+BENCHMARKS = [
+    (
+        "benchmarkrandom",
+        {"videos": 10, "samples": 5},
+        ["sparsity  50%:", "sparsity  99%:"],
+    ),
+    ("benchmarkingestion", {"videos": 20, "batch_size": 5}, ["20 videos:"]),
+    (
+        "benchmarkleaderboard",
+        {"users": 50, "samples": 10},
+        ["rank lookup:", "middle page:"],
+    ),
+    (
+        "benchmarksearch",
+        {"videos": 50, "words": 20, "samples": 3},
+        ["full text:", "typo:"],
+    ),
+    (
+        "benchmarktokenrefresh",
+        {"requests": 5, "revoked": 20, "batch_size": 5},
+        ["without revocation:", "with revocation:"],
+    ),
+    (
+        "benchmarkloginstorm",
+        {"logins": 1, "reads": 4, "readers": 2},
+        ["sync login:", "async login:"],
+    ),
+]
+
+
+class BenchmarkCommandTests(TestCase):
+    """Smoke test benchmark commands, what they measure is tested
+    with the measured code."""
+
+    def test_benchmarks_leave_no_data(self):
+        """Test every benchmark reports its measurements and leaves no rows."""
+        for command, options, reports in BENCHMARKS:
+            with self.subTest(command=command):
+                out = io.StringIO()
+
+                call_command(command, **options, stdout=out, stderr=io.StringIO())
+
+                for report in reports:
+                    self.assertIn(report, out.getvalue())
+                for model in [get_user_model(), Video, RevokedToken]:
+                    self.assertFalse(model.objects.exists(), model.__name__)
+
+    @patch("core.management.commands.benchmarkservers.shutil.which")
+    def test_benchmarkservers_skips_missing_servers(self, patched_which):
+        """Test servers that aren't installed are skipped and data is removed."""
+        patched_which.return_value = None
+        err = io.StringIO()
+
+        call_command("benchmarkservers", stdout=io.StringIO(), stderr=err)
+
+        self.assertIn("uwsgi: uwsgi isn't installed", err.getvalue())
+        self.assertIn("asgi: uvicorn isn't installed", err.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Video.objects.exists())
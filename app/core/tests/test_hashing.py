@@ -0,0 +1,70 @@
+"""
+Tests for password hashing off the event loop.
+"""
+import asyncio
+import threading
+
+from django.contrib.auth.hashers import check_password
+from django.test import SimpleTestCase
+
+from core.hashing import HashingQueueFullException, PasswordHashing
+
+
+class PasswordHashingTests(SimpleTestCase):
+    """Test the pool hashing passwords."""
+
+    def test_hash_checks_password(self):
+        """Test hash made on the pool matches the password."""
+        hashing = PasswordHashing(workers=1)
+
+        async def hash_and_check():
+            encoded = await hashing.make_password("testpass123")
+            return (
+                encoded,
+                await hashing.check_password("testpass123", encoded),
+                await hashing.check_password("wrongpass123", encoded),
+            )
+
+        encoded, matches, wrong_matches = asyncio.run(hash_and_check())
+
+        self.assertTrue(check_password("testpass123", encoded))
+        self.assertTrue(matches)
+        self.assertFalse(wrong_matches)
+        self.assertEqual(hashing.get_metrics()["completed"], 3)
+
+    def test_hashing_runs_off_the_loop(self):
+        """Test the loop keeps running while a password is hashed."""
+        hashing = PasswordHashing(workers=1)
+        release = threading.Event()
+
+        async def hash_while_ticking():
+            job = asyncio.ensure_future(hashing.run(release.wait))
+            await asyncio.sleep(0)
+            self.assertEqual(hashing.get_metrics()["running"], 1)
+            release.set()
+            return await job
+
+        self.assertTrue(asyncio.run(hash_while_ticking()))
+
+    def test_full_queue_refused(self):
+        """Test job is refused when max_queued jobs wait for a thread."""
+        hashing = PasswordHashing(workers=1, max_queued=1)
+        release = threading.Event()
+
+        async def overload():
+            running = asyncio.ensure_future(hashing.run(release.wait))
+            while not hashing.running:
+                await asyncio.sleep(0.001)
+            queued = asyncio.ensure_future(hashing.run(release.wait))
+            await asyncio.sleep(0)
+            with self.assertRaises(HashingQueueFullException):
+                await hashing.run(release.wait)
+            release.set()
+            await asyncio.gather(running, queued)
+
+        asyncio.run(overload())
+
+        metrics = hashing.get_metrics()
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertEqual(metrics["completed"], 2)
+        self.assertEqual(metrics["queued"], 0)
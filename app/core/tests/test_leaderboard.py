@@ -0,0 +1,99 @@
+"""
+Tests for the collectors ranking.
+"""
+import datetime
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from core.leaderboard import Leaderboard, ScoreSnapshot, leaderboard
+from core.models import CollectionStats, UserVideoRelation, Video
+
+
+class ScoreSnapshotTests(SimpleTestCase):
+    """Tests for looking up ranks in a distribution of scores."""
+
+    def test_rank_of(self):
+        """Test rank is one more than amount of users with a higher score."""
+        snapshot = ScoreSnapshot([(1, 4), (3, 2), (7, 1)])
+
+        self.assertEqual(snapshot.collectors, 7)
+        self.assertEqual(snapshot.rank_of(8), 1)
+        self.assertEqual(snapshot.rank_of(7), 1)
+        self.assertEqual(snapshot.rank_of(5), 2)
+        self.assertEqual(snapshot.rank_of(3), 2)
+        self.assertEqual(snapshot.rank_of(2), 4)
+        self.assertEqual(snapshot.rank_of(1), 4)
+
+    def test_empty(self):
+        """Test every score is the first one when nobody is ranked."""
+        snapshot = ScoreSnapshot([])
+
+        self.assertEqual(snapshot.collectors, 0)
+        self.assertEqual(snapshot.rank_of(3), 1)
+
+
+class LeaderboardTests(TestCase):
+    """Tests for ranks kept in memory."""
+
+    def setUp(self):
+        for i, count in enumerate([0, 2, 5, 5]):
+            user = get_user_model().objects.create(
+                email=f"test{i}@example.com", password="pass123", username=f"user{i}"
+            )
+            CollectionStats.objects.create(user=user, collected_count=count)
+
+    def test_rank_of(self):
+        """Test ranks are looked up without queries once scores are loaded."""
+        leaderboard = Leaderboard()
+        leaderboard.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(leaderboard.rank_of(5), 1)
+            self.assertEqual(leaderboard.rank_of(2), 3)
+            self.assertIsNone(leaderboard.rank_of(0))
+            self.assertEqual(leaderboard.get_snapshot().collectors, 3)
+
+    @patch("core.leaderboard.time.monotonic")
+    def test_snapshot_reloaded_when_stale(self, patched_monotonic):
+        """Test scores are loaded again after TTL."""
+        patched_monotonic.return_value = 0
+        leaderboard = Leaderboard(ttl=60)
+        leaderboard.get_snapshot()
+        CollectionStats.objects.filter(collected_count=0).update(collected_count=9)
+
+        patched_monotonic.return_value = 30
+        self.assertEqual(leaderboard.rank_of(5), 1)
+
+        patched_monotonic.return_value = 61
+        self.assertEqual(leaderboard.rank_of(5), 2)
+
+    def test_collection_changes_clear_ranks(self):
+        """Test collecting and uncollecting clear ranks of the worker."""
+        user = get_user_model().objects.get(email="test1@example.com")
+        videos = [
+            Video.objects.create(
+                title=f"Video {i}",
+                url=f"https://www.youtube.com/watch?v={i:011d}",
+                thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+                publish_date=datetime.date(2023, 3, 7),
+            )
+            for i in range(6)
+        ]
+        UserVideoRelation.objects.bulk_create(
+            UserVideoRelation(user=user, video=video) for video in videos[:2]
+        )
+        CollectionStats.objects.recompute(user_ids=[user.pk])
+        leaderboard.clear()
+        self.assertEqual(leaderboard.rank_of(2), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserVideoRelation.objects.collect_many(user, [video.pk for video in videos])
+        self.assertEqual(leaderboard.rank_of(6), 1)
+        self.assertEqual(leaderboard.rank_of(5), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserVideoRelation.objects.uncollect(user, videos[0].pk)
+        self.assertEqual(leaderboard.rank_of(5), 1)
@@ -2,14 +2,26 @@
 Tests for models.
 """
 import datetime
+import uuid
 
 from unittest.mock import patch
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-
-from core.models import Video, UserVideoRelation
-from core.utils import NoVideosException
+from django.core.cache import cache, caches
+from django.db import IntegrityError
+from django.utils.timezone import localdate
+
+from core.cache import VIDEO_IDS_KEY, get_todays_video_version
+from core.models import (
+    ChannelCheckpoint,
+    CollectionStats,
+    CollectionTombstone,
+    Video,
+    ScheduledVideo,
+    UserVideoRelation,
+)
+from core.utils import NoVideosException, WersowChannel
 
 
 def create_user(**params):
@@ -87,6 +99,13 @@ class UserModelTests(TestCase):
         self.assertTrue(superuser.is_superuser)
         self.assertTrue(superuser.is_staff)
 
+    def test_create_superuser_saves_once(self):
+        """Test superuser is inserted with a single query."""
+        with self.assertNumQueries(1):
+            get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+
     def test_create_superuser_without_username_successful(self):
         """Test creating a superuser without passing username works."""
         superuser = get_user_model().objects.create_superuser(
@@ -111,7 +130,7 @@ def create_video(**params):
     """Helper function for creating a video."""
     video = Video.objects.create(
         title=params.pop("title", VIDEO_EXAMPLE["title"]),
-        url=params.pop("url", VIDEO_EXAMPLE["url"]),
+        url=params.pop("url", f"https://www.youtube.com/watch?v={uuid.uuid4()}"),
         thumbnail_url=params.pop("thumbnail_url", VIDEO_EXAMPLE["thumbnail_url"]),
         publish_date=params.pop("publish_date", VIDEO_EXAMPLE["publish_date"]),
         **params,
@@ -122,6 +141,10 @@ def create_video(**params):
 class VideoTests(TestCase):
     """Test Video model."""
 
+    def setUp(self):
+        cache.clear()
+        caches["youtube"].clear()
+
     def test_create_video(self):
         """Test creating a video is successful."""
         video = create_video(**VIDEO_EXAMPLE)
@@ -149,12 +172,82 @@ class VideoTests(TestCase):
 
         self.assertEqual(video, random_video)
 
+    def test_random_video_takes_one_query_when_ids_cached(self):
+        """Test random method needs a single query with warm cache
+        no matter how sparse ids are."""
+        videos = [create_video() for _ in range(10)]
+        for video in videos[:9]:
+            video.delete()
+        Video.objects.random()
+
+        with self.assertNumQueries(1):
+            random_video = Video.objects.random()
+
+        self.assertEqual(random_video, videos[9])
+
+    def test_random_video_refreshes_stale_ids(self):
+        """Test random method refreshes cached ids
+        when picked video doesn't exist anymore."""
+        video = create_video()
+        cache.set(VIDEO_IDS_KEY, [video.id + 1])
+
+        with self.assertNumQueries(3):
+            random_video = Video.objects.random()
+
+        self.assertEqual(random_video, video)
+
     def test_random_video_error_when_no_videos(self):
         """Test that random method raises exception
         when there are no videos in database."""
         with self.assertRaises(NoVideosException):
             Video.objects.random()
 
+    def test_random_uncollected_skips_collected_videos(self):
+        """Test random uncollected video isn't in user's collection."""
+        user = create_user()
+        videos = [create_video() for _ in range(10)]
+        UserVideoRelation.objects.collect_many(user, [v.id for v in videos[:9]])
+
+        for _ in range(10):
+            self.assertEqual(Video.objects.random_uncollected(user), videos[9])
+
+    def test_random_uncollected_takes_one_query_when_cached(self):
+        """Test random uncollected video is checked against collection
+        in one query besides reading statistics."""
+        user = create_user()
+        videos = [create_video() for _ in range(10)]
+        UserVideoRelation.objects.collect_many(user, [v.id for v in videos[:5]])
+        Video.objects.random_uncollected(user)
+
+        with self.assertNumQueries(2):
+            video = Video.objects.random_uncollected(user)
+
+        self.assertIn(video, videos[5:])
+
+    @patch("core.models.RANDOM_UNCOLLECTED_MAX_SAMPLE", 0)
+    def test_random_uncollected_falls_back_to_anti_join(self):
+        """Test random uncollected video is found without sampling
+        when too many candidates would be needed."""
+        user = create_user()
+        videos = [create_video() for _ in range(3)]
+        UserVideoRelation.objects.collect_many(user, [videos[0].id, videos[2].id])
+
+        self.assertEqual(Video.objects.random_uncollected(user), videos[1])
+
+    def test_random_uncollected_when_everything_collected(self):
+        """Test there is no random uncollected video
+        when user collected every video."""
+        user = create_user()
+        videos = [create_video() for _ in range(3)]
+        UserVideoRelation.objects.collect_many(user, [v.id for v in videos])
+
+        self.assertIsNone(Video.objects.random_uncollected(user))
+
+    def test_random_uncollected_error_when_no_videos(self):
+        """Test random uncollected video raises exception without videos."""
+        with self.assertRaises(NoVideosException):
+            Video.objects.random_uncollected(create_user())
+
     def test_set_random_video_as_todays(self):
         """Test set_random_video_as_todays sets random video's todays field to True."""
         video = create_video(todays=False)
@@ -196,17 +289,12 @@ class VideoTests(TestCase):
         with self.assertRaises(NoVideosException):
             Video.objects.todays()
 
-    def test_todays_video_when_multiple_todays_videos(self):
-        """Test that todays method returns latest video
-        when there are multiple today's videos."""
-        create_video(publish_date=datetime.date(2022, 5, 22), todays=True)
-        latest_todays_video = create_video(
-            publish_date=datetime.date(2023, 3, 7), todays=True
-        )
-
-        todays_video = Video.objects.todays()
+    def test_only_one_todays_video_allowed(self):
+        """Test database doesn't allow multiple today's videos."""
+        create_video(todays=True)
 
-        self.assertEqual(todays_video, latest_todays_video)
+        with self.assertRaises(IntegrityError):
+            create_video(todays=True)
 
     def test_add_video_works(self):
         """Test add_video method works."""
@@ -240,27 +328,22 @@ class VideoTests(TestCase):
         video.refresh_from_db()
         self.assertTrue(video.todays)
 
+    def test_change_todays_video_bumps_version(self):
+        """Test change_todays_video invalidates cached today's video."""
+        create_video(todays=True)
+        old_version = get_todays_video_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Video.objects.change_todays_video()
+
+        self.assertNotEqual(get_todays_video_version(), old_version)
+
     def test_change_todays_video_error_when_no_videos(self):
         """Test change_todays_video raises exception
         when there are no videos in database."""
         with self.assertRaises(NoVideosException):
             Video.objects.change_todays_video()
 
-    @patch("core.models.Video.objects.random")
-    def test_change_todays_video_when_multiple_todays_videos(self, patched_random):
-        """Test that change_todays_video leaves database with only one today's video
-        even if there were more today's videos before."""
-        create_video(todays=True)
-        create_video(todays=True)
-        next_todays = create_video(todays=False)
-
-        patched_random.return_value = next_todays
-        Video.objects.change_todays_video()
-
-        self.assertTrue(next_todays.todays)
-        todays_count = Video.objects.filter(todays=True).count()
-        self.assertEqual(todays_count, 1)
-
     @patch("core.utils.WersowChannel.get_latest_video_url")
     def test_add_latest_video_works(self, patched_latest):
         """Test add_latest_video method adds latest Wersow's video to database."""
@@ -288,6 +371,241 @@ class VideoTests(TestCase):
         self.assertFalse(is_added)
 
 
+class VideoSearchTests(TestCase):
+    """Test searching videos by title."""
+
+    def setUp(self):
+        titles = [
+            "POZNALIŚMY PŁEĆ NASZEGO DZIECKA!",
+            "Wakacje w Grecji",
+            "Nasze nowe mieszkanie",
+        ]
+        self.videos = [create_video(title=title) for title in titles]
+        Video.objects.index_titles()
+
+    def test_search_ignores_diacritics_and_case(self):
+        """Test search finds titles written with Polish letters."""
+        results = Video.objects.search("plec dziecka")
+
+        self.assertEqual(list(results), [self.videos[0]])
+
+    def test_search_tolerates_typos(self):
+        """Test search finds titles with words similar to query."""
+        results = Video.objects.search("mieszknie")
+
+        self.assertEqual(list(results), [self.videos[2]])
+
+    def test_search_orders_by_relevance(self):
+        """Test titles matching query better are returned first."""
+        best = create_video(title="Grecja, Grecja i jeszcze raz Grecja")
+        Video.objects.index_titles([best.pk])
+
+        results = Video.objects.search("grecja")
+
+        self.assertEqual(list(results), [best, self.videos[1]])
+
+    def test_search_without_matches(self):
+        """Test search returns nothing when no title is similar."""
+        self.assertFalse(Video.objects.search("xyzzy").exists())
+
+    def test_added_videos_are_searchable(self):
+        """Test titles of added videos are indexed for search."""
+        video = Video.objects.add_fetched_video(
+            {
+                "url": "https://www.youtube.com/watch?v=new",
+                "title": "Urodziny córki",
+                "thumbnail_url": VIDEO_EXAMPLE["thumbnail_url"],
+                "publish_date": VIDEO_EXAMPLE["publish_date"],
+            }
+        )
+        Video.objects.add_fetched_videos(
+            [
+                {
+                    "url": "https://www.youtube.com/watch?v=new2",
+                    "title": "Święta w górach",
+                    "thumbnail_url": VIDEO_EXAMPLE["thumbnail_url"],
+                    "publish_date": VIDEO_EXAMPLE["publish_date"],
+                }
+            ]
+        )
+
+        self.assertEqual(list(Video.objects.search("corki")), [video])
+        self.assertEqual(Video.objects.search("swieta w gorach").count(), 1)
+
+
+class ScheduledVideoModelTests(TestCase):
+    """Tests for ScheduledVideo model."""
+
+    def setUp(self):
+        cache.clear()
+        caches["youtube"].clear()
+
+    def test_fill_schedules_every_day(self):
+        """Test fill schedules a video for every day starting today."""
+        for _ in range(5):
+            create_video(todays=False)
+
+        ScheduledVideo.objects.fill(days=3)
+
+        dates = list(ScheduledVideo.objects.values_list("date", flat=True))
+        expected = [localdate() + datetime.timedelta(days=i) for i in range(3)]
+        self.assertEqual(sorted(dates), expected)
+        todays_entry = ScheduledVideo.objects.get(date=localdate())
+        self.assertEqual(
+            list(Video.objects.filter(todays=True)), [todays_entry.video]
+        )
+
+    def test_fill_doesnt_repeat_videos_until_all_were_scheduled(self):
+        """Test every video is scheduled once before any video repeats."""
+        videos = [create_video(todays=False) for _ in range(4)]
+
+        ScheduledVideo.objects.fill(days=2)
+        ScheduledVideo.objects.fill(days=6)
+
+        schedule = ScheduledVideo.objects.order_by("date")
+        first_cycle = [entry.video_id for entry in schedule[:4]]
+        self.assertCountEqual(first_cycle, [video.id for video in videos])
+        self.assertEqual(schedule.count(), 6)
+        self.assertEqual(schedule.last().cycle, 1)
+
+    def test_fill_doesnt_reschedule_scheduled_days(self):
+        """Test fill keeps already scheduled days."""
+        create_video(todays=False)
+        ScheduledVideo.objects.fill(days=2)
+
+        entries = ScheduledVideo.objects.fill(days=2)
+
+        self.assertEqual(entries, [])
+        self.assertEqual(ScheduledVideo.objects.count(), 2)
+
+    def test_todays_returns_scheduled_video_without_writes(self):
+        """Test todays method returns video scheduled for today
+        with a single query."""
+        create_video(todays=False)
+        scheduled = create_video(todays=True)
+        ScheduledVideo.objects.create(date=localdate(), video=scheduled)
+
+        with self.assertNumQueries(1):
+            todays_video = Video.objects.todays()
+
+        self.assertEqual(todays_video, scheduled)
+
+    def test_todays_marks_scheduled_video(self):
+        """Test the first todays call of a day moves today's mark
+        to the scheduled video."""
+        previous = create_video(todays=True)
+        scheduled = create_video(todays=False)
+        ScheduledVideo.objects.create(date=localdate(), video=scheduled)
+
+        todays_video = Video.objects.todays()
+
+        self.assertEqual(todays_video, scheduled)
+        self.assertTrue(todays_video.todays)
+        self.assertEqual(list(Video.objects.filter(todays=True)), [scheduled])
+        previous.refresh_from_db()
+        self.assertFalse(previous.todays)
+
+    def test_change_todays_video_changes_schedule(self):
+        """Test changing today's video swaps today's entry with a later one,
+        so the served video changes and no video repeats."""
+        for _ in range(3):
+            create_video(todays=False)
+        ScheduledVideo.objects.fill(days=3)
+        old_todays = Video.objects.todays()
+
+        new_todays = Video.objects.change_todays_video()
+
+        self.assertNotEqual(new_todays, old_todays)
+        self.assertEqual(Video.objects.todays(), new_todays)
+        self.assertEqual(
+            ScheduledVideo.objects.values("video").distinct().count(), 3
+        )
+        self.assertTrue(new_todays.todays)
+        self.assertEqual(list(Video.objects.filter(todays=True)), [new_todays])
+
+    def test_change_todays_video_on_last_day_of_cycle(self):
+        """Test changing today's video scheduled last in its cycle
+        schedules another video."""
+        videos = [create_video(todays=False) for _ in range(2)]
+        ScheduledVideo.objects.create(date=localdate(), video=videos[0])
+
+        new_todays = Video.objects.change_todays_video()
+
+        self.assertEqual(new_todays, videos[1])
+        self.assertEqual(Video.objects.todays(), videos[1])
+
+    def test_splice_puts_new_video_in_unused_part_of_schedule(self):
+        """Test splice schedules a new video after today
+        without dropping any scheduled video."""
+        for _ in range(3):
+            create_video(todays=False)
+        ScheduledVideo.objects.fill(days=3)
+        todays_entry = ScheduledVideo.objects.get(date=localdate())
+        scheduled_ids = set(
+            ScheduledVideo.objects.values_list("video_id", flat=True)
+        )
+        new_video = create_video(todays=False)
+
+        ScheduledVideo.objects.splice(new_video)
+
+        todays_entry.refresh_from_db()
+        self.assertEqual(ScheduledVideo.objects.get(date=localdate()), todays_entry)
+        new_entry = ScheduledVideo.objects.get(video=new_video)
+        self.assertGreater(new_entry.date, localdate())
+        self.assertEqual(
+            set(ScheduledVideo.objects.values_list("video_id", flat=True)),
+            scheduled_ids | {new_video.id},
+        )
+        self.assertEqual(ScheduledVideo.objects.count(), 4)
+
+    def test_add_fetched_videos_splices_them_into_schedule(self):
+        """Test videos added in bulk are scheduled after today."""
+        for _ in range(3):
+            create_video(todays=False)
+        ScheduledVideo.objects.fill(days=3)
+        videos_data = [
+            {
+                "url": f"https://www.youtube.com/watch?v=new{i}",
+                "title": f"New video {i}",
+                "thumbnail_url": VIDEO_EXAMPLE["thumbnail_url"],
+                "publish_date": VIDEO_EXAMPLE["publish_date"],
+            }
+            for i in range(3)
+        ]
+
+        Video.objects.add_fetched_videos(videos_data)
+
+        new_videos = Video.objects.filter(url__startswith=videos_data[0]["url"][:-1])
+        self.assertEqual(new_videos.count(), 3)
+        new_entries = ScheduledVideo.objects.filter(video__in=new_videos)
+        self.assertEqual(new_entries.count(), 3)
+        self.assertFalse(new_entries.filter(date__lte=localdate()).exists())
+        self.assertEqual(ScheduledVideo.objects.count(), 6)
+        self.assertEqual(
+            ScheduledVideo.objects.values("video").distinct().count(), 6
+        )
+
+    def test_add_fetched_videos_skips_known_videos(self):
+        """Test videos already in database aren't scheduled again."""
+        videos = [create_video(todays=False) for _ in range(3)]
+        ScheduledVideo.objects.fill(days=3)
+        new_data = {
+            "url": "https://www.youtube.com/watch?v=new",
+            "title": "New video",
+            "thumbnail_url": VIDEO_EXAMPLE["thumbnail_url"],
+            "publish_date": VIDEO_EXAMPLE["publish_date"],
+        }
+        known_data = {**new_data, "url": videos[0].url}
+
+        video_ids = Video.objects.add_fetched_videos([known_data, new_data])
+
+        new_video = Video.objects.get(url=new_data["url"])
+        self.assertEqual(video_ids, [new_video.id])
+        self.assertEqual(Video.objects.count(), 4)
+        self.assertEqual(ScheduledVideo.objects.count(), 4)
+        self.assertEqual(ScheduledVideo.objects.filter(video=videos[0]).count(), 1)
+
+
 class UserVideoRelationModelTests(TestCase):
     """Tests for UserVideoRelation model."""
 
@@ -304,3 +622,336 @@ class UserVideoRelationModelTests(TestCase):
             f"{user.email} collected {video.title} on {datetime.date.today()}"
         )
         self.assertEqual(str(user_video), expected_str)
+
+    def test_video_collected_once(self):
+        """Test database doesn't allow collecting a video twice."""
+        user = get_user_model().objects.create(
+            email="test@example.com", password="pass123", username="testuser"
+        )
+        video = create_video()
+        UserVideoRelation.objects.create(user=user, video=video)
+
+        with self.assertRaises(IntegrityError):
+            UserVideoRelation.objects.create(user=user, video=video)
+
+    def test_collect_returns_existing_relation(self):
+        """Test collecting a collected video returns the existing relation."""
+        user = get_user_model().objects.create(
+            email="test@example.com", password="pass123", username="testuser"
+        )
+        video = create_video()
+
+        first = UserVideoRelation.objects.collect(user, video.id)
+        second = UserVideoRelation.objects.collect(user, video.id)
+
+        self.assertTrue(first.created)
+        self.assertFalse(second.created)
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(UserVideoRelation.objects.count(), 1)
+
+    def test_collect_not_existing_video(self):
+        """Test collecting a video that doesn't exist returns None."""
+        user = get_user_model().objects.create(
+            email="test@example.com", password="pass123", username="testuser"
+        )
+
+        self.assertIsNone(UserVideoRelation.objects.collect(user, -1))
+        self.assertFalse(UserVideoRelation.objects.exists())
+
+
+class CollectionStatsTests(TestCase):
+    """Tests for statistics of collections."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="pass123", username="testuser"
+        )
+
+    def collect_on(self, *days):
+        """Collect a new video on every day of February 2023
+        and count it in statistics."""
+        for day in days:
+            date = datetime.date(2023, 2, day)
+            UserVideoRelation.objects.create(
+                user=self.user, video=create_video(), collected=date
+            )
+            CollectionStats.objects.record_collected(self.user.id, 1, date)
+
+    def assertStatsRecomputed(self):
+        """Check incremental statistics match statistics recomputed from scratch."""
+        stats = CollectionStats.objects.get(user=self.user)
+        CollectionStats.objects.recompute(user_ids=[self.user.id])
+        recomputed = CollectionStats.objects.get(user=self.user)
+        for field in ["collected_count", "first_collected", "last_collected", "streak"]:
+            self.assertEqual(getattr(stats, field), getattr(recomputed, field), field)
+
+    def test_collect_counts_video(self):
+        """Test collecting a video updates statistics."""
+        video = create_video()
+
+        UserVideoRelation.objects.collect(self.user, video.id)
+        UserVideoRelation.objects.collect(self.user, video.id)
+
+        stats = CollectionStats.objects.get(user=self.user)
+        self.assertEqual(stats.collected_count, 1)
+        self.assertEqual(stats.first_collected, datetime.date.today())
+        self.assertEqual(stats.current_streak, 1)
+
+    def test_collect_many_counts_videos(self):
+        """Test collecting many videos updates statistics."""
+        videos = [create_video() for _ in range(3)]
+
+        UserVideoRelation.objects.collect_many(
+            self.user, [video.id for video in videos] + [-1]
+        )
+
+        self.assertEqual(CollectionStats.objects.get(user=self.user).collected_count, 3)
+
+    def test_collect_many_counts_only_inserted_relations(self):
+        """Test a video collected concurrently after the pre-check is reported
+        as already collected and isn't counted twice."""
+        videos = [create_video() for _ in range(2)]
+        filter_videos = Video.objects.filter
+
+        with patch.object(Video.objects, "filter") as patched_filter:
+
+            def collect_concurrently(*args, **kwargs):
+                patched_filter.side_effect = filter_videos
+                UserVideoRelation.objects.collect(self.user, videos[0].id)
+                return filter_videos(*args, **kwargs)
+
+            patched_filter.side_effect = collect_concurrently
+            statuses = UserVideoRelation.objects.collect_many(
+                self.user, [video.id for video in videos]
+            )
+
+        self.assertEqual(
+            statuses,
+            {videos[0].id: "already_collected", videos[1].id: "collected"},
+        )
+        self.assertEqual(UserVideoRelation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(CollectionStats.objects.get(user=self.user).collected_count, 2)
+        videos[0].refresh_from_db()
+        self.assertEqual(videos[0].collected_count, 1)
+
+    def test_streak(self):
+        """Test streak counts days in a row ending on the last collected day."""
+        self.collect_on(1, 3, 4, 4)
+        self.assertEqual(CollectionStats.objects.get(user=self.user).streak, 2)
+        self.assertStatsRecomputed()
+
+        self.collect_on(5)
+        self.assertEqual(CollectionStats.objects.get(user=self.user).streak, 3)
+        self.assertStatsRecomputed()
+
+        self.collect_on(7)
+        self.assertEqual(CollectionStats.objects.get(user=self.user).streak, 1)
+        self.assertStatsRecomputed()
+
+    def test_current_streak_ends(self):
+        """Test streak isn't current when nothing was collected since yesterday."""
+        stats = CollectionStats(
+            user=self.user,
+            streak=3,
+            last_collected=datetime.date.today() - datetime.timedelta(days=2),
+        )
+
+        self.assertEqual(stats.current_streak, 0)
+
+    def test_uncollect_updates_stats(self):
+        """Test removing videos from collection updates statistics."""
+        self.collect_on(1, 3, 5, 6, 7)
+        relations = UserVideoRelation.objects.filter(user=self.user)
+
+        for day in [3, 7, 1]:
+            video_id = relations.get(collected=datetime.date(2023, 2, day)).video_id
+            self.assertTrue(UserVideoRelation.objects.uncollect(self.user, video_id))
+            self.assertStatsRecomputed()
+
+        stats = CollectionStats.objects.get(user=self.user)
+        self.assertEqual(stats.collected_count, 2)
+        self.assertEqual(stats.first_collected, datetime.date(2023, 2, 5))
+        self.assertEqual(stats.streak, 2)
+
+    def test_uncollect_not_collected_video(self):
+        """Test removing a video that isn't collected changes nothing."""
+        self.collect_on(1)
+
+        self.assertFalse(UserVideoRelation.objects.uncollect(self.user, -1))
+        self.assertEqual(CollectionStats.objects.get(user=self.user).collected_count, 1)
+
+    def test_collect_counts_collected_videos(self):
+        """Test collecting and uncollecting updates collected counters of videos."""
+        other_user = get_user_model().objects.create(
+            email="other@example.com", password="pass123", username="otheruser"
+        )
+        videos = [create_video() for _ in range(2)]
+
+        UserVideoRelation.objects.collect(self.user, videos[0].id)
+        UserVideoRelation.objects.collect(self.user, videos[0].id)
+        UserVideoRelation.objects.collect_many(other_user, [v.id for v in videos])
+        UserVideoRelation.objects.uncollect(other_user, videos[1].id)
+
+        for video in videos:
+            video.refresh_from_db()
+        self.assertEqual(videos[0].collected_count, 2)
+        self.assertEqual(videos[1].collected_count, 0)
+
+    def test_recount_collected(self):
+        """Test recounting repairs only counters that drifted."""
+        videos = [create_video(collected_count=count) for count in [1, 4, 0]]
+        UserVideoRelation.objects.create(user=self.user, video=videos[0])
+        UserVideoRelation.objects.create(user=self.user, video=videos[2])
+
+        repaired = Video.objects.recount_collected()
+
+        self.assertEqual(repaired, 2)
+        counts = [video.collected_count for video in Video.objects.order_by("id")]
+        self.assertEqual(counts, [1, 0, 1])
+
+    def test_collection_version_bumped_on_change(self):
+        """Test every change of collection bumps its version
+        and marks changed videos with it."""
+        videos = [create_video() for _ in range(3)]
+
+        UserVideoRelation.objects.collect(self.user, videos[0].id)
+        UserVideoRelation.objects.collect(self.user, videos[0].id)
+        UserVideoRelation.objects.collect_many(self.user, [videos[1].id, videos[2].id])
+        UserVideoRelation.objects.uncollect(self.user, videos[1].id)
+
+        self.assertEqual(CollectionStats.objects.get(user=self.user).version, 3)
+        versions = dict(UserVideoRelation.objects.values_list("video_id", "version"))
+        self.assertEqual(versions, {videos[0].id: 1, videos[2].id: 2})
+        tombstone = CollectionTombstone.objects.get(user=self.user)
+        self.assertEqual(tombstone.video_id, videos[1].id)
+        self.assertEqual(tombstone.version, 3)
+
+    def test_recompute_keeps_version(self):
+        """Test recomputing statistics doesn't reset collection version."""
+        UserVideoRelation.objects.collect(self.user, create_video().id)
+
+        CollectionStats.objects.recompute()
+
+        self.assertEqual(CollectionStats.objects.get(user=self.user).version, 1)
+
+    def test_recompute_users_without_videos(self):
+        """Test recomputing statistics of users without videos."""
+        count = CollectionStats.objects.recompute(batch_size=1)
+
+        self.assertEqual(count, 1)
+        stats = CollectionStats.objects.get(user=self.user)
+        self.assertEqual(stats.collected_count, 0)
+        self.assertIsNone(stats.last_collected)
+
+
+def channel_video_url(number):
+    """Return url of a video with YouTube-like id."""
+    return f"https://www.youtube.com/watch?v={number:011d}"
+
+
+class ChannelSyncTests(TestCase):
+    """Tests for incremental sync of Wersow's channel."""
+
+    def setUp(self):
+        cache.clear()
+        caches["youtube"].clear()
+        self.read_urls = []
+        self.channel_urls = [channel_video_url(i) for i in range(100, 0, -1)]
+
+    def iter_video_urls(self):
+        """Yield channel's urls remembering how many of them were read."""
+        for video_url in self.channel_urls:
+            self.read_urls.append(video_url)
+            yield video_url
+
+    def fake_video_data(self, video_url, refresh=False):
+        """Return data of a video without fetching it."""
+        return {
+            "url": video_url,
+            "title": video_url[-11:],
+            "thumbnail_url": VIDEO_EXAMPLE["thumbnail_url"],
+            "publish_date": datetime.date(2023, 1, 1)
+            + datetime.timedelta(days=int(video_url[-11:])),
+        }
+
+    def sync(self):
+        """Sync new videos with patched channel and YouTube."""
+        with patch(
+            "core.utils.WersowChannel.iter_video_urls",
+            side_effect=self.iter_video_urls,
+        ), patch("core.models.get_video_data", side_effect=self.fake_video_data):
+            return Video.objects.sync_new_videos()
+
+    def test_sync_stops_at_checkpoint(self):
+        """Test sync reads channel only until the last synced video."""
+        for url in self.channel_urls[3:]:
+            create_video(url=url)
+        ChannelCheckpoint.objects.advance(
+            WersowChannel.channel_id, self.channel_urls[3]
+        )
+
+        new_videos = self.sync()
+
+        self.assertEqual(len(self.read_urls), 4)
+        self.assertEqual(
+            [video.url for video in new_videos], self.channel_urls[:3]
+        )
+
+    def test_sync_without_checkpoint_skips_known_videos(self):
+        """Test sync without checkpoint reads the whole listing,
+        adds only unknown videos and saves a checkpoint."""
+        for url in self.channel_urls[2:]:
+            create_video(url=url)
+
+        new_videos = self.sync()
+
+        self.assertEqual(len(self.read_urls), len(self.channel_urls))
+        self.assertEqual(len(new_videos), 2)
+        checkpoint = ChannelCheckpoint.objects.get(
+            channel_id=WersowChannel.channel_id
+        )
+        self.assertEqual(checkpoint.latest_video_id, self.channel_urls[0][-11:])
+
+    def test_sync_adds_video_missed_by_previous_sync(self):
+        """Test sync adds a video listed before known videos
+        and doesn't move the checkpoint past a failed video."""
+        for url in self.channel_urls[3:]:
+            create_video(url=url)
+        ChannelCheckpoint.objects.advance(
+            WersowChannel.channel_id, self.channel_urls[3]
+        )
+        create_video(url=self.channel_urls[0])
+
+        def fail_second_video(video_url, refresh=False):
+            if video_url == self.channel_urls[1]:
+                raise OSError
+            return self.fake_video_data(video_url)
+
+        with patch(
+            "core.utils.WersowChannel.iter_video_urls",
+            side_effect=self.iter_video_urls,
+        ), patch("core.models.get_video_data", side_effect=fail_second_video):
+            with self.assertRaises(OSError):
+                Video.objects.sync_new_videos()
+        checkpoint = ChannelCheckpoint.objects.get(
+            channel_id=WersowChannel.channel_id
+        )
+        self.assertEqual(checkpoint.latest_video_id, self.channel_urls[2][-11:])
+
+        new_videos = self.sync()
+
+        self.assertEqual([video.url for video in new_videos], self.channel_urls[1:2])
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.latest_video_id, self.channel_urls[0][-11:])
+
+    def test_sync_without_new_videos(self):
+        """Test sync reads only the newest video when nothing was published."""
+        create_video(url=self.channel_urls[0])
+        ChannelCheckpoint.objects.advance(
+            WersowChannel.channel_id, self.channel_urls[0]
+        )
+
+        new_videos = self.sync()
+
+        self.assertEqual(new_videos, [])
+        self.assertEqual(len(self.read_urls), 1)
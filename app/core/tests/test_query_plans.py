@@ -0,0 +1,132 @@
+"""
+Tests for query plans of managers.
+"""
+import datetime
+import io
+import uuid
+
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localdate
+
+from core.models import Video, ScheduledVideo
+
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+def create_video(**params):
+    """Helper function for creating a video."""
+    return Video.objects.create(
+        title=params.pop("title", "Video"),
+        url=params.pop("url", f"https://www.youtube.com/watch?v={uuid.uuid4()}"),
+        thumbnail_url=params.pop("thumbnail_url", "https://i.ytimg.com/vi/1.jpg"),
+        publish_date=params.pop("publish_date", datetime.date(2023, 3, 7)),
+        **params,
+    )
+
+
+class QueryPlanTests(TestCase):
+    """Test queries of managers use indexes.
+
+    Sequential scans are disabled for the test transaction,
+    so planner uses a sequential scan only when there is no usable index.
+    """
+
+    def setUp(self):
+        cache.clear()
+        caches["youtube"].clear()
+        self.videos = [create_video() for _ in range(50)]
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertNoSequentialScans(self, queries):
+        """Explain every captured query and check none of them scans a table."""
+        explained = 0
+        for query in queries:
+            sql = query["sql"]
+            if not sql.startswith(EXPLAINED_STATEMENTS):
+                continue
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+
+            explained += 1
+            self.assertNotIn("Seq Scan", plan, f"{sql}\n{plan}")
+
+        self.assertGreater(explained, 0)
+
+    def test_todays_scheduled_video(self):
+        """Test looking up scheduled today's video uses indexes."""
+        ScheduledVideo.objects.create(date=localdate(), video=self.videos[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.todays()
+
+        self.assertNoSequentialScans(queries)
+
+    def test_todays_marked_video(self):
+        """Test looking up video marked as today's uses indexes."""
+        self.videos[0].todays = True
+        self.videos[0].save()
+
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.todays()
+
+        self.assertNoSequentialScans(queries)
+
+    def test_change_todays_video(self):
+        """Test changing today's video uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.change_todays_video()
+
+        self.assertNoSequentialScans(queries)
+
+    def test_change_scheduled_todays_video(self):
+        """Test changing today's video in the schedule uses indexes."""
+        ScheduledVideo.objects.fill(days=10)
+
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.change_todays_video()
+
+        self.assertNoSequentialScans(queries)
+
+    def test_random_video(self):
+        """Test picking random video uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.random()
+
+        self.assertNoSequentialScans(queries)
+
+    def test_fill_and_splice_schedule(self):
+        """Test scheduling today's videos uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            ScheduledVideo.objects.fill(days=10)
+            ScheduledVideo.objects.splice(create_video())
+
+        self.assertNoSequentialScans(queries)
+
+    @patch("core.utils.WersowChannel.get_latest_video_url")
+    def test_add_latest_video(self, patched_latest):
+        """Test checking if latest video is new uses indexes."""
+        patched_latest.return_value = self.videos[0].url
+
+        with CaptureQueriesContext(connection) as queries:
+            Video.objects.add_latest_video()
+
+        self.assertNoSequentialScans(queries)
+
+    @patch("core.utils.WersowChannel.get_video_urls")
+    def test_loadvideos(self, patched_video_urls):
+        """Test loadvideos command uses indexes."""
+        patched_video_urls.return_value = [video.url for video in self.videos]
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("loadvideos", stdout=io.StringIO())
+
+        self.assertNoSequentialScans(queries)
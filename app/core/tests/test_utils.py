@@ -1,9 +1,16 @@
 """
 Tests for utils.
 """
+import datetime
+
+from unittest.mock import PropertyMock, patch
+
+from django.core.cache import caches
 from django.test import TestCase
 
-from core.utils import WersowChannel
+from core.utils import WersowChannel, get_video_data
+
+VIDEO_URLS = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(3)]
 
 
 class TestWersowChannel(TestCase):
@@ -30,3 +37,76 @@ class TestWersowChannel(TestCase):
         url = self.wersow_channel.get_latest_video_url()
 
         self.assertIn("https://www.youtube.com", url)
+
+
+@patch("core.youtube.Channel")
+class TestWersowChannelCache(TestCase):
+    """Tests for caching Wersow's channel listing."""
+
+    def setUp(self):
+        caches["youtube"].clear()
+
+    def test_listing_reused_by_next_channel(self, patched_channel):
+        """Test listing fetched once is reused by another WersowChannel."""
+        video_urls = PropertyMock(return_value=VIDEO_URLS)
+        type(patched_channel.return_value).video_urls = video_urls
+
+        WersowChannel().get_video_urls()
+        cached_urls = WersowChannel().get_video_urls()
+
+        self.assertEqual(cached_urls, VIDEO_URLS)
+        video_urls.assert_called_once()
+
+    def test_refresh_ignores_cached_listing(self, patched_channel):
+        """Test refresh fetches listing again."""
+        video_urls = PropertyMock(return_value=VIDEO_URLS)
+        type(patched_channel.return_value).video_urls = video_urls
+
+        WersowChannel().get_video_urls()
+        WersowChannel(refresh=True).get_video_urls()
+
+        self.assertEqual(video_urls.call_count, 2)
+
+    def test_new_videos_read_past_cached_listing(self, patched_channel):
+        """Test iterating the listing to find new videos ignores cached listing."""
+        video_urls = PropertyMock(return_value=VIDEO_URLS[1:])
+        type(patched_channel.return_value).video_urls = video_urls
+        WersowChannel().get_video_urls()
+        video_urls.return_value = VIDEO_URLS
+
+        latest_url = WersowChannel().get_latest_video_url()
+
+        self.assertEqual(latest_url, VIDEO_URLS[0])
+
+
+@patch("core.youtube.YouTube")
+class TestGetVideoData(TestCase):
+    """Tests for fetching video data."""
+
+    def setUp(self):
+        caches["youtube"].clear()
+        self.url = VIDEO_URLS[0]
+
+    def test_video_data_reused(self, patched_youtube):
+        """Test video data fetched once is reused."""
+        patched_youtube.return_value.title = "Title"
+        patched_youtube.return_value.thumbnail_url = "https://i.ytimg.com/vi/1.jpg"
+        patched_youtube.return_value.publish_date = datetime.datetime(2023, 3, 7)
+
+        get_video_data(self.url)
+        video_data = get_video_data(self.url)
+
+        patched_youtube.assert_called_once_with(self.url)
+        self.assertEqual(video_data["title"], "Title")
+        self.assertEqual(video_data["publish_date"], datetime.date(2023, 3, 7))
+
+    def test_refresh_ignores_cached_video_data(self, patched_youtube):
+        """Test refresh fetches video data again."""
+        patched_youtube.return_value.title = "Title"
+        patched_youtube.return_value.thumbnail_url = "https://i.ytimg.com/vi/1.jpg"
+        patched_youtube.return_value.publish_date = datetime.datetime(2023, 3, 7)
+
+        get_video_data(self.url)
+        get_video_data(self.url, refresh=True)
+
+        self.assertEqual(patched_youtube.call_count, 2)
@@ -0,0 +1,103 @@
+"""
+Tests for YouTube transports.
+"""
+import datetime
+import tempfile
+
+from unittest.mock import PropertyMock, patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core.youtube import (
+    FixtureNotFound,
+    FixtureStore,
+    LiveTransport,
+    RecordingTransport,
+    ReplayTransport,
+    get_transport,
+)
+
+CHANNEL_ID = "channel"
+VIDEO_URLS = [f"https://www.youtube.com/watch?v={i:011d}" for i in range(3)]
+VIDEO_DATA = {
+    "url": VIDEO_URLS[0],
+    "title": "Title",
+    "thumbnail_url": "https://i.ytimg.com/vi/1.jpg",
+    "publish_date": datetime.date(2023, 3, 7),
+}
+
+
+class TransportTests(SimpleTestCase):
+    """Tests for recording and replaying YouTube responses."""
+
+    def setUp(self):
+        fixtures_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(fixtures_dir.cleanup)
+        self.fixtures_dir = fixtures_dir.name
+        self.store = FixtureStore(self.fixtures_dir)
+
+    @patch("core.youtube.Channel")
+    def test_recorded_channel_replayed(self, patched_channel):
+        """Test channel listing recorded from YouTube is replayed."""
+        type(patched_channel.return_value).video_urls = PropertyMock(
+            return_value=iter(VIDEO_URLS)
+        )
+
+        recorded = list(
+            RecordingTransport(self.store).iter_channel_video_urls(CHANNEL_ID)
+        )
+        replayed = list(ReplayTransport(self.store).iter_channel_video_urls(CHANNEL_ID))
+
+        self.assertEqual(recorded, VIDEO_URLS)
+        self.assertEqual(replayed, VIDEO_URLS)
+
+    @patch("core.youtube.Channel")
+    def test_partly_read_channel_keeps_older_recording(self, patched_channel):
+        """Test reading only the newest videos doesn't drop recorded older ones."""
+        self.store.save_channel(CHANNEL_ID, VIDEO_URLS[1:])
+        new_video_urls = [VIDEO_URLS[0], VIDEO_URLS[1], "never read"]
+        type(patched_channel.return_value).video_urls = PropertyMock(
+            return_value=iter(new_video_urls)
+        )
+
+        video_urls = RecordingTransport(self.store).iter_channel_video_urls(CHANNEL_ID)
+        next(video_urls)
+        next(video_urls)
+        video_urls.close()
+
+        self.assertEqual(self.store.load_channel(CHANNEL_ID), VIDEO_URLS)
+
+    @patch("core.youtube.YouTube")
+    def test_recorded_video_replayed(self, patched_youtube):
+        """Test video data recorded from YouTube is replayed."""
+        patched_youtube.return_value.title = VIDEO_DATA["title"]
+        patched_youtube.return_value.thumbnail_url = VIDEO_DATA["thumbnail_url"]
+        patched_youtube.return_value.publish_date = datetime.datetime(2023, 3, 7)
+
+        recorded = RecordingTransport(self.store).get_video_data(VIDEO_URLS[0])
+        replayed = ReplayTransport(self.store).get_video_data(VIDEO_URLS[0])
+
+        self.assertEqual(recorded, VIDEO_DATA)
+        self.assertEqual(replayed, VIDEO_DATA)
+
+    def test_replay_missing_fixture(self):
+        """Test replaying a response that wasn't recorded raises an error."""
+        with self.assertRaises(FixtureNotFound):
+            ReplayTransport(self.store).get_video_data(VIDEO_URLS[0])
+
+    def test_transport_chosen_by_settings(self):
+        """Test get_transport returns transport set in settings."""
+        for name, transport_class in [
+            ("live", LiveTransport),
+            ("record", RecordingTransport),
+            ("replay", ReplayTransport),
+        ]:
+            with override_settings(
+                YOUTUBE_TRANSPORT=name, YOUTUBE_FIXTURES_DIR=self.fixtures_dir
+            ):
+                self.assertIs(type(get_transport()), transport_class)
+
+        with override_settings(YOUTUBE_TRANSPORT="unknown"):
+            with self.assertRaises(ImproperlyConfigured):
+                get_transport()
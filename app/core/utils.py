@@ -2,7 +2,11 @@
 Utils
 """
 from pytube import Channel
-from typing import List
+from typing import Iterator, List
+
+from django.core.cache import caches
+
+from .youtube import get_channel_url, get_transport, get_video_id  # noqa: F401
 
 
 class NoVideosException(Exception):
@@ -12,19 +16,55 @@ class NoVideosException(Exception):
 class WersowChannel:
     """Wersow's channel."""
 
-    def __init__(self):
-        self.channel = Channel(
-            "https://www.youtube.com/channel/UCtVy1X-hcxAL2ZlS6TqMQFw"
-        )
+    channel_id = "UCtVy1X-hcxAL2ZlS6TqMQFw"
+
+    def __init__(self, refresh: bool = False):
+        """Set refresh to ignore listing cached by previous runs."""
+        self.channel = Channel(get_channel_url(self.channel_id))
+        self.cache_key = f"channel:{self.channel_id}:video-urls"
+        self.refresh = refresh
         self.video_urls = None
 
     def get_video_urls(self) -> List[str]:
-        """Return list of channel's video urls."""
+        """Return list of channel's video urls.
+
+        Listing cached by previous runs is reused unless refresh is set.
+        """
+        if self.video_urls is None and not self.refresh:
+            self.video_urls = caches["youtube"].get(self.cache_key)
         if self.video_urls is None:
-            self.video_urls = self.channel.video_urls
+            self.video_urls = list(
+                get_transport().iter_channel_video_urls(self.channel_id)
+            )
+            caches["youtube"].set(self.cache_key, self.video_urls)
 
         return self.video_urls
 
+    def iter_video_urls(self) -> Iterator[str]:
+        """Yield channel's video urls from the newest one.
+
+        Listing is always read from YouTube, because it's used to find new
+        videos, which a cached listing can't contain. Next pages are fetched
+        only when they are needed.
+        """
+        yield from get_transport().iter_channel_video_urls(self.channel_id)
+
     def get_latest_video_url(self) -> str:
         """Return url of the latest Wersow's video."""
-        return self.get_video_urls()[0]
+        return next(self.iter_video_urls())
+
+
+def get_video_data(video_url: str, refresh: bool = False) -> dict:
+    """Fetch data of a video needed to add it to database.
+
+    Data fetched by previous runs is reused unless refresh is set.
+    """
+    cache_key = f"video:{get_video_id(video_url)}"
+    if not refresh:
+        video_data = caches["youtube"].get(cache_key)
+        if video_data is not None:
+            return video_data
+
+    video_data = get_transport().get_video_data(video_url)
+    caches["youtube"].set(cache_key, video_data)
+    return video_data
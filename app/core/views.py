@@ -0,0 +1,58 @@
+"""
+Views shared between apps.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.urls import path
+from rest_framework import generics
+
+
+class AsyncGenericAPIView(generics.GenericAPIView):
+    """Generic view whose handlers are coroutines.
+
+    Served through ASGI the handlers run on the event loop and can await
+    the database or a pool without holding a thread. Authentication,
+    permissions and throttling may query the database, so they run
+    in a thread like sync views do.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), handler)
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def with_async_views(urlpatterns, async_views: dict):
+    """Return urlpatterns with views of the named patterns replaced by async views.
+
+    Used by urlconfs served through ASGI only. Under WSGI async views run
+    through async_to_sync, which is slower than the sync views they replace.
+    """
+    return [
+        path(
+            str(pattern.pattern), async_views[pattern.name].as_view(), name=pattern.name
+        )
+        if pattern.name in async_views
+        else pattern
+        for pattern in urlpatterns
+    ]
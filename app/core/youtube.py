@@ -0,0 +1,158 @@
+"""
+Access to YouTube that can record responses and replay them offline.
+"""
+import datetime
+import json
+
+from pathlib import Path
+from typing import Iterator, List
+
+from pytube import Channel, YouTube, extract
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class FixtureNotFound(LookupError):
+    """Response wasn't recorded."""
+
+
+def get_channel_url(channel_id: str) -> str:
+    """Return url of a channel."""
+    return f"https://www.youtube.com/channel/{channel_id}"
+
+
+def get_video_id(video_url: str) -> str:
+    """Return YouTube id of a video."""
+    return extract.video_id(video_url)
+
+
+class LiveTransport:
+    """Fetch everything from YouTube."""
+
+    def iter_channel_video_urls(self, channel_id: str) -> Iterator[str]:
+        """Yield channel's video urls from the newest one.
+
+        Next pages of the listing are fetched only when they are needed.
+        """
+        yield from Channel(get_channel_url(channel_id)).video_urls
+
+    def get_video_data(self, video_url: str) -> dict:
+        """Fetch data of a video needed to add it to database."""
+        video = YouTube(video_url)
+        return {
+            "url": video_url,
+            "title": video.title,
+            "thumbnail_url": video.thumbnail_url,
+            "publish_date": video.publish_date.date(),
+        }
+
+
+class FixtureStore:
+    """Directory with recorded channel listings and video data."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def channel_path(self, channel_id: str) -> Path:
+        return self.path / "channels" / f"{channel_id}.json"
+
+    def video_path(self, video_url: str) -> Path:
+        return self.path / "videos" / f"{get_video_id(video_url)}.json"
+
+    def load_channel(self, channel_id: str) -> List[str]:
+        """Return recorded listing of a channel."""
+        return self.load(self.channel_path(channel_id))
+
+    def save_channel(self, channel_id: str, video_urls: List[str]):
+        """Record listing of a channel."""
+        self.save(self.channel_path(channel_id), video_urls)
+
+    def load_video(self, video_url: str) -> dict:
+        """Return recorded data of a video."""
+        video_data = self.load(self.video_path(video_url))
+        video_data["publish_date"] = datetime.date.fromisoformat(
+            video_data["publish_date"]
+        )
+        return video_data
+
+    def save_video(self, video_data: dict):
+        """Record data of a video."""
+        self.save(
+            self.video_path(video_data["url"]),
+            {**video_data, "publish_date": video_data["publish_date"].isoformat()},
+        )
+
+    @staticmethod
+    def load(path: Path):
+        try:
+            with path.open() as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise FixtureNotFound(f"{path} wasn't recorded")
+
+    @staticmethod
+    def save(path: Path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as file:
+            json.dump(data, file)
+
+
+class RecordingTransport(LiveTransport):
+    """Fetch everything from YouTube and record it in a fixture store."""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def iter_channel_video_urls(self, channel_id: str) -> Iterator[str]:
+        """Yield channel's video urls recording the part that was read.
+
+        The part that was read replaces the newest part of previous recording.
+        """
+        video_urls = []
+        try:
+            for video_url in super().iter_channel_video_urls(channel_id):
+                video_urls.append(video_url)
+                yield video_url
+        finally:
+            try:
+                recorded = self.store.load_channel(channel_id)
+            except FixtureNotFound:
+                recorded = []
+            read = set(video_urls)
+            self.store.save_channel(
+                channel_id, video_urls + [url for url in recorded if url not in read]
+            )
+
+    def get_video_data(self, video_url: str) -> dict:
+        video_data = super().get_video_data(video_url)
+        self.store.save_video(video_data)
+        return video_data
+
+
+class ReplayTransport:
+    """Read everything from a fixture store without touching the network."""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def iter_channel_video_urls(self, channel_id: str) -> Iterator[str]:
+        yield from self.store.load_channel(channel_id)
+
+    def get_video_data(self, video_url: str) -> dict:
+        return self.store.load_video(video_url)
+
+
+def get_transport():
+    """Return transport chosen by YOUTUBE_TRANSPORT setting."""
+    transport = settings.YOUTUBE_TRANSPORT
+    if transport == "live":
+        return LiveTransport()
+
+    store = FixtureStore(settings.YOUTUBE_FIXTURES_DIR)
+    if transport == "record":
+        return RecordingTransport(store)
+    if transport == "replay":
+        return ReplayTransport(store)
+
+    raise ImproperlyConfigured(f"Unknown YOUTUBE_TRANSPORT: {transport}")
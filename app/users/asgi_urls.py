@@ -0,0 +1,11 @@
+"""
+Urls for users served through ASGI.
+"""
+from core.views import with_async_views
+from users import urls, views
+
+app_name = urls.app_name
+urlpatterns = with_async_views(
+    urls.urlpatterns,
+    {"login": views.AsyncLoginView, "register": views.AsyncSignUpView},
+)
@@ -0,0 +1,103 @@
+"""
+Authentication of users API clients.
+"""
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.models import ClaimsUser
+
+ACTIVE_USERS_MAX_SIZE = 10000
+ACTIVE_USERS_TTL = 30
+
+
+class ActiveUsers:
+    """Recent checks whether users are active kept in memory of the worker.
+
+    The least recently used checks are dropped above max_size entries
+    and every check is repeated after ttl seconds, so a user deactivated
+    by another worker is refused at most ttl seconds later.
+    """
+
+    def __init__(
+        self, max_size: int = ACTIVE_USERS_MAX_SIZE, ttl: int = ACTIVE_USERS_TTL
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.checks = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_active(self, user_id) -> bool:
+        """Return whether user exists and is active, querying only on a miss."""
+        with self.lock:
+            check = self.checks.get(user_id)
+            if check is not None and time.monotonic() - check[1] <= self.ttl:
+                self.checks.move_to_end(user_id)
+                return check[0]
+
+        is_active = (
+            get_user_model().objects.filter(pk=user_id, is_active=True).exists()
+        )
+        with self.lock:
+            self.checks[user_id] = (is_active, time.monotonic())
+            self.checks.move_to_end(user_id)
+            while len(self.checks) > self.max_size:
+                self.checks.popitem(last=False)
+
+        return is_active
+
+    def forget(self, user_id):
+        """Check the user again on next request."""
+        with self.lock:
+            self.checks.pop(user_id, None)
+
+    def clear(self):
+        """Forget every check."""
+        with self.lock:
+            self.checks.clear()
+
+
+active_users = ActiveUsers()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication building the user from token claims.
+
+    For endpoints which need only id of the user. Instead of loading the user
+    on every request, only the cached check whether the user is active
+    is made, so authentication usually takes no queries.
+    """
+
+    def get_user(self, validated_token):
+        """Return user with id, email and username from the token."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not active_users.is_active(user_id):
+            raise AuthenticationFailed(
+                _("User not found or inactive"), code="user_inactive"
+            )
+
+        return ClaimsUser(
+            **{api_settings.USER_ID_FIELD: user_id},
+            email=validated_token.get("email", ""),
+            username=validated_token.get("username", ""),
+            is_active=True,
+        )
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Describe authentication with token claims as the usual JWT one in schema."""
+
+    target_class = ClaimsJWTAuthentication
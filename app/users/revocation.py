@@ -0,0 +1,174 @@
+"""
+Revocation of refresh tokens.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from core.models import RevokedToken
+
+REVOKED_TOKENS_SYNC_INTERVAL = 2
+REVOKED_TOKENS_SYNC_WINDOW = 1000
+REVOKED_TOKENS_REBUILD_INTERVAL = 60 * 60
+REVOKED_TOKENS_ERROR_RATE = 0.01
+REVOKED_TOKENS_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """Set of strings answering whether it may contain a string.
+
+    It never misses a string that was added and wrongly claims to contain
+    one that wasn't with about error_rate probability while it holds
+    at most capacity strings.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: str):
+        """Return positions of bits of the key."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little")
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+
+class RevokedTokens:
+    """Ids of revoked tokens kept in memory of the worker.
+
+    Ids are held in a Bloom filter, so a token that wasn't revoked
+    is accepted without a query and only possible matches are confirmed
+    in the database. Tokens revoked by other workers are read every
+    sync_interval seconds, so a revoked token may still be accepted
+    by another worker for that long. Ids aren't committed in order, so ids
+    missing among the last REVOKED_TOKENS_SYNC_WINDOW read ones are read
+    again on every sync. Every rebuild_interval seconds expired
+    tokens are pruned and the filter is built anew to drop them.
+    """
+
+    def __init__(
+        self,
+        sync_interval: int = REVOKED_TOKENS_SYNC_INTERVAL,
+        rebuild_interval: int = REVOKED_TOKENS_REBUILD_INTERVAL,
+    ):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.filter = None
+        self.built = None
+        self.synced = None
+        self.last_id = 0
+        self.missing_ids = set()
+        self.lock = threading.Lock()
+
+    def sync(self):
+        """Read tokens revoked since the last sync, rebuilding if it's time."""
+        with self.lock:
+            now = time.monotonic()
+            if (
+                self.filter is None
+                or now - self.built > self.rebuild_interval
+                or self.filter.count > self.filter.capacity
+            ):
+                self.rebuild(now)
+            elif now - self.synced > self.sync_interval:
+                tokens = RevokedToken.objects.filter(
+                    Q(id__gt=self.last_id) | Q(id__in=self.missing_ids)
+                )
+                self.read(tokens.values_list("id", "jti"))
+                self.synced = now
+
+    def rebuild(self, now: float):
+        """Prune expired tokens and load the remaining ones to a new filter."""
+        RevokedToken.objects.prune()
+        tokens = list(RevokedToken.objects.values_list("id", "jti"))
+        capacity = max(len(tokens) * 2, REVOKED_TOKENS_MIN_CAPACITY)
+        self.filter = BloomFilter(capacity, REVOKED_TOKENS_ERROR_RATE)
+        self.last_id = 0
+        self.missing_ids = set()
+        self.read(tokens)
+        self.built = self.synced = now
+
+    def read(self, tokens):
+        """Add tokens from (id, jti) pairs to the filter
+        and remember ids skipped near the newest one."""
+        token_ids = []
+        for token_id, jti in tokens:
+            self.filter.add(jti.hex)
+            token_ids.append(token_id)
+        self.missing_ids.difference_update(token_ids)
+
+        new_ids = sorted(token_id for token_id in token_ids if token_id > self.last_id)
+        if not new_ids:
+            return
+
+        floor = new_ids[-1] - REVOKED_TOKENS_SYNC_WINDOW
+        previous_id = self.last_id
+        for token_id in new_ids:
+            self.missing_ids.update(range(max(previous_id, floor) + 1, token_id))
+            previous_id = token_id
+        self.missing_ids = {
+            token_id for token_id in self.missing_ids if token_id > floor
+        }
+        self.last_id = new_ids[-1]
+
+    def is_revoked(self, jti: str) -> bool:
+        """Return whether token was revoked, querying only on a possible match."""
+        self.sync()
+        if jti not in self.filter:
+            return False
+
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti: str, expires):
+        """Revoke token until it expires."""
+        RevokedToken.objects.revoke(jti, expires)
+        self.sync()
+        with self.lock:
+            self.filter.add(jti)
+
+    def clear(self):
+        """Forget the loaded filter."""
+        with self.lock:
+            self.filter = None
+
+
+revoked_tokens = RevokedTokens()
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Refresh token refused after it was revoked, e.g. by rotation."""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if revoked_tokens.is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is revoked"))
+
+    def blacklist(self):
+        """Revoke the token, simplejwt calls it after rotation."""
+        revoked_tokens.revoke(
+            self[api_settings.JTI_CLAIM], datetime_from_epoch(self["exp"])
+        )
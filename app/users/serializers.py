@@ -5,7 +5,12 @@ from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+
+from users.revocation import RevocableRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -25,6 +30,8 @@ class UserSerializer(serializers.ModelSerializer):
 class LoginSerializer(TokenObtainPairSerializer):
     """Serializer for LoginView."""
 
+    token_class = RevocableRefreshToken
+
     @classmethod
     def get_token(cls, user):
         """Return token with additional email and username data."""
@@ -34,3 +41,9 @@ class LoginSerializer(TokenObtainPairSerializer):
         token["username"] = user.username
 
         return token
+
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """Serializer for RefreshView revoking the rotated token."""
+
+    token_class = RevocableRefreshToken
@@ -0,0 +1,20 @@
+"""
+Signal handlers.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import active_users
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, **kwargs):
+    """Check again whether a changed user is active."""
+    active_users.forget(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender, instance, **kwargs):
+    """Refuse tokens of a deleted user."""
+    active_users.forget(instance.pk)
@@ -0,0 +1,146 @@
+"""
+Tests for authentication with token claims.
+"""
+import datetime
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ClaimsUser, UserVideoRelation, Video
+from users.authentication import (
+    ActiveUsers,
+    ClaimsJWTAuthentication,
+    active_users,
+)
+from users.serializers import LoginSerializer
+
+MY_STATS_URL = reverse("videos:my-stats")
+COLLECT_VIDEO_URL = reverse("videos:collect-video")
+UNCOLLECT_VIDEO_URL = reverse("videos:uncollect-video")
+
+
+def create_user(**params):
+    """Helper function for creating users."""
+    email = params.pop("email", "test@example.com")
+    password = params.pop("password", "testpass123")
+    username = params.pop("username", "testusername")
+
+    return get_user_model().objects.create_user(
+        email=email, password=password, username=username, **params
+    )
+
+
+class ActiveUsersTests(TestCase):
+    """Test cached checks of active users."""
+
+    def test_check_cached(self):
+        """Test user is checked with a query only once."""
+        user = create_user()
+        checks = ActiveUsers()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(checks.is_active(user.id))
+            self.assertTrue(checks.is_active(user.id))
+
+    def test_missing_user_isnt_active(self):
+        """Test not existing user isn't active."""
+        self.assertFalse(ActiveUsers().is_active(1))
+
+    def test_check_expires(self):
+        """Test user is checked again after ttl."""
+        user = create_user()
+        checks = ActiveUsers(ttl=30)
+
+        with patch("time.monotonic", return_value=100):
+            checks.is_active(user.id)
+        get_user_model().objects.filter(pk=user.pk).update(is_active=False)
+
+        with patch("time.monotonic", return_value=120):
+            self.assertTrue(checks.is_active(user.id))
+        with patch("time.monotonic", return_value=131):
+            self.assertFalse(checks.is_active(user.id))
+
+    def test_least_recently_used_check_dropped(self):
+        """Test the least recently used check is dropped above max size."""
+        users = [create_user(email=f"test{i}@example.com") for i in range(3)]
+        checks = ActiveUsers(max_size=2)
+
+        for user in [users[0], users[1], users[0], users[2]]:
+            checks.is_active(user.id)
+
+        self.assertEqual(list(checks.checks), [users[0].id, users[2].id])
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    """Test authenticating with user built from token claims."""
+
+    def setUp(self):
+        active_users.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        token = LoginSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_user_built_from_claims(self):
+        """Test user carries id, email and username of the token."""
+        token = LoginSerializer.get_token(self.user).access_token
+
+        user = ClaimsJWTAuthentication().get_user(token)
+
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(user.username, self.user.username)
+        with self.assertRaises(NotImplementedError):
+            user.save()
+
+    def test_authentication_takes_no_queries(self):
+        """Test authentication doesn't query after user was checked."""
+        self.client.get(MY_STATS_URL)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(MY_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_collect_and_uncollect_as_user_from_claims(self):
+        """Test user built from claims can change their collection."""
+        video = Video.objects.create(
+            title="Video",
+            url="https://www.youtube.com/watch?v=00000000000",
+            thumbnail_url="https://i.ytimg.com/vi/1.jpg",
+            publish_date=datetime.date(2023, 3, 7),
+        )
+
+        res = self.client.post(COLLECT_VIDEO_URL, {"video_id": video.id})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(UserVideoRelation.objects.filter(user=self.user).exists())
+
+        res = self.client.post(UNCOLLECT_VIDEO_URL, {"video_id": video.id})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(UserVideoRelation.objects.filter(user=self.user).exists())
+
+    def test_deactivated_user_refused(self):
+        """Test token of a deactivated user is refused right away."""
+        self.client.get(MY_STATS_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(MY_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_refused(self):
+        """Test token of a deleted user is refused right away."""
+        self.client.get(MY_STATS_URL)
+
+        self.user.delete()
+        res = self.client.get(MY_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,166 @@
+"""
+Tests for revocation of refresh tokens.
+"""
+import datetime
+import uuid
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import RevokedToken
+from users.revocation import BloomFilter, RevokedTokens, revoked_tokens
+
+LOGIN_URL = reverse("users:login")
+TOKEN_REFRESH_URL = reverse("users:token_refresh")
+
+
+class BloomFilterTests(TestCase):
+    """Test the Bloom filter."""
+
+    def test_added_keys_found(self):
+        """Test filter contains every key that was added."""
+        keys = [uuid.uuid4().hex for _ in range(1000)]
+        bloom = BloomFilter(1000, 0.01)
+
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positives_rare(self):
+        """Test filter rarely claims to contain keys that weren't added."""
+        bloom = BloomFilter(1000, 0.01)
+        for _ in range(1000):
+            bloom.add(uuid.uuid4().hex)
+
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+
+        self.assertLess(false_positives, 300)
+
+
+class RevokedTokensTests(TestCase):
+    """Test the store of revoked tokens."""
+
+    def setUp(self):
+        self.expires = now() + datetime.timedelta(days=1)
+
+    def test_not_revoked_checked_without_query(self):
+        """Test token that wasn't revoked is accepted without a query."""
+        tokens = RevokedTokens()
+        tokens.revoke(uuid.uuid4().hex, self.expires)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(tokens.is_revoked(uuid.uuid4().hex))
+
+    def test_revoked_token_found(self):
+        """Test revoked token is refused."""
+        jti = uuid.uuid4().hex
+        tokens = RevokedTokens()
+
+        tokens.revoke(jti, self.expires)
+
+        self.assertTrue(tokens.is_revoked(jti))
+        self.assertTrue(RevokedToken.objects.filter(jti=jti).exists())
+
+    def test_revoked_by_other_worker_found_after_sync(self):
+        """Test token revoked elsewhere is refused after the sync interval."""
+        jti = uuid.uuid4().hex
+        tokens = RevokedTokens(sync_interval=2)
+        with patch("time.monotonic", return_value=100):
+            tokens.sync()
+
+        RevokedToken.objects.revoke(jti, self.expires)
+
+        with patch("time.monotonic", return_value=101):
+            self.assertFalse(tokens.is_revoked(jti))
+        with patch("time.monotonic", return_value=103):
+            self.assertTrue(tokens.is_revoked(jti))
+
+    def test_token_committed_after_newer_one_found(self):
+        """Test token whose lower id commits after a higher id was read
+        is refused after the next sync."""
+        tokens = RevokedTokens(sync_interval=2)
+        RevokedToken.objects.create(id=10, jti=uuid.uuid4(), expires=self.expires)
+        with patch("time.monotonic", return_value=100):
+            tokens.sync()
+        RevokedToken.objects.create(id=13, jti=uuid.uuid4(), expires=self.expires)
+        with patch("time.monotonic", return_value=103):
+            tokens.sync()
+
+        late = RevokedToken.objects.create(
+            id=12, jti=uuid.uuid4(), expires=self.expires
+        )
+
+        with patch("time.monotonic", return_value=106):
+            self.assertTrue(tokens.is_revoked(late.jti.hex))
+        self.assertIn(11, tokens.missing_ids)
+        self.assertNotIn(12, tokens.missing_ids)
+
+    def test_rebuild_prunes_expired_tokens(self):
+        """Test expired tokens are deleted when the filter is rebuilt."""
+        expired = uuid.uuid4().hex
+        valid = uuid.uuid4().hex
+        RevokedToken.objects.revoke(expired, now() - datetime.timedelta(seconds=1))
+        RevokedToken.objects.revoke(valid, self.expires)
+        tokens = RevokedTokens(rebuild_interval=60)
+        with patch("time.monotonic", return_value=100):
+            tokens.sync()
+
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)),
+            [uuid.UUID(valid)],
+        )
+        with patch("time.monotonic", return_value=161):
+            self.assertTrue(tokens.is_revoked(valid))
+
+
+class RefreshTokenRotationTests(TestCase):
+    """Test refreshing tokens through the API."""
+
+    def setUp(self):
+        revoked_tokens.clear()
+        get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123", username="test"
+        )
+        self.client = APIClient()
+        res = self.client.post(
+            LOGIN_URL, {"email": "test@example.com", "password": "testpass123"}
+        )
+        self.refresh = res.data["refresh"]
+
+    def test_refresh_rotates_token(self):
+        """Test refreshing returns new access and refresh tokens."""
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertNotEqual(res.data["refresh"], self.refresh)
+
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": res.data["refresh"]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_refresh_query_count(self):
+        """Test a refresh with a loaded filter only queries to revoke
+        the used token, which the refresh benchmark reports per refresh."""
+        revoked_tokens.sync()
+
+        with self.assertNumQueries(1):
+            res = self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rotated_token_refused(self):
+        """Test refresh token can't be used again after rotation."""
+        self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
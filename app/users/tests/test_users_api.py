@@ -4,12 +4,21 @@ Tests for users API.
 import base64
 import json
 
-from django.test import TestCase
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
 from django.test import Client
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.urls import resolve, reverse
 
 from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.hashing import password_hashing
+from users.views import AsyncLoginView, LoginView
 
 
 def create_user(**params):
@@ -25,11 +34,14 @@ def create_user(**params):
 
 SIGN_UP_URL = reverse("users:register")
 LOG_IN_URL = reverse("users:login")
+HASHING_METRICS_URL = reverse("users:hashing-metrics")
 
 
 class AuthenticationTests(TestCase):
     """Tests for user authentication."""
 
+    login_view_class = LoginView
+
     def setUp(self):
         self.client = Client()
 
@@ -98,3 +110,144 @@ class AuthenticationTests(TestCase):
         self.assertEqual(res_data["user_id"], user.id)
         self.assertEqual(res_data["email"], user.email)
         self.assertEqual(res_data["username"], user.username)
+
+    def test_wrong_password_refused(self):
+        """Test log in with a wrong password is refused."""
+        user = create_user(password="testpass123")
+
+        payload = {"email": user.email, "password": "wrongpass123"}
+        res = self.client.post(LOG_IN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_email_refused(self):
+        """Test log in with an email nobody registered is refused."""
+        payload = {"email": "nobody@example.com", "password": "testpass123"}
+        res = self.client.post(LOG_IN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_refused(self):
+        """Test deactivated user can't log in."""
+        user = create_user(password="testpass123", is_active=False)
+
+        payload = {"email": user.email, "password": "testpass123"}
+        res = self.client.post(LOG_IN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_signed_up_user_can_log_in(self):
+        """Test password hashed when signing up matches at log in."""
+        payload = {
+            "email": "test@example.com",
+            "password": "testpass123",
+            "username": "testusername",
+        }
+        self.client.post(SIGN_UP_URL, payload)
+
+        res = self.client.post(
+            LOG_IN_URL, {"email": payload["email"], "password": payload["password"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_log_in_routed_to_view_of_server(self):
+        """Test log in is served by the view meant for the server."""
+        self.assertIs(resolve(LOG_IN_URL).func.view_class, self.login_view_class)
+
+    def test_failed_log_in_sends_signal(self):
+        """Test refused log in is reported to user_login_failed receivers
+        without the password."""
+        user = create_user(password="testpass123")
+        receiver = MagicMock()
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+
+        payload = {"email": user.email, "password": "wrongpass123"}
+        self.client.post(LOG_IN_URL, payload)
+
+        receiver.assert_called_once()
+        credentials = receiver.call_args.kwargs["credentials"]
+        self.assertEqual(credentials["email"], user.email)
+        self.assertNotEqual(credentials["password"], payload["password"])
+
+    def test_outdated_hash_upgraded_on_log_in(self):
+        """Test password hashed with an outdated hasher is hashed again."""
+        user = create_user()
+        user.password = make_password("testpass123", hasher="pbkdf2_sha1")
+        user.save()
+
+        payload = {"email": user.email, "password": "testpass123"}
+        res = self.client.post(LOG_IN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+
+
+@override_settings(ROOT_URLCONF="app.asgi_urls")
+class AsyncAuthenticationTests(AuthenticationTests):
+    """Tests for user authentication through async views served through ASGI."""
+
+    login_view_class = AsyncLoginView
+
+    async def test_log_in_through_asgi(self):
+        """Test log in works when served by the ASGI handler."""
+        user = await sync_to_async(create_user)(password="testpass123")
+
+        payload = {"email": user.email, "password": "testpass123"}
+        res = await self.async_client.post(
+            LOG_IN_URL, payload, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.json())
+
+    def test_full_hashing_queue_refuses_log_in(self):
+        """Test log in is refused with a retry hint when hashing is overloaded."""
+        user = create_user(password="testpass123")
+
+        payload = {"email": user.email, "password": "testpass123"}
+        with patch.object(password_hashing, "max_queued", 0):
+            res = self.client.post(LOG_IN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.headers["Retry-After"], "1")
+
+    def test_full_hashing_queue_refuses_sign_up(self):
+        """Test sign up is refused without creating a user when overloaded."""
+        payload = {
+            "email": "test@example.com",
+            "password": "testpass123",
+            "username": "testusername",
+        }
+        with patch.object(password_hashing, "max_queued", 0):
+            res = self.client.post(SIGN_UP_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class HashingMetricsTests(TestCase):
+    """Tests for metrics of password hashing."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_metrics_require_staff(self):
+        """Test regular users can't read metrics."""
+        self.client.force_authenticate(create_user())
+
+        res = self.client.get(HASHING_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_staff_reads_metrics(self):
+        """Test staff reads sizes of the hashing queue."""
+        self.client.force_authenticate(create_user(is_staff=True))
+
+        res = self.client.get(HASHING_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("queued", res.data)
+        self.assertIn("rejected", res.data)
@@ -3,7 +3,7 @@ Urls for users.
 """
 from django.urls import path
 
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 from users import views
 
@@ -11,6 +11,9 @@ app_name = "users"
 urlpatterns = [
     path("login/", views.LoginView.as_view(), name="login"),
     path("register/", views.SignUpView.as_view(), name="register"),
+    path(
+        "hashing-metrics/", views.HashingMetrics.as_view(), name="hashing-metrics"
+    ),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/refresh/", views.RefreshView.as_view(), name="token_refresh"),
 ]
@@ -1,10 +1,23 @@
 """
 Users API.
 """
-from rest_framework import generics
-from rest_framework_simplejwt.views import TokenObtainPairView
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
 
-from users.serializers import UserSerializer, LoginSerializer
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from core.hashing import HashingQueueFullException, password_hashing
+from core.views import AsyncGenericAPIView
+from users.serializers import UserSerializer, LoginSerializer, RefreshSerializer
+
+HASHING_RETRY_AFTER = 1
 
 
 class SignUpView(generics.CreateAPIView):
@@ -13,7 +26,99 @@ class SignUpView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
+class AsyncSignUpView(AsyncGenericAPIView):
+    """Register a new user in the system, served through ASGI."""
+
+    serializer_class = UserSerializer
+
+    @extend_schema(
+        responses={
+            201: UserSerializer,
+            503: OpenApiResponse(description="Too many passwords to hash."),
+        }
+    )
+    async def post(self, request):
+        """Register a new user, hashing the password off the event loop."""
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        try:
+            serializer.instance = await get_user_model().objects.acreate_user(
+                **serializer.validated_data
+            )
+
+        except HashingQueueFullException:
+            return Response(
+                "Too many users sign up or log in, try again later.",
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(HASHING_RETRY_AFTER)},
+            )
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class LoginView(TokenObtainPairView):
     """Login a user."""
 
     serializer_class = LoginSerializer
+
+
+class AsyncLoginView(AsyncGenericAPIView):
+    """Login a user, served through ASGI."""
+
+    serializer_class = LoginSerializer
+    authentication_classes = []
+    permission_classes = []
+
+    def get_authenticate_header(self, request):
+        """Answer refused credentials with 401 like simplejwt views."""
+        return f'{AUTH_HEADER_TYPES[0]} realm="api"'
+
+    @extend_schema(
+        responses={
+            200: LoginSerializer,
+            503: OpenApiResponse(description="Too many passwords to hash."),
+        }
+    )
+    async def post(self, request):
+        """Return tokens of the user, checking the password off the event loop."""
+        serializer = self.get_serializer(data=request.data)
+        credentials = serializer.to_internal_value(request.data)
+
+        try:
+            user = await get_user_model().objects.aauthenticate(
+                request, credentials["email"], credentials["password"]
+            )
+
+        except HashingQueueFullException:
+            return Response(
+                "Too many users sign up or log in, try again later.",
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(HASHING_RETRY_AFTER)},
+            )
+
+        if user is None:
+            raise AuthenticationFailed(
+                serializer.error_messages["no_active_account"], "no_active_account"
+            )
+
+        refresh = serializer.get_token(user)
+
+        return Response({"refresh": str(refresh), "access": str(refresh.access_token)})
+
+
+class HashingMetrics(APIView):
+    """Queue of password hashing of the process serving the request."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        """Retrieve sizes of the queue and totals of hashed passwords."""
+        return Response(password_hashing.get_metrics())
+
+
+class RefreshView(TokenRefreshView):
+    """Refresh tokens, the used refresh token can't be used again."""
+
+    serializer_class = RefreshSerializer
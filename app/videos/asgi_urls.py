@@ -0,0 +1,15 @@
+"""
+Urls for videos API served through ASGI.
+"""
+from core.views import with_async_views
+from videos import urls, views
+
+app_name = urls.app_name
+urlpatterns = with_async_views(
+    urls.urlpatterns,
+    {
+        "todays": views.AsyncTodaysVideo,
+        "my-videos": views.AsyncMyVideos,
+        "collect-video": views.AsyncCollectVideo,
+    },
+)
@@ -0,0 +1,69 @@
+"""
+Cache for today's video response.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.timezone import localdate
+
+from rest_framework.renderers import JSONRenderer
+
+from core.cache import aget_todays_video_version, get_todays_video_version
+from core.models import Video
+from videos.serializers import VideoSerializer
+
+TODAYS_VIDEO_BODY_TTL = 60 * 60 * 24
+
+
+class TodaysVideoCache:
+    """Rendered today's video kept in memory of the worker.
+
+    The local copy is valid as long as its date is today and its version
+    matches the version stored in the shared cache,
+    so only one cache lookup is needed per request.
+    """
+
+    def __init__(self):
+        self.entry = None
+
+    def get(self):
+        """Return rendered today's video and its ETag."""
+        version = f"{localdate()}:{get_todays_video_version()}"
+        if self.entry is not None and self.entry[0] == version:
+            return self.entry[1], self.entry[2]
+
+        return self.load(version)
+
+    async def aget(self):
+        """Return rendered today's video and its ETag without blocking the event loop.
+
+        Only a changed version is loaded in a thread, the local copy is
+        returned right away.
+        """
+        version = f"{localdate()}:{await aget_todays_video_version()}"
+        if self.entry is not None and self.entry[0] == version:
+            return self.entry[1], self.entry[2]
+
+        return await sync_to_async(self.load)(version)
+
+    def load(self, version: str):
+        """Return today's video of the version from the shared cache,
+        rendering it if it's missing, and keep it as the local copy."""
+        key = f"todays-video:body:{version}"
+        body = cache.get(key)
+        if body is None:
+            video = Video.objects.todays()
+            body = JSONRenderer().render(VideoSerializer(video).data)
+            cache.set(key, body, timeout=TODAYS_VIDEO_BODY_TTL)
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        self.entry = (version, body, etag)
+        return body, etag
+
+    def clear(self):
+        """Forget the local copy."""
+        self.entry = None
+
+
+todays_video_cache = TodaysVideoCache()
@@ -0,0 +1,147 @@
+"""
+Pagination for videos API
+"""
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset pagination on two fields, the second one unique.
+
+    Cursor holds values of ordering fields of the last object of a page,
+    so every page is read with one indexed query regardless of its depth.
+    """
+
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return page that follows the position in cursor."""
+        return self.read_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Return page that follows the position in cursor, read with the async ORM."""
+        queryset = self.get_page_queryset(queryset, request)
+        return self.read_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Return query of the page and of one more object telling if it's last."""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering
+        ]
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        return queryset[: self.page_size + 1]
+
+    def read_page(self, results):
+        """Return page from results of the page query."""
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        return self.page
+
+    def get_position_filter(self, position):
+        """Return filter of objects that follow the position."""
+        (first, second), (first_value, second_value) = self.ordering, position
+        first_after, first_from = (
+            ("lt", "lte") if first.startswith("-") else ("gt", "gte")
+        )
+        second_after = "lt" if second.startswith("-") else "gt"
+        first, second = first.lstrip("-"), second.lstrip("-")
+        # Bounding the first field lets the index range scan start at the position.
+        return Q(**{f"{first}__{first_from}": first_value}) & (
+            Q(**{f"{first}__{first_after}": first_value})
+            | Q(**{first: first_value, f"{second}__{second_after}": second_value})
+        )
+
+    def get_next_link(self):
+        """Return url of the next page or None on the last page."""
+        if not self.has_next:
+            return None
+
+        last = self.page[-1]
+        return self.encode_cursor(
+            [getattr(last, field.attname) for field in self.fields]
+        )
+
+    def get_previous_link(self):
+        """Pages are followed only forward."""
+        return None
+
+    def decode_cursor(self, request):
+        """Return position from cursor in request."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            values = b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            if len(values) != len(self.fields):
+                raise ValueError(encoded)
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        """Return url with cursor of the position."""
+        values = [str(value) for value in position]
+        encoded = b64encode("|".join(values).encode("ascii"))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_html_context(self):
+        return {
+            "previous_url": None,
+            "next_url": self.get_next_link(),
+        }
+
+
+class CatalogPagination(KeysetPagination):
+    """Pagination of all videos from the most recently published."""
+
+    ordering = ("-publish_date", "-id")
+    page_size = 50
+    max_page_size = 200
+
+
+class CollectionPagination(KeysetPagination):
+    """Pagination of a collection from the most recently collected videos."""
+
+    ordering = ("-collected", "-id")
+    page_size = 50
+    max_page_size = 200
+
+
+class LeaderboardPagination(KeysetPagination):
+    """Pagination of collectors from the one with the most videos."""
+
+    ordering = ("-collected_count", "user_id")
+    page_size = 50
+    max_page_size = 200
+
+
+class SearchPagination(LimitOffsetPagination):
+    """Pagination of videos matching a search."""
+
+    default_limit = 20
+    max_limit = 100
+
+
+class MostCollectedPagination(LimitOffsetPagination):
+    """Pagination of the most collected videos ranking."""
+
+    default_limit = 10
+    max_limit = 100
@@ -1,9 +1,12 @@
 """
 Serializers for videos API
 """
+from django.conf import settings
+
 from rest_framework import serializers
 
-from core.models import Video, UserVideoRelation
+from core.leaderboard import leaderboard
+from core.models import CollectionStats, Video, UserVideoRelation
 
 
 class VideoSerializer(serializers.ModelSerializer):
@@ -11,7 +14,63 @@ class VideoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Video
-        fields = "__all__"
+        exclude = ["collected_count", "search_vector"]
+
+
+class CatalogVideoSerializer(serializers.ModelSerializer):
+    """Serializer for videos of the catalog, limited to requested fields."""
+
+    class Meta:
+        model = Video
+        fields = ["id", "title", "url", "thumbnail_url", "publish_date", "todays"]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class CatalogQuerySerializer(serializers.Serializer):
+    """Serializer for query parameters of the catalog."""
+
+    published_after = serializers.DateField(
+        required=False, help_text="Return videos published on this day or later."
+    )
+    published_before = serializers.DateField(
+        required=False, help_text="Return videos published on this day or earlier."
+    )
+    fields = serializers.CharField(
+        required=False, help_text="Comma separated fields of videos to return."
+    )
+
+    def validate_fields(self, fields):
+        """Split requested fields and check they can be returned."""
+        fields = [name.strip() for name in fields.split(",") if name.strip()]
+        allowed = CatalogVideoSerializer.Meta.fields
+        unknown = [name for name in fields if name not in allowed]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields {', '.join(unknown)}, "
+                f"choose from {', '.join(allowed)}."
+            )
+        return list(dict.fromkeys(fields)) or None
+
+
+class VideoSearchQuerySerializer(serializers.Serializer):
+    """Serializer for query parameters of video search."""
+
+    q = serializers.CharField(
+        max_length=100, help_text="Words of title, typos and diacritics are ignored."
+    )
+
+
+class MostCollectedVideoSerializer(serializers.ModelSerializer):
+    """Serializer for videos ranked by how many times they were collected."""
+
+    class Meta:
+        model = Video
+        exclude = ["search_vector"]
 
 
 class CollectVideoSerializer(serializers.ModelSerializer):
@@ -24,19 +83,78 @@ class CollectVideoSerializer(serializers.ModelSerializer):
         fields = ["video_id", "collected"]
         read_only_fields = ["collected"]
 
-    def validate_video_id(self, video_id):
-        """Check if video with given id exists."""
-        if Video.objects.filter(id=video_id).exists():
-            return video_id
-        raise serializers.ValidationError(f"Video with id {video_id} doesn't exists.")
-
     def create(self, validated_data):
-        """Add video to authenticated user's videos."""
+        """Add video to authenticated user's videos.
+
+        Video that is already collected isn't added again.
+        """
         request = self.context["request"]
-        user = request.user
         video_id = validated_data["video_id"]
-        video = Video.objects.get(id=video_id)
-        return UserVideoRelation.objects.create(user=user, video=video)
+        user_video = UserVideoRelation.objects.collect(request.user, video_id)
+        return self.found(user_video, video_id)
+
+    async def acreate(self, validated_data):
+        """Add video to authenticated user's videos like create
+        without blocking the event loop."""
+        request = self.context["request"]
+        video_id = validated_data["video_id"]
+        user_video = await UserVideoRelation.objects.acollect(request.user, video_id)
+        return self.found(user_video, video_id)
+
+    def found(self, user_video, video_id: int):
+        """Return the collected video, raise if there was no video to collect."""
+        if user_video is None:
+            raise serializers.ValidationError(
+                {"video_id": [f"Video with id {video_id} doesn't exists."]}
+            )
+        return user_video
+
+
+class UncollectVideoSerializer(serializers.Serializer):
+    """Serializer for removing videos from collection."""
+
+    video_id = serializers.IntegerField()
+
+
+class CollectVideosResultSerializer(serializers.Serializer):
+    """Serializer for result of collecting one of many videos."""
+
+    video_id = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=["collected", "already_collected", "not_found"]
+    )
+
+
+class CollectVideosSerializer(serializers.Serializer):
+    """Serializer for collecting many videos at once."""
+
+    video_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, write_only=True
+    )
+    results = CollectVideosResultSerializer(many=True, read_only=True)
+
+    def validate_video_ids(self, video_ids):
+        """Check amount of videos and drop repeated ids."""
+        video_ids = list(dict.fromkeys(video_ids))
+        limit = settings.COLLECT_VIDEOS_BATCH_LIMIT
+        if len(video_ids) > limit:
+            raise serializers.ValidationError(
+                f"Can't collect more than {limit} videos at once."
+            )
+        return video_ids
+
+    def create(self, validated_data):
+        """Add videos to authenticated user's videos."""
+        request = self.context["request"]
+        statuses = UserVideoRelation.objects.collect_many(
+            request.user, validated_data["video_ids"]
+        )
+        return {
+            "results": [
+                {"video_id": video_id, "status": status}
+                for video_id, status in statuses.items()
+            ]
+        }
 
 
 class ReadCollectedVideoSerializer(serializers.ModelSerializer):
@@ -47,3 +165,35 @@ class ReadCollectedVideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserVideoRelation
         fields = ["collected", "video"]
+
+
+class CollectionStatsSerializer(serializers.ModelSerializer):
+    """Serializer for statistics of user's collection."""
+
+    streak = serializers.IntegerField(source="current_streak", read_only=True)
+
+    class Meta:
+        model = CollectionStats
+        fields = ["collected_count", "first_collected", "last_collected", "streak"]
+
+
+class CollectorSerializer(serializers.ModelSerializer):
+    """Serializer for a user in the collectors ranking."""
+
+    username = serializers.CharField(source="user.username")
+    rank = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CollectionStats
+        fields = ["rank", "username", "collected_count"]
+
+    def get_rank(self, stats) -> int:
+        return leaderboard.rank_of(stats.collected_count)
+
+
+class MyRankSerializer(serializers.Serializer):
+    """Serializer for authenticated user's place in the collectors ranking."""
+
+    rank = serializers.IntegerField(allow_null=True)
+    collected_count = serializers.IntegerField()
+    collectors = serializers.IntegerField()
@@ -0,0 +1,170 @@
+"""
+Tests for query plans of videos API.
+"""
+import datetime
+import uuid
+
+from rest_framework.test import APITestCase
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.leaderboard import leaderboard
+from core.models import CollectionStats, Video, UserVideoRelation
+
+CATALOG_URL = reverse("videos:catalog")
+SEARCH_URL = reverse("videos:search")
+TODAYS_URL = reverse("videos:todays")
+MOST_COLLECTED_URL = reverse("videos:most-collected")
+LEADERBOARD_URL = reverse("videos:leaderboard")
+MY_VIDEOS_URL = reverse("videos:my-videos")
+RANDOM_UNCOLLECTED_URL = reverse("videos:random-uncollected-video")
+COLLECT_VIDEO_URL = reverse("videos:collect-video")
+COLLECT_VIDEOS_URL = reverse("videos:collect-videos")
+
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+def create_video(**params):
+    """Helper function to create a video."""
+    return Video.objects.create(
+        title=params.pop("title", "Video"),
+        url=params.pop("url", f"https://www.youtube.com/watch?v={uuid.uuid4()}"),
+        thumbnail_url=params.pop("thumbnail_url", "https://i.ytimg.com/vi/1.jpg"),
+        publish_date=params.pop("publish_date", datetime.date(2023, 3, 7)),
+        **params,
+    )
+
+
+class VideosAPIQueryPlanTests(APITestCase):
+    """Test queries of videos API use indexes.
+
+    Sequential scans are disabled for the test transaction,
+    so planner uses a sequential scan only when there is no usable index.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="testpass123", username="testuser"
+        )
+        other_user = get_user_model().objects.create(
+            email="other@example.com", password="testpass123", username="otheruser"
+        )
+        self.videos = [create_video() for _ in range(50)]
+        for video in self.videos[:20]:
+            UserVideoRelation.objects.create(user=self.user, video=video)
+            UserVideoRelation.objects.create(user=other_user, video=video)
+        self.client.force_authenticate(self.user)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertNoSequentialScans(self, queries):
+        """Explain every captured query and check none of them scans a table."""
+        explained = 0
+        for query in queries:
+            sql = query["sql"]
+            if not sql.startswith(EXPLAINED_STATEMENTS):
+                continue
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+
+            explained += 1
+            self.assertNotIn("Seq Scan", plan, f"{sql}\n{plan}")
+
+        self.assertGreater(explained, 0)
+
+    def test_catalog(self):
+        """Test catalog pages filtered by publish date use indexes."""
+        params = {"page_size": 5, "published_after": "2023-01-01", "fields": "title"}
+
+        with CaptureQueriesContext(connection) as queries:
+            next_url = self.client.get(CATALOG_URL, params).data["next"]
+            self.client.get(next_url)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_search(self):
+        """Test searching videos uses full text and trigram indexes."""
+        Video.objects.index_titles()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(SEARCH_URL, {"q": "vidoe"})
+
+        self.assertNoSequentialScans(queries)
+
+    def test_todays_video(self):
+        """Test today's video endpoint uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TODAYS_URL)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_most_collected_videos(self):
+        """Test most collected videos endpoint uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(MOST_COLLECTED_URL)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_leaderboard(self):
+        """Test leaderboard pages and scores use indexes."""
+        leaderboard.clear()
+        CollectionStats.objects.recompute()
+
+        with CaptureQueriesContext(connection) as queries:
+            next_url = self.client.get(LEADERBOARD_URL, {"page_size": 1}).data["next"]
+            self.client.get(next_url)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_my_videos(self):
+        """Test my-videos endpoint uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(MY_VIDEOS_URL)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_my_videos_next_page(self):
+        """Test next page of my-videos uses indexes."""
+        next_url = self.client.get(MY_VIDEOS_URL, {"page_size": 5}).data["next"]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(next_url)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_my_videos_since_version(self):
+        """Test changes of my-videos since a version use indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(MY_VIDEOS_URL, {"since": 0})
+
+        self.assertNoSequentialScans(queries)
+
+    def test_random_uncollected_video(self):
+        """Test sampling a random uncollected video uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(RANDOM_UNCOLLECTED_URL)
+
+        self.assertNoSequentialScans(queries)
+
+    def test_collect_video(self):
+        """Test collect video endpoint uses indexes."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(COLLECT_VIDEO_URL, {"video_id": self.videos[-1].id})
+
+        self.assertNoSequentialScans(queries)
+
+    def test_collect_videos(self):
+        """Test collect videos endpoint uses indexes."""
+        payload = {"video_ids": [video.id for video in self.videos[15:25]]}
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(COLLECT_VIDEOS_URL, payload, format="json")
+
+        self.assertNoSequentialScans(queries)
@@ -2,20 +2,60 @@
 Tests for videos API.
 """
 import datetime
+import uuid
+import threading
 
-from rest_framework.test import APITestCase
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 
-from django.urls import reverse
+from django.urls import resolve, reverse
 from django.contrib.auth import get_user_model
-
-from core.models import Video, UserVideoRelation
-from videos.serializers import VideoSerializer, ReadCollectedVideoSerializer
-
-
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from core.leaderboard import leaderboard
+from core.models import CollectionStats, Video, VideoManager, UserVideoRelation
+from users.serializers import LoginSerializer
+from videos.cache import todays_video_cache
+from videos.pagination import CollectionPagination, MostCollectedPagination
+from videos.serializers import (
+    CatalogVideoSerializer,
+    MostCollectedVideoSerializer,
+    ReadCollectedVideoSerializer,
+    VideoSerializer,
+)
+from videos.views import (
+    AsyncCollectVideo,
+    AsyncMyVideos,
+    AsyncTodaysVideo,
+    CollectVideo,
+    MyVideos,
+    TodaysVideo,
+)
+
+
+CATALOG_URL = reverse("videos:catalog")
+SEARCH_URL = reverse("videos:search")
 TODAYS_URL = reverse("videos:todays")
+MOST_COLLECTED_URL = reverse("videos:most-collected")
+LEADERBOARD_URL = reverse("videos:leaderboard")
+MY_RANK_URL = reverse("videos:my-rank")
 MY_VIDEOS_URL = reverse("videos:my-videos")
+RANDOM_UNCOLLECTED_URL = reverse("videos:random-uncollected-video")
 COLLECT_VIDEO_URL = reverse("videos:collect-video")
+COLLECT_VIDEOS_URL = reverse("videos:collect-videos")
+UNCOLLECT_VIDEO_URL = reverse("videos:uncollect-video")
+MY_STATS_URL = reverse("videos:my-stats")
 
 VIDEO_EXAMPLE = {
     "title": "POZNALIŚMY PŁEĆ NASZEGO DZIECKA!",
@@ -29,7 +69,7 @@ def create_video(**params):
     """Helper function to create a video."""
     video = Video.objects.create(
         title=params.pop("title", VIDEO_EXAMPLE["title"]),
-        url=params.pop("url", VIDEO_EXAMPLE["url"]),
+        url=params.pop("url", f"https://www.youtube.com/watch?v={uuid.uuid4()}"),
         thumbnail_url=params.pop("thumbnail_url", VIDEO_EXAMPLE["thumbnail_url"]),
         publish_date=params.pop("publish_date", VIDEO_EXAMPLE["publish_date"]),
         **params
@@ -40,6 +80,9 @@ def create_video(**params):
 class PublicVideosAPITests(APITestCase):
     """Test unauthenticated API requests."""
 
+    def setUp(self):
+        cache.clear()
+
     def test_todays_video_works(self):
         """Test today's video endpoint."""
         todays_video = create_video(todays=True)
@@ -48,7 +91,7 @@ class PublicVideosAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         serializer = VideoSerializer(todays_video)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.json(), serializer.data)
 
     def test_todays_video_error_when_no_todays_video(self):
         """Test today's video endpoint sets a random video as today's
@@ -61,7 +104,7 @@ class PublicVideosAPITests(APITestCase):
         self.assertTrue(video.todays)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         serializer = VideoSerializer(video)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.json(), serializer.data)
 
     def test_todays_video_error_when_no_videos(self):
         """Test today's video endpoint responses with an error
@@ -70,20 +113,197 @@ class PublicVideosAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
 
-    def test_todays_video_when_multiple_todays_videos(self):
-        """Test today's video endpoint responses with the latest today's video
-        when there are multiple today's videos in database."""
-        create_video(publish_date=datetime.date(2023, 2, 14), todays=True)
-        latest_video = create_video(
-            publish_date=datetime.date(2023, 2, 16), todays=True
-        )
+    def test_todays_video_served_without_queries(self):
+        """Test today's video is served from cache once it was rendered."""
+        todays_video = create_video(todays=True)
+        self.client.get(TODAYS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TODAYS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), VideoSerializer(todays_video).data)
+
+    def test_todays_video_not_modified(self):
+        """Test today's video endpoint responses with 304
+        when client already has current today's video."""
+        create_video(todays=True)
+        etag = self.client.get(TODAYS_URL)["ETag"]
 
+        res = self.client.get(TODAYS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_todays_video_cache_invalidated_on_change(self):
+        """Test changing today's video invalidates cached response."""
+        old_todays = create_video(todays=True)
+        first_res = self.client.get(TODAYS_URL)
+
+        old_todays.delete()
+        new_todays = create_video(todays=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            Video.objects.change_todays_video()
         res = self.client.get(TODAYS_URL)
 
+        self.assertNotEqual(res["ETag"], first_res["ETag"])
+        new_todays.refresh_from_db()
+        self.assertEqual(res.json(), VideoSerializer(new_todays).data)
+
+    def test_most_collected_videos(self):
+        """Test most collected videos are listed from the most collected one."""
+        videos = [create_video(collected_count=count) for count in [3, 7, 0, 7, 5]]
+
+        res = self.client.get(MOST_COLLECTED_URL, {"limit": 3})
+
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        latest_video.refresh_from_db()
-        serializer = VideoSerializer(latest_video)
-        self.assertEqual(res.data, serializer.data)
+        expected = [videos[1], videos[3], videos[4]]
+        serializer = MostCollectedVideoSerializer(expected, many=True)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("max-age", res["Cache-Control"])
+
+    def test_most_collected_videos_limit_bounded(self):
+        """Test client can't ask for more videos than the maximum limit."""
+        for _ in range(3):
+            create_video()
+
+        with patch.object(MostCollectedPagination, "max_limit", 2):
+            res = self.client.get(MOST_COLLECTED_URL, {"limit": 1000})
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_catalog_paginated_by_publish_date(self):
+        """Test catalog lists every video from the most recently published
+        and pages through videos published on the same day."""
+        dates = [datetime.date(2023, 3, day) for day in [7, 9, 7, 8, 9]]
+        videos = [create_video(publish_date=date) for date in dates]
+
+        results = []
+        url = f"{CATALOG_URL}?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            results.extend(res.data["results"])
+            url = res.data["next"]
+
+        expected = [videos[i] for i in [4, 1, 3, 2, 0]]
+        self.assertEqual(results, CatalogVideoSerializer(expected, many=True).data)
+
+    def test_catalog_filtered_by_publish_date(self):
+        """Test catalog lists only videos published in the date range."""
+        dates = [datetime.date(2023, 3, day) for day in range(1, 6)]
+        videos = [create_video(publish_date=date) for date in dates]
+
+        res = self.client.get(
+            CATALOG_URL,
+            {"published_after": "2023-03-02", "published_before": "2023-03-04"},
+        )
+
+        ids = [video["id"] for video in res.data["results"]]
+        self.assertEqual(ids, [videos[3].id, videos[2].id, videos[1].id])
+
+    def test_catalog_fetches_only_requested_fields(self):
+        """Test catalog serializes and selects only requested fields."""
+        video = create_video()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(CATALOG_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{"id": video.id, "title": video.title}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("thumbnail_url", queries[0]["sql"])
+
+    def test_catalog_unknown_field_error(self):
+        """Test catalog refuses fields that can't be returned."""
+        res = self.client.get(CATALOG_URL, {"fields": "id,collected_count"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", res.data)
+
+    def test_catalog_not_modified(self):
+        """Test unchanged catalog page is answered with 304 and a new video
+        changes its ETag."""
+        create_video(publish_date=datetime.date(2023, 3, 7))
+        first_res = self.client.get(CATALOG_URL)
+        self.assertFalse(first_res["ETag"].startswith("W/"))
+        self.assertIn("public", first_res["Cache-Control"])
+
+        res = self.client.get(CATALOG_URL, HTTP_IF_NONE_MATCH=first_res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+        create_video(publish_date=datetime.date(2023, 3, 8))
+        res = self.client.get(CATALOG_URL, HTTP_IF_NONE_MATCH=first_res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first_res["ETag"])
+
+    def test_search_videos(self):
+        """Test search lists videos matching query by title."""
+        video = create_video()
+        create_video(title="Wakacje w Grecji")
+        Video.objects.index_titles()
+
+        res = self.client.get(SEARCH_URL, {"q": "poznalismy plec"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"], [VideoSerializer(video).data])
+
+    def test_search_videos_requires_query(self):
+        """Test search refuses request without query."""
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("q", res.data)
+
+    def test_leaderboard(self):
+        """Test leaderboard lists collectors from the one with the most videos
+        and pages through collectors with the same amount of videos."""
+        leaderboard.clear()
+        for i, count in enumerate([3, 0, 7, 3, 3, 1]):
+            user = get_user_model().objects.create(
+                email=f"test{i}@example.com", password="testpass123", username=f"u{i}"
+            )
+            CollectionStats.objects.create(user=user, collected_count=count)
+
+        results = []
+        url = f"{LEADERBOARD_URL}?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            results.extend(res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(
+            [(row["rank"], row["username"], row["collected_count"]) for row in results],
+            [(1, "u2", 7), (2, "u0", 3), (2, "u3", 3), (2, "u4", 3), (5, "u5", 1)],
+        )
+
+    def test_leaderboard_query_count_constant(self):
+        """Test every page of the leaderboard is read with one query
+        once scores are loaded, however deep it is."""
+        leaderboard.clear()
+        for i in range(10):
+            user = get_user_model().objects.create(
+                email=f"test{i}@example.com", password="testpass123", username=f"u{i}"
+            )
+            CollectionStats.objects.create(user=user, collected_count=i % 3 + 1)
+        leaderboard.get_snapshot()
+
+        url = f"{LEADERBOARD_URL}?page_size=2"
+        while url:
+            with self.assertNumQueries(1):
+                url = self.client.get(url).data["next"]
+
+    def test_my_rank_requires_authentication(self):
+        """Test my rank endpoint requires authentication."""
+        res = self.client.get(MY_RANK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_my_videos_requires_authentication(self):
         """Test my videos endpoint requires authentication."""
@@ -91,6 +311,12 @@ class PublicVideosAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_random_uncollected_requires_authentication(self):
+        """Test random uncollected video endpoint requires authentication."""
+        res = self.client.get(RANDOM_UNCOLLECTED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_collect_video_requires_authentication(self):
         """Test collect video endpoint requires authentication."""
         video = create_video()
@@ -100,6 +326,58 @@ class PublicVideosAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_collect_videos_requires_authentication(self):
+        """Test collect videos endpoint requires authentication."""
+        video = create_video()
+        payload = {"video_ids": [video.id]}
+
+        res = self.client.post(COLLECT_VIDEOS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TodaysVideoConcurrencyTests(TransactionTestCase):
+    """Test today's video endpoint under concurrent requests."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_requests_elect_one_todays_video(self):
+        """Test only one of concurrent requests sets today's video
+        and all of them respond with the same video."""
+        for _ in range(10):
+            create_video(todays=False)
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        responses = []
+
+        def request_todays():
+            barrier.wait()
+            responses.append(APIClient().get(TODAYS_URL))
+            connection.close()
+
+        with patch.object(
+            VideoManager,
+            "set_random_video_as_todays",
+            autospec=True,
+            side_effect=VideoManager.set_random_video_as_todays,
+        ) as patched_set_random:
+            threads = [
+                threading.Thread(target=request_todays) for _ in range(threads_count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(patched_set_random.call_count, 1)
+        todays_videos = Video.objects.filter(todays=True)
+        self.assertEqual(todays_videos.count(), 1)
+        expected = VideoSerializer(todays_videos.get()).data
+        for res in responses:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json(), expected)
+
 
 class PrivateVideosAPITests(APITestCase):
     """Test authenticated API requests."""
@@ -122,7 +400,7 @@ class PrivateVideosAPITests(APITestCase):
         self.assertEqual(res.status_code, 200)
         for user_video in user_video_relations:
             serializer = ReadCollectedVideoSerializer(user_video)
-            self.assertIn(serializer.data, res.data)
+            self.assertIn(serializer.data, res.data["results"])
             collected = user_video.collected
             self.assertEqual(str(collected), serializer.data["collected"])
             video_data = VideoSerializer(user_video.video).data
@@ -144,9 +422,9 @@ class PrivateVideosAPITests(APITestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         user_video_serializer = ReadCollectedVideoSerializer(user_video)
-        self.assertIn(user_video_serializer.data, res.data)
+        self.assertIn(user_video_serializer.data, res.data["results"])
         other_user_video_serializer = ReadCollectedVideoSerializer(other_user_video)
-        self.assertNotIn(other_user_video_serializer.data, res.data)
+        self.assertNotIn(other_user_video_serializer.data, res.data["results"])
 
     def test_my_videos_sorted_by_collected_date(self):
         """Test my_videos list is sorted by collected date."""
@@ -164,7 +442,128 @@ class PrivateVideosAPITests(APITestCase):
 
         user_video_relations = UserVideoRelation.objects.all().order_by("-collected")
         serializer = ReadCollectedVideoSerializer(user_video_relations, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_my_videos_paginated_by_cursor(self):
+        """Test following next links returns every collected video once,
+        from the most recently collected, also when dates are the same."""
+        for day in [14, 14, 14, 16, 16, 18, 18]:
+            UserVideoRelation.objects.create(
+                user=self.user,
+                video=create_video(),
+                collected=datetime.date(2023, 2, day),
+            )
+
+        results = []
+        url = f"{MY_VIDEOS_URL}?page_size=3"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data["results"]), 3)
+            results.extend(res.data["results"])
+            url = res.data["next"]
+
+        user_video_relations = UserVideoRelation.objects.order_by("-collected", "-id")
+        serializer = ReadCollectedVideoSerializer(user_video_relations, many=True)
+        self.assertEqual(results, serializer.data)
+
+    def test_my_videos_page_size_bounded(self):
+        """Test client can't ask for a page bigger than the maximum."""
+        for _ in range(3):
+            UserVideoRelation.objects.create(user=self.user, video=create_video())
+
+        with patch.object(CollectionPagination, "max_page_size", 2):
+            res = self.client.get(MY_VIDEOS_URL, {"page_size": 1000})
+
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNotNone(res.data["next"])
+
+    def test_my_videos_query_count_constant(self):
+        """Test a page of collected videos is read with one query
+        and one more for collection version, no matter how many videos it has."""
+        CollectionStats.objects.create(user=self.user)
+        UserVideoRelation.objects.create(user=self.user, video=create_video())
+        with self.assertNumQueries(2):
+            self.client.get(MY_VIDEOS_URL)
+
+        for _ in range(20):
+            UserVideoRelation.objects.create(user=self.user, video=create_video())
+        with self.assertNumQueries(2):
+            res = self.client.get(MY_VIDEOS_URL, {"page_size": 10})
+        with self.assertNumQueries(2):
+            self.client.get(res.data["next"])
+
+    def test_my_videos_not_modified(self):
+        """Test my-videos responds with 304 and one query
+        when collection didn't change since client's version."""
+        UserVideoRelation.objects.collect(self.user, create_video().id)
+        etag = self.client.get(MY_VIDEOS_URL)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(MY_VIDEOS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        UserVideoRelation.objects.collect(self.user, create_video().id)
+        res = self.client.get(MY_VIDEOS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_my_videos_changed_since_version(self):
+        """Test my-videos returns only changes made after the given version."""
+        videos = [create_video() for _ in range(4)]
+        UserVideoRelation.objects.collect_many(self.user, [videos[0].id, videos[1].id])
+        UserVideoRelation.objects.collect(self.user, videos[2].id)
+        version = CollectionStats.objects.get(user=self.user).version
+
+        UserVideoRelation.objects.uncollect(self.user, videos[0].id)
+        UserVideoRelation.objects.collect(self.user, videos[3].id)
+        UserVideoRelation.objects.uncollect(self.user, videos[2].id)
+        UserVideoRelation.objects.collect(self.user, videos[2].id)
+        res = self.client.get(MY_VIDEOS_URL, {"since": version})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["version"], CollectionStats.objects.get(user=self.user).version
+        )
+        added = UserVideoRelation.objects.filter(
+            user=self.user, video__in=[videos[3], videos[2]]
+        ).order_by("version")
+        serializer = ReadCollectedVideoSerializer(added, many=True)
+        self.assertEqual(res.data["added"], serializer.data)
+        self.assertEqual(res.data["removed"], [videos[0].id])
+
+    def test_my_videos_since_invalid_version(self):
+        """Test my-videos responds with 400 to a malformed version."""
+        res = self.client.get(MY_VIDEOS_URL, {"since": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_my_videos_invalid_cursor(self):
+        """Test my-videos responds with 404 to a malformed cursor."""
+        res = self.client.get(MY_VIDEOS_URL, {"cursor": "not a cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_random_uncollected_video(self):
+        """Test user gets a video they haven't collected."""
+        videos = [create_video() for _ in range(2)]
+        UserVideoRelation.objects.collect(self.user, videos[0].id)
+
+        res = self.client.get(RANDOM_UNCOLLECTED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, VideoSerializer(videos[1]).data)
+
+    def test_random_uncollected_video_when_everything_collected(self):
+        """Test user who collected every video gets 404."""
+        video = create_video()
+        UserVideoRelation.objects.collect(self.user, video.id)
+
+        res = self.client.get(RANDOM_UNCOLLECTED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_collect_video_user_can_collect_video(self):
         """Test user can collect video by posting video_id."""
@@ -197,3 +596,253 @@ class PrivateVideosAPITests(APITestCase):
 
         user_video = UserVideoRelation.objects.get(user=self.user, video=video)
         self.assertEqual(user_video.collected, datetime.date.today())
+
+    def test_collect_video_twice(self):
+        """Test collecting a collected video returns the existing relation
+        without adding another one."""
+        video = create_video()
+        payload = {"video_id": video.id}
+        first_res = self.client.post(COLLECT_VIDEO_URL, payload)
+
+        res = self.client.post(COLLECT_VIDEO_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, first_res.data)
+        self.assertEqual(
+            UserVideoRelation.objects.filter(user=self.user, video=video).count(), 1
+        )
+
+    def test_collect_video_single_query(self):
+        """Test collecting a video takes one query and three more to count it,
+        collecting a collected video takes one query."""
+        CollectionStats.objects.create(user=self.user)
+        video = create_video()
+        payload = {"video_id": video.id}
+
+        with self.assertNumQueries(4):
+            self.client.post(COLLECT_VIDEO_URL, payload)
+        with self.assertNumQueries(1):
+            self.client.post(COLLECT_VIDEO_URL, payload)
+
+    def test_collect_videos_reports_every_video(self):
+        """Test collecting many videos reports result for every video id."""
+        collected_video = create_video()
+        UserVideoRelation.objects.create(user=self.user, video=collected_video)
+        new_video = create_video()
+        payload = {"video_ids": [new_video.id, collected_video.id, -1, new_video.id]}
+
+        res = self.client.post(COLLECT_VIDEOS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"video_id": new_video.id, "status": "collected"},
+                {"video_id": collected_video.id, "status": "already_collected"},
+                {"video_id": -1, "status": "not_found"},
+            ],
+        )
+        self.assertEqual(UserVideoRelation.objects.filter(user=self.user).count(), 2)
+
+    def test_collect_videos_query_count_constant(self):
+        """Test collecting many videos takes the same amount of queries
+        no matter how many videos there are."""
+        CollectionStats.objects.create(user=self.user)
+        videos = [create_video() for _ in range(10)]
+
+        with self.assertNumQueries(5):
+            self.client.post(
+                COLLECT_VIDEOS_URL,
+                {"video_ids": [video.id for video in videos[:2]]},
+                format="json",
+            )
+        with self.assertNumQueries(5):
+            self.client.post(
+                COLLECT_VIDEOS_URL,
+                {"video_ids": [video.id for video in videos]},
+                format="json",
+            )
+
+    @override_settings(COLLECT_VIDEOS_BATCH_LIMIT=2)
+    def test_collect_videos_limited(self):
+        """Test user can't collect more videos at once than the limit."""
+        videos = [create_video() for _ in range(3)]
+        payload = {"video_ids": [video.id for video in videos]}
+
+        res = self.client.post(COLLECT_VIDEOS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserVideoRelation.objects.exists())
+
+    def test_collect_videos_empty_list_error(self):
+        """Test collecting an empty list of videos is an error."""
+        res = self.client.post(COLLECT_VIDEOS_URL, {"video_ids": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_uncollect_video(self):
+        """Test user can remove a collected video from collection."""
+        video = create_video()
+        UserVideoRelation.objects.collect(self.user, video.id)
+
+        res = self.client.post(UNCOLLECT_VIDEO_URL, {"video_id": video.id})
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(UserVideoRelation.objects.filter(user=self.user).exists())
+        self.assertEqual(CollectionStats.objects.get(user=self.user).collected_count, 0)
+
+    def test_uncollect_not_collected_video_error(self):
+        """Test removing a video that isn't collected responds with 404."""
+        video = create_video()
+
+        res = self.client.post(UNCOLLECT_VIDEO_URL, {"video_id": video.id})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_my_stats(self):
+        """Test my-stats endpoint returns statistics of user's collection."""
+        for video in [create_video() for _ in range(3)]:
+            UserVideoRelation.objects.collect(self.user, video.id)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(MY_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        today = str(datetime.date.today())
+        self.assertEqual(
+            res.data,
+            {
+                "collected_count": 3,
+                "first_collected": today,
+                "last_collected": today,
+                "streak": 1,
+            },
+        )
+
+    def test_my_stats_computed_when_missing(self):
+        """Test statistics missing for user are computed from collection."""
+        UserVideoRelation.objects.create(
+            user=self.user, video=create_video(), collected=datetime.date(2023, 2, 14)
+        )
+
+        res = self.client.get(MY_STATS_URL)
+
+        self.assertEqual(res.data["collected_count"], 1)
+        self.assertEqual(res.data["first_collected"], "2023-02-14")
+        self.assertEqual(res.data["streak"], 0)
+
+    def test_my_rank(self):
+        """Test my rank endpoint returns place of user in collectors ranking."""
+        leaderboard.clear()
+        other_user = get_user_model().objects.create(
+            email="other@example.com", password="testpass123", username="otheruser"
+        )
+        CollectionStats.objects.create(user=other_user, collected_count=5)
+        CollectionStats.objects.create(user=self.user, collected_count=2)
+
+        res = self.client.get(MY_RANK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"rank": 2, "collected_count": 2, "collectors": 2})
+
+    def test_my_rank_without_videos(self):
+        """Test user without videos isn't ranked."""
+        leaderboard.clear()
+
+        res = self.client.get(MY_RANK_URL)
+
+        self.assertEqual(
+            res.data, {"rank": None, "collected_count": 0, "collectors": 0}
+        )
+
+
+class ServerRoutingTests(SimpleTestCase):
+    """Test endpoints with async views are routed by the server."""
+
+    ASYNC_VIEWS = {
+        TODAYS_URL: (TodaysVideo, AsyncTodaysVideo),
+        MY_VIDEOS_URL: (MyVideos, AsyncMyVideos),
+        COLLECT_VIDEO_URL: (CollectVideo, AsyncCollectVideo),
+    }
+
+    def test_sync_views_served_through_wsgi(self):
+        """Test default urlconf keeps the sync views."""
+        for url, (sync_view, _) in self.ASYNC_VIEWS.items():
+            self.assertIs(resolve(url).func.view_class, sync_view)
+
+    @override_settings(ROOT_URLCONF="app.asgi_urls")
+    def test_async_views_served_through_asgi(self):
+        """Test ASGI urlconf routes to the async views."""
+        for url, (_, async_view) in self.ASYNC_VIEWS.items():
+            self.assertIs(resolve(url).func.view_class, async_view)
+
+
+@override_settings(ROOT_URLCONF="app.asgi_urls")
+class AsyncVideosAPITests(TestCase):
+    """Test endpoints with async implementations served through ASGI."""
+
+    def setUp(self):
+        cache.clear()
+        todays_video_cache.clear()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="testpass123", username="testuser"
+        )
+        token = LoginSerializer.get_token(self.user).access_token
+        self.auth = {"AUTHORIZATION": f"Bearer {token}"}
+
+    async def test_todays_video(self):
+        """Test today's video is served and revalidated through ASGI."""
+        video = await sync_to_async(create_video)(todays=True)
+
+        res = await self.async_client.get(TODAYS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["id"], video.id)
+
+        res = await self.async_client.get(TODAYS_URL, IF_NONE_MATCH=res.headers["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_my_videos_and_changes(self):
+        """Test collection and its changes are listed through ASGI."""
+        video = await sync_to_async(create_video)()
+        await UserVideoRelation.objects.acollect(self.user, video.id)
+
+        res = await self.async_client.get(MY_VIDEOS_URL, **self.auth)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"][0]["video"]["id"], video.id)
+
+        res = await self.async_client.get(MY_VIDEOS_URL, {"since": 0}, **self.auth)
+
+        self.assertEqual(res.json()["added"][0]["video"]["id"], video.id)
+        self.assertEqual(res.json()["removed"], [])
+
+    async def test_collect_video(self):
+        """Test video is collected once through ASGI."""
+        video = await sync_to_async(create_video)()
+        payload = {"video_id": video.id}
+
+        res = await self.async_client.post(
+            COLLECT_VIDEO_URL, payload, content_type="application/json", **self.auth
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = await self.async_client.post(
+            COLLECT_VIDEO_URL, payload, content_type="application/json", **self.auth
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            await UserVideoRelation.objects.filter(user=self.user).acount(), 1
+        )
+
+    async def test_collect_missing_video(self):
+        """Test collecting a video that doesn't exist is refused through ASGI."""
+        res = await self.async_client.post(
+            COLLECT_VIDEO_URL,
+            {"video_id": 1},
+            content_type="application/json",
+            **self.auth,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
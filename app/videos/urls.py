@@ -7,7 +7,24 @@ from videos import views
 
 app_name = "videos"
 urlpatterns = [
+    path("", views.Catalog.as_view(), name="catalog"),
+    path("search", views.VideoSearch.as_view(), name="search"),
     path("todays/", views.TodaysVideo.as_view(), name="todays"),
+    path(
+        "most-collected/",
+        views.MostCollectedVideos.as_view(),
+        name="most-collected",
+    ),
+    path("leaderboard/", views.Leaderboard.as_view(), name="leaderboard"),
+    path("leaderboard/me", views.MyRank.as_view(), name="my-rank"),
     path("my", views.MyVideos.as_view(), name="my-videos"),
+    path(
+        "my/random",
+        views.RandomUncollectedVideo.as_view(),
+        name="random-uncollected-video",
+    ),
     path("my/add", views.CollectVideo.as_view(), name="collect-video"),
+    path("my/add-many", views.CollectVideos.as_view(), name="collect-videos"),
+    path("my/remove", views.UncollectVideo.as_view(), name="uncollect-video"),
+    path("my/stats", views.MyCollectionStats.as_view(), name="my-stats"),
 ]
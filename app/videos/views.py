@@ -1,21 +1,52 @@
 """
 Videos API
 """
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+import hashlib
+
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from django.views.decorators.cache import cache_control
 
 from rest_framework import status
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 
-from core.models import Video, UserVideoRelation, NoVideosException
+from core.leaderboard import leaderboard
+from core.views import AsyncGenericAPIView
+from users.authentication import ClaimsJWTAuthentication
+from core.models import CollectionStats, UserVideoRelation, Video, NoVideosException
+from videos.cache import todays_video_cache
+from videos.pagination import (
+    CatalogPagination,
+    CollectionPagination,
+    LeaderboardPagination,
+    MostCollectedPagination,
+    SearchPagination,
+)
 from videos.serializers import (
+    CatalogQuerySerializer,
+    CatalogVideoSerializer,
+    VideoSearchQuerySerializer,
     VideoSerializer,
     ReadCollectedVideoSerializer,
     CollectVideoSerializer,
+    CollectVideosSerializer,
+    UncollectVideoSerializer,
+    CollectionStatsSerializer,
+    MostCollectedVideoSerializer,
+    CollectorSerializer,
+    MyRankSerializer,
 )
 
+MOST_COLLECTED_MAX_AGE = 60 * 5
+CATALOG_MAX_AGE = 60
+
 
 class TodaysVideo(APIView):
     """ViewSet for retrieving today's video."""
@@ -23,13 +54,14 @@ class TodaysVideo(APIView):
     @extend_schema(
         responses={
             200: VideoSerializer,
+            304: OpenApiResponse(description="Today's video didn't change."),
             503: OpenApiResponse(description="No videos in database."),
         }
     )
     def get(self, request):
         """Retrieve today's video."""
         try:
-            video = Video.objects.todays()
+            body, etag = todays_video_cache.get()
 
         except NoVideosException:
             return Response(
@@ -37,8 +69,118 @@ class TodaysVideo(APIView):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
-        serializer = VideoSerializer(video)
-        return Response(serializer.data)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        return HttpResponse(
+            body, content_type="application/json", headers={"ETag": etag}
+        )
+
+
+class AsyncTodaysVideo(AsyncGenericAPIView):
+    """ViewSet for retrieving today's video, served through ASGI."""
+
+    @extend_schema(
+        responses={
+            200: VideoSerializer,
+            304: OpenApiResponse(description="Today's video didn't change."),
+            503: OpenApiResponse(description="No videos in database."),
+        }
+    )
+    async def get(self, request):
+        """Retrieve today's video."""
+        try:
+            body, etag = await todays_video_cache.aget()
+
+        except NoVideosException:
+            return Response(
+                "There are no videos in database.",
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        return HttpResponse(
+            body, content_type="application/json", headers={"ETag": etag}
+        )
+
+
+class Catalog(generics.ListAPIView):
+    """Get all videos from the most recently published."""
+
+    serializer_class = CatalogVideoSerializer
+    pagination_class = CatalogPagination
+
+    def get_queryset(self):
+        """Filter videos by publish date and fetch only requested fields."""
+        queryset = Video.objects.all()
+        if "published_after" in self.query:
+            queryset = queryset.filter(publish_date__gte=self.query["published_after"])
+        if "published_before" in self.query:
+            queryset = queryset.filter(
+                publish_date__lte=self.query["published_before"]
+            )
+
+        fields = self.query.get("fields")
+        if fields is not None:
+            ordering = [name.lstrip("-") for name in CatalogPagination.ordering]
+            queryset = queryset.only(*fields, *ordering)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.query.get("fields"))
+        return super().get_serializer(*args, **kwargs)
+
+    @extend_schema(
+        parameters=[CatalogQuerySerializer],
+        responses={
+            200: CatalogVideoSerializer(many=True),
+            304: OpenApiResponse(description="Page didn't change."),
+        },
+    )
+    @method_decorator(cache_control(public=True, max_age=CATALOG_MAX_AGE))
+    def get(self, request, *args, **kwargs):
+        """List a page of videos.
+
+        Response carries a hash of the page as a strong ETag,
+        so an unchanged page is answered with 304 and no body.
+        """
+        query = CatalogQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        self.query = query.validated_data
+
+        response = self.list(request, *args, **kwargs)
+        body = JSONRenderer().render(response.data)
+        media_type = request.accepted_media_type.encode()
+        etag = f'"{hashlib.md5(media_type + body).hexdigest()}"'
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        response["ETag"] = etag
+        return response
+
+
+class VideoSearch(generics.ListAPIView):
+    """Search videos by title."""
+
+    serializer_class = VideoSerializer
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        """Return videos matching the query, the best matches first."""
+        return Video.objects.search(self.query["q"])
+
+    @extend_schema(parameters=[VideoSearchQuerySerializer])
+    def get(self, request, *args, **kwargs):
+        """List videos matching the query."""
+        query = VideoSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        self.query = query.validated_data
+        return self.list(request, *args, **kwargs)
 
 
 class MyVideos(generics.ListAPIView):
@@ -46,16 +188,313 @@ class MyVideos(generics.ListAPIView):
 
     queryset = UserVideoRelation.objects.all()
     serializer_class = ReadCollectedVideoSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = CollectionPagination
+
+    def get_queryset(self):
+        """Filter queryset with authenticated user and fetch videos with it."""
+        user = self.request.user
+        return self.queryset.filter(user=user).select_related("video")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                int,
+                description="Return only changes made after this collection version.",
+            )
+        ],
+        responses={
+            200: ReadCollectedVideoSerializer(many=True),
+            304: OpenApiResponse(description="Collection didn't change."),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        """List collected videos or changes of collection since a version.
+
+        Response carries collection version as ETag,
+        so an unchanged collection is answered with 304 and one query.
+        """
+        version = CollectionStats.objects.for_user(request.user).version
+        etag = f'"{version}"'
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        since = request.query_params.get("since")
+        if since is None:
+            response = self.list(request, *args, **kwargs)
+        else:
+            if not since.isdigit():
+                return Response(
+                    "since must be a collection version.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            added, removed = UserVideoRelation.objects.changed_since(
+                request.user, int(since)
+            )
+            response = Response(
+                {
+                    "version": version,
+                    "added": self.get_serializer(added, many=True).data,
+                    "removed": removed,
+                }
+            )
+
+        response["ETag"] = etag
+        return response
+
+
+class AsyncMyVideos(AsyncGenericAPIView):
+    """Get a list of videos collected by authenticated user, served through ASGI."""
+
+    queryset = UserVideoRelation.objects.all()
+    serializer_class = ReadCollectedVideoSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = CollectionPagination
 
     def get_queryset(self):
-        """Filter queryset with authenticated user."""
+        """Filter queryset with authenticated user and fetch videos with it."""
         user = self.request.user
-        return self.queryset.filter(user=user).order_by("-collected")
+        return self.queryset.filter(user=user).select_related("video")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                int,
+                description="Return only changes made after this collection version.",
+            )
+        ],
+        responses={
+            200: ReadCollectedVideoSerializer(many=True),
+            304: OpenApiResponse(description="Collection didn't change."),
+        },
+    )
+    async def get(self, request, *args, **kwargs):
+        """List collected videos or changes of collection since a version.
+
+        Response carries collection version as ETag,
+        so an unchanged collection is answered with 304 and one query.
+        """
+        stats = await CollectionStats.objects.afor_user(request.user)
+        version = stats.version
+        etag = f'"{version}"'
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        since = request.query_params.get("since")
+        if since is None:
+            page = await self.paginator.apaginate_queryset(
+                self.get_queryset(), request, view=self
+            )
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            if not since.isdigit():
+                return Response(
+                    "since must be a collection version.",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            added, removed = await UserVideoRelation.objects.achanged_since(
+                request.user, int(since)
+            )
+            response = Response(
+                {
+                    "version": version,
+                    "added": self.get_serializer(added, many=True).data,
+                    "removed": removed,
+                }
+            )
+
+        response["ETag"] = etag
+        return response
+
+
+class RandomUncollectedVideo(APIView):
+    """Suggest a video authenticated user hasn't collected yet."""
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            200: VideoSerializer,
+            404: OpenApiResponse(description="Every video is collected."),
+            503: OpenApiResponse(description="No videos in database."),
+        }
+    )
+    def get(self, request):
+        """Retrieve a random video missing from authenticated user's collection."""
+        try:
+            video = Video.objects.random_uncollected(request.user)
+
+        except NoVideosException:
+            return Response(
+                "There are no videos in database.",
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        if video is None:
+            return Response(
+                "Every video is collected.", status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(VideoSerializer(video).data)
 
 
 class CollectVideo(generics.CreateAPIView):
     """Collect a video."""
 
     serializer_class = CollectVideoSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            201: CollectVideoSerializer,
+            200: OpenApiResponse(
+                CollectVideoSerializer, description="Video was already collected."
+            ),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        """Collect a video, responding with 200 if it was already collected."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_video = serializer.save()
+        if user_video.created:
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AsyncCollectVideo(AsyncGenericAPIView):
+    """Collect a video, served through ASGI."""
+
+    serializer_class = CollectVideoSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            201: CollectVideoSerializer,
+            200: OpenApiResponse(
+                CollectVideoSerializer, description="Video was already collected."
+            ),
+        }
+    )
+    async def post(self, request, *args, **kwargs):
+        """Collect a video, responding with 200 if it was already collected."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_video = await serializer.acreate(serializer.validated_data)
+        serializer.instance = user_video
+        if user_video.created:
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class CollectVideos(generics.GenericAPIView):
+    """Collect many videos at once."""
+
+    serializer_class = CollectVideosSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """Collect videos and report result for every video id."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class UncollectVideo(generics.GenericAPIView):
+    """Remove a video from collection."""
+
+    serializer_class = UncollectVideoSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            204: OpenApiResponse(description="Video was removed from collection."),
+            404: OpenApiResponse(description="Video wasn't collected."),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        """Remove a video from authenticated user's videos."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        video_id = serializer.validated_data["video_id"]
+        if UserVideoRelation.objects.uncollect(request.user, video_id):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        return Response(
+            f"Video with id {video_id} isn't collected.",
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+
+class MyCollectionStats(generics.RetrieveAPIView):
+    """Get statistics of authenticated user's collection."""
+
+    serializer_class = CollectionStatsSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        """Return precomputed statistics of authenticated user."""
+        return CollectionStats.objects.for_user(self.request.user)
+
+
+class MostCollectedVideos(generics.ListAPIView):
+    """Get videos from the most collected one."""
+
+    serializer_class = MostCollectedVideoSerializer
+    pagination_class = MostCollectedPagination
+
+    def get_queryset(self):
+        """Order videos by collected counter, which is indexed."""
+        return Video.objects.most_collected()
+
+    @method_decorator(cache_control(public=True, max_age=MOST_COLLECTED_MAX_AGE))
+    def get(self, request, *args, **kwargs):
+        """Retrieve the ranking, letting clients and proxies cache it for a while."""
+        return super().get(request, *args, **kwargs)
+
+
+class Leaderboard(generics.ListAPIView):
+    """Get users from the one who collected the most videos."""
+
+    serializer_class = CollectorSerializer
+    pagination_class = LeaderboardPagination
+
+    def get_queryset(self):
+        """Order collectors by collected counter, which is indexed."""
+        return CollectionStats.objects.ranked().select_related("user")
+
+
+class MyRank(APIView):
+    """Get authenticated user's place in the collectors ranking."""
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(responses={200: MyRankSerializer})
+    def get(self, request):
+        """Retrieve rank of authenticated user, users with the same score share it."""
+        stats = CollectionStats.objects.for_user(request.user)
+        serializer = MyRankSerializer(
+            {
+                "rank": leaderboard.rank_of(stats.collected_count),
+                "collected_count": stats.collected_count,
+                "collectors": leaderboard.get_snapshot().collectors,
+            }
+        )
+        return Response(serializer.data)
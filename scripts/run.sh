@@ -6,4 +6,9 @@ python manage.py wait_for_db
 python manage.py collectstatic --noinput
 python manage.py migrate
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+if [ "$APP_SERVER" = "asgi" ]; then
+    uvicorn app.asgi:application --host 0.0.0.0 --port 9000 --workers 4 \
+        --lifespan off --proxy-headers --forwarded-allow-ips "*"
+else
+    uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+fi